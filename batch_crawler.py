@@ -0,0 +1,268 @@
+"""Batch crawl of many universities at once, with a command-line entry point for cron."""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+from columnar_output import COLUMNAR_FORMATS
+from crawl_metrics import crawl_metrics
+from extractor import BrowserPool, OUTPUT_MAIN_FOLDER, scrape_university_courses
+from url_canonical import DEDUP_INDEX_PATH, DedupIndex
+from university_config import UNIVERSITY_CONFIGS, get_config_for_url, get_university_display_name
+
+
+# -----------------------------
+# Constants
+# -----------------------------
+DEFAULT_CONCURRENCY = 4  # Universities crawled at the same time
+DEFAULT_BROWSERS = 2  # Warm browsers shared by all crawls
+DEFAULT_TIMEOUT = 1800  # seconds per university
+METRICS_REPORT_NAME = "crawl_metrics.json"
+METRICS_PROMETHEUS_NAME = "crawl_metrics.prom"
+
+EXIT_OK = 0
+EXIT_PARTIAL_FAILURE = 1
+EXIT_USAGE_ERROR = 2
+EXIT_ALL_FAILED = 3
+
+
+# -----------------------------
+# Orchestration
+# -----------------------------
+
+def get_configured_start_urls() -> List[str]:
+    """Get the start_url of every configured university that has one."""
+    return [config["start_url"] for config in UNIVERSITY_CONFIGS.values() if config.get("start_url")]
+
+
+async def _crawl_one(
+    url: str,
+    pool: BrowserPool,
+    semaphore: asyncio.Semaphore,
+    domain_locks: Dict[str, asyncio.Lock],
+    timeout: Optional[float],
+    diff: bool = False,
+    columnar: Optional[str] = None,
+    dedup_index: Optional[DedupIndex] = None
+) -> Dict[str, Any]:
+    """
+    Crawl a single university, never raising.
+
+    Returns:
+        Result dictionary for the run summary
+    """
+    config = get_config_for_url(url)
+    folder_name = config.get("folder_name") if config else None
+    result = {
+        "url": url,
+        "university_name": get_university_display_name(url),
+        "folder_name": folder_name,
+        "status": "pending",
+        "count": 0,
+        "new_urls": None,
+        "csv_path": None,
+        "duration_s": 0.0,
+        "error": None,
+    }
+
+    # One crawl per university at a time, even if it is listed twice. The domain
+    # lock is taken first, so a duplicate waiting on it holds no concurrency slot.
+    lock = domain_locks.setdefault(folder_name or url, asyncio.Lock())
+    async with lock:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                count, urls, csv_path = await asyncio.wait_for(
+                    scrape_university_courses(url, pool, diff=diff, columnar=columnar), timeout
+                )
+                result.update(status="ok", count=count, csv_path=csv_path)
+                if dedup_index is not None:
+                    result["new_urls"] = sum(1 for _ in dedup_index.filter_new(urls))
+                    dedup_index.commit()
+            except asyncio.TimeoutError:
+                result.update(status="timeout", error=f"Timed out after {timeout}s")
+            except Exception as e:
+                result.update(status="error", error=f"{type(e).__name__}: {e}")
+            result["duration_s"] = round(time.perf_counter() - started, 3)
+
+    print(f"[{result['status']}] {result['university_name']}: {result['count']} URLs in {result['duration_s']}s")
+    return result
+
+
+async def crawl_universities(
+    urls: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    browsers: int = DEFAULT_BROWSERS,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    diff: bool = False,
+    columnar: Optional[str] = None,
+    dedup_index_path: Optional[str] = None,
+    metrics_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Crawl many universities concurrently on a shared browser pool.
+
+    A failure or timeout for one university is recorded in the summary and
+    does not affect the others.
+
+    Args:
+        urls: University course page URLs
+        concurrency: Maximum universities crawled at the same time
+        browsers: Number of warm browsers in the pool
+        timeout: Per-university time limit in seconds (None for no limit)
+        diff: Also write added/removed/unchanged CSVs against each university's previous run
+        columnar: Also append URLs to the "parquet" or "arrow" links dataset
+        dedup_index_path: SQLite dedup index shared across runs and universities; each
+            result then reports new_urls, the URLs never seen before
+        metrics_dir: Record per-phase crawl timings and write them to this folder as
+            a JSON report and a Prometheus text file (see crawl_metrics)
+
+    Returns:
+        Run summary dictionary (JSON serialisable)
+    """
+    started_at = datetime.now()
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    domain_locks: Dict[str, asyncio.Lock] = {}
+
+    # crawl_metrics is process-wide: record for this run only, then put it back as it was
+    metrics_were_enabled = crawl_metrics.enabled
+    if metrics_dir:
+        crawl_metrics.reset()
+        crawl_metrics.enable()
+
+    dedup_index = DedupIndex(dedup_index_path) if dedup_index_path else None
+    metrics_paths = None
+    try:
+        async with BrowserPool(size=browsers) as pool:
+            results = await asyncio.gather(*(
+                _crawl_one(url, pool, semaphore, domain_locks, timeout, diff, columnar, dedup_index)
+                for url in urls
+            ))
+        if metrics_dir:
+            metrics_paths = {
+                "json": crawl_metrics.write_json(os.path.join(metrics_dir, METRICS_REPORT_NAME)),
+                "prometheus": crawl_metrics.write_prometheus(os.path.join(metrics_dir, METRICS_PROMETHEUS_NAME)),
+            }
+    finally:
+        if dedup_index is not None:
+            dedup_index.close()
+        if metrics_dir and not metrics_were_enabled:
+            crawl_metrics.disable()
+
+    succeeded = [r for r in results if r["status"] == "ok"]
+    return {
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now().isoformat(),
+        "duration_s": round(time.perf_counter() - started, 3),
+        "concurrency": concurrency,
+        "browsers": browsers,
+        "total": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "total_urls": sum(r["count"] for r in succeeded),
+        "new_urls": sum(r["new_urls"] for r in succeeded) if dedup_index_path else None,
+        "metrics": metrics_paths,
+        "universities": list(results),
+    }
+
+
+def write_run_summary(summary: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Write a run summary as JSON.
+
+    Args:
+        summary: Summary returned by crawl_universities
+        path: Output path (defaults to a timestamped file in the output folder)
+
+    Returns:
+        Path of the written file
+    """
+    if path is None:
+        os.makedirs(OUTPUT_MAIN_FOLDER, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(OUTPUT_MAIN_FOLDER, f"run_summary_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def exit_code_for(summary: Dict[str, Any]) -> int:
+    """Map a run summary to a process exit code."""
+    if summary["failed"] == 0:
+        return EXIT_OK
+    if summary["succeeded"] == 0:
+        return EXIT_ALL_FAILED
+    return EXIT_PARTIAL_FAILURE
+
+
+# -----------------------------
+# Command Line
+# -----------------------------
+
+def _read_urls_file(path: str) -> List[str]:
+    """Read URLs from a file, one per line (blank lines and # comments skipped)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Exit codes:
+        0 - every university succeeded
+        1 - some universities failed
+        2 - usage error (no URLs given)
+        3 - every university failed
+    """
+    parser = argparse.ArgumentParser(description="Crawl course links for many universities concurrently.")
+    parser.add_argument("urls", nargs="*", help="University course page URLs")
+    parser.add_argument("--urls-file", help="File with one URL per line")
+    parser.add_argument("--all", action="store_true", help="Crawl every configured university with a start_url")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Universities crawled at once")
+    parser.add_argument("--browsers", type=int, default=DEFAULT_BROWSERS, help="Warm browsers in the pool")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-university timeout in seconds")
+    parser.add_argument("--summary", help="Path of the JSON run summary")
+    parser.add_argument("--diff", action="store_true", help="Write added/removed/unchanged CSVs against the previous run")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS, help="Also append URLs to a partitioned Parquet/Arrow dataset")
+    parser.add_argument("--dedup-index", nargs="?", const=DEDUP_INDEX_PATH,
+                        help=f"Count URLs never seen in any earlier run (default index: {DEDUP_INDEX_PATH})")
+    parser.add_argument("--metrics", nargs="?", const=OUTPUT_MAIN_FOLDER,
+                        help=f"Write per-phase crawl timings as JSON and Prometheus text files (default folder: {OUTPUT_MAIN_FOLDER})")
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    if args.urls_file:
+        urls.extend(_read_urls_file(args.urls_file))
+    if args.all:
+        urls.extend(get_configured_start_urls())
+    urls = list(dict.fromkeys(urls))
+
+    if not urls:
+        parser.print_usage(sys.stderr)
+        print("No URLs to crawl (pass URLs, --urls-file or --all)", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    summary = asyncio.run(crawl_universities(
+        urls,
+        concurrency=args.concurrency,
+        browsers=args.browsers,
+        timeout=args.timeout or None,
+        diff=args.diff,
+        columnar=args.columnar,
+        dedup_index_path=args.dedup_index,
+        metrics_dir=args.metrics
+    ))
+    path = write_run_summary(summary, args.summary)
+    print(f"[✔] {summary['succeeded']}/{summary['total']} universities, "
+          f"{summary['total_urls']} URLs in {summary['duration_s']}s. Summary: {path}")
+    return exit_code_for(summary)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
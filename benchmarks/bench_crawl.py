@@ -0,0 +1,438 @@
+"""
+Offline crawl benchmark against local fixture sites.
+
+Serves one fixture site per pagination type from a local http.server. Each
+site's markup is built for the selectors of a real university config:
+
+- single_page   wrexham.ac.uk     (every course on one page)
+- accordion     buckingham.ac.uk  (one collapsed section per page, filled in on click)
+- page_numbers  shu.ac.uk         ("Page 1 of N" + ?page=N)
+- url_params    canterbury.ac.nz  (?start_rank=1,21,41... with last-page probing)
+- next_button   abertay.ac.uk     (a.next links, Funnelback redirect hrefs)
+
+scrape_university_courses() is run against each site in a fresh interpreter,
+once with Playwright (render True) and once over the browserless fast path
+(render False), so peak RSS is per scenario and mode. Output goes to a temporary folder. The report shows:
+
+- pages/sec and URLs/sec over the whole call, including the CSV save
+- p50/p95 page latency, measured from the request reaching the server to the
+  page's links being recorded
+- peak RSS of the crawling process, including the fixture server thread
+
+With --metrics-dir, each scenario also writes the per-phase crawl_metrics
+report (<scenario>.json and <scenario>.prom) to that folder.
+
+Browser mode exercises the Playwright handlers: next-button clicks,
+accordion expansion, page_numbers in a page, worker pages and readiness
+waits. --mode browser or --mode http runs only one of the two. Scenarios
+with no HTTP equivalent (accordion, whose links only exist after a click)
+are reported as skipped in HTTP mode, never as passing. Politeness delays
+are zeroed so --latency alone sets the pace, unless --keep-politeness is given.
+
+Usage:
+    python benchmarks/bench_crawl.py [--pages 20] [--links 25] [--latency 50] [--jitter 10]
+                                     [--only page_numbers url_params] [--mode both|browser|http]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_metrics import crawl_metrics  # noqa: E402
+from university_config import UNIVERSITY_CONFIGS, register_university  # noqa: E402
+
+
+# -----------------------------
+# Fixture Markup
+# -----------------------------
+
+def _course_url(origin: str, kind: str, page: int, i: int) -> str:
+    return f"{origin}/courses/{kind}/p{page}-c{i}/"
+
+
+def _redirect_href(target: str) -> str:
+    """Funnelback-style click-tracking href wrapping a course URL."""
+    return f"/s/redirect?collection=bench&url={quote(target, safe='')}&profile=_default"
+
+
+def _html(body: str) -> bytes:
+    return f"<!DOCTYPE html><html><head><title>Courses</title></head><body>{body}</body></html>".encode("utf-8")
+
+
+def _single_page(origin: str, page: int, pages: int, links: int) -> bytes:
+    cards = "".join(
+        f'<div class="search-result-card"><h2><a href="/courses/single_page/p{p}-c{i}/">Course {p}.{i}</a></h2></div>'
+        for p in range(pages) for i in range(links)
+    )
+    return _html(f"<main>{cards}</main>")
+
+
+def _accordion(origin: str, page: int, pages: int, links: int) -> bytes:
+    # The links sit in a <template> until the header is clicked, so only a crawl
+    # that really expands each section finds them
+    toggle = (
+        "var list=this.nextElementSibling;if(!list.children.length){"
+        "list.appendChild(list.nextElementSibling.content.cloneNode(true));}"
+        "this.setAttribute('aria-expanded','true');list.hidden=false"
+    )
+    sections = "".join(
+        f'<div class="courses"><button class="levelheader accordion_title" aria-expanded="false" '
+        f'onclick="{toggle}">Level {p}</button><div class="courselist-internal" hidden></div><template>'
+        + "".join(f'<a href="/courses/accordion/p{p}-c{i}/">Course {p}.{i}</a>' for i in range(links))
+        + "</template></div>"
+        for p in range(pages)
+    )
+    return _html(sections)
+
+
+def _page_numbers(origin: str, page: int, pages: int, links: int) -> bytes:
+    snippets = "".join(
+        f'<article><a class="m-snippet__link" href="/courses/page_numbers/p{page}-c{i}/">Course {page}.{i}</a></article>'
+        for i in range(links)
+    ) if page < pages else ""
+    return _html(f'{snippets}<nav class="m-pagination">Page {page + 1} of {pages}</nav>')
+
+
+def _url_params(origin: str, page: int, pages: int, links: int) -> bytes:
+    results = "".join(
+        f'<li><h3 class="cmp-funnelback-search__results-item-title"><a class="cmp-button" '
+        f'href="{_redirect_href(_course_url(origin, "url_params", page, i))}">Course {page}.{i}</a></h3></li>'
+        for i in range(links)
+    ) if page < pages else ""
+    return _html(f"<ol>{results}</ol>")
+
+
+def _next_button(origin: str, page: int, pages: int, links: int) -> bytes:
+    results = "".join(
+        f'<h3><a href="{_redirect_href(_course_url(origin, "next_button", page, i))}">Course {page}.{i}</a></h3>'
+        for i in range(links)
+    ) if page < pages else ""
+    if page + 1 < pages:
+        pager = f'<a class="next" href="/course-search/?keywords=course&amp;page={page + 2}">Next</a>'
+    else:
+        pager = '<a class="next disabled">Next</a>'
+    return _html(f"{results}<div class=\"pagination\">{pager}</div>")
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: int) -> int:
+    try:
+        return int(query[name][0])
+    except (KeyError, ValueError):
+        return default
+
+
+MODES = ("browser", "http")
+
+# Source config, start path, markup, query -> page index, and whether the
+# fixture can be crawled without a browser
+FIXTURES: Dict[str, Dict[str, Any]] = {
+    "single_page": {
+        "domain": "wrexham.ac.uk",
+        "path": "/international-students/courses/",
+        "render": _single_page,
+        "page_index": lambda query: 0,
+        "http": True,
+    },
+    "accordion": {
+        "domain": "buckingham.ac.uk",
+        "path": "/courses/",
+        "render": _accordion,
+        "page_index": lambda query: 0,
+        "http": False,  # sections must be clicked open
+    },
+    "page_numbers": {
+        "domain": "shu.ac.uk",
+        "path": "/courses/search/",
+        "render": _page_numbers,
+        "page_index": lambda query: _int_param(query, "page", 1) - 1,
+        "http": True,
+    },
+    "url_params": {
+        "domain": "canterbury.ac.nz",
+        "path": "/study/search/?query=courses",
+        "render": _url_params,
+        "page_index": lambda query: (_int_param(query, "start_rank", 1) - 1) // 20,
+        "http": True,
+    },
+    "next_button": {
+        "domain": "abertay.ac.uk",
+        "path": "/course-search/?keywords=course",
+        "render": _next_button,
+        "page_index": lambda query: _int_param(query, "page", 1) - 1,
+        "http": True,
+    },
+}
+
+
+# -----------------------------
+# Fixture Server
+# -----------------------------
+
+class FixtureServer:
+    """
+    Serves one fixture site on 127.0.0.1 from a background thread.
+
+    Every listing request sleeps latency +/- jitter seconds before answering,
+    and its arrival time is recorded per path and query for the latency report.
+    """
+
+    def __init__(self, kind: str, pages: int, links: int, latency: float, jitter: float):
+        self.fixture = FIXTURES[kind]
+        self.pages = pages
+        self.links = links
+        self.latency = latency
+        self.jitter = jitter
+        self.arrivals: Dict[str, float] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self.origin = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @property
+    def start_url(self) -> str:
+        return self.origin + self.fixture["path"]
+
+    def _handler(self):
+        server = self
+        listing_path = urlsplit(self.fixture["path"]).path
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like a real site
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_GET(self):
+                arrived = time.perf_counter()
+                parts = urlsplit(self.path)
+                if parts.path != listing_path:
+                    self._send(404, b"Not found")
+                    return
+                with server._lock:
+                    server.arrivals.setdefault(self.path, arrived)
+                    server.requests += 1
+                delay = server.latency + random.uniform(-server.jitter, server.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+                page = server.fixture["page_index"](parse_qs(parts.query))
+                self._send(200, server.fixture["render"](server.origin, page, server.pages, server.links))
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+# -----------------------------
+# Scenario (runs in a child process)
+# -----------------------------
+
+def bench_config(kind: str, folder_name: str, pages: int, browser: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    """Copy of the fixture's real university config, adjusted for the local site and mode."""
+    config = {key: value for key, value in UNIVERSITY_CONFIGS[FIXTURES[kind]["domain"]].items() if key != "start_url"}
+    config["folder_name"] = folder_name
+    config["render"] = browser
+    if not args.keep_politeness:
+        config["politeness_delay"] = 0
+    if args.page_concurrency:
+        config["page_concurrency"] = args.page_concurrency
+    if kind == "url_params":
+        config["max_pages"] = max(config.get("max_pages", 0), pages + 1)
+    return config
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[round(fraction * 100) - 1]
+
+
+async def _crawl(start_url: str, on_page: Callable[[int, str, List[str]], None], browser: bool):
+    import extractor
+
+    if not browser:
+        return await extractor.scrape_university_courses(start_url, resume=False, full_crawl=True, on_page=on_page)
+    async with extractor.BrowserPool(size=1) as pool:
+        return await extractor.scrape_university_courses(
+            start_url, pool=pool, resume=False, full_crawl=True, on_page=on_page
+        )
+
+
+def run_scenario(kind: str, mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Crawl one fixture site in one mode and measure it (call in a fresh process)."""
+    browser = mode == "browser"
+    workdir = tempfile.mkdtemp(prefix=f"bench_crawl_{kind}_")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with FixtureServer(kind, args.pages, args.links, args.latency / 1000, args.jitter / 1000) as server:
+            register_university("127.0.0.1", bench_config(kind, f"bench_{kind}", args.pages, browser, args))
+            completed: Dict[str, float] = {}
+
+            def on_page(index: int, url: str, links: List[str]) -> None:
+                parts = urlsplit(url)
+                completed[parts.path + (f"?{parts.query}" if parts.query else "")] = time.perf_counter()
+
+            if args.metrics_dir:
+                crawl_metrics.enable()
+            log = io.StringIO()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(log):
+                total, _, _ = asyncio.run(_crawl(server.start_url, on_page, browser))
+            elapsed = time.perf_counter() - started
+            if args.metrics_dir:
+                crawl_metrics.write_json(os.path.join(args.metrics_dir, f"{kind}_{mode}.json"))
+                crawl_metrics.write_prometheus(os.path.join(args.metrics_dir, f"{kind}_{mode}.prom"))
+
+            latencies = [
+                (done - server.arrivals[key]) * 1000
+                for key, done in completed.items() if key in server.arrivals
+            ]
+            return {
+                "scenario": kind,
+                "mode": mode,
+                "domain": FIXTURES[kind]["domain"],
+                "pages": len(completed),
+                "requests": server.requests,
+                "urls": total,
+                "expected_urls": args.pages * args.links,
+                "seconds": elapsed,
+                "pages_per_sec": len(completed) / elapsed,
+                "urls_per_sec": total / elapsed,
+                "p50_ms": _percentile(latencies, 0.50) if latencies else None,
+                "p95_ms": _percentile(latencies, 0.95) if latencies else None,
+                "peak_rss_mb": _peak_rss_mb(),
+            }
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+def _child_command(kind: str, mode: str, args: argparse.Namespace) -> List[str]:
+    command = [
+        sys.executable, os.path.abspath(__file__), "--child", kind, "--mode", mode,
+        "--pages", str(args.pages), "--links", str(args.links),
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+    ]
+    if args.page_concurrency:
+        command += ["--page-concurrency", str(args.page_concurrency)]
+    if args.keep_politeness:
+        command.append("--keep-politeness")
+    if args.metrics_dir:
+        command += ["--metrics-dir", os.path.abspath(args.metrics_dir)]
+    return command
+
+
+def _child_error(stderr: str) -> str:
+    """Exception line of a failed child's traceback (Playwright appends a banner after it)."""
+    lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+    for line in reversed(lines):
+        if "Error" in line.split(":", 1)[0] or "Exception" in line.split(":", 1)[0]:
+            return line
+    return lines[-1] if lines else "no output"
+
+
+def _format(value: Optional[float], spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from extractor import MAX_PAGES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="Listing pages per site (sections for accordion)")
+    parser.add_argument("--links", type=int, default=25, help="Course links per page")
+    parser.add_argument("--latency", type=float, default=50, help="Simulated server latency per page (ms)")
+    parser.add_argument("--jitter", type=float, default=10, help="Random +/- latency jitter (ms)")
+    parser.add_argument("--only", nargs="+", choices=list(FIXTURES), help="Scenarios to run (default: all)")
+    parser.add_argument("--page-concurrency", type=int, help="Override each config's page_concurrency")
+    parser.add_argument("--mode", choices=("both",) + MODES, default="both",
+                        help="Crawl with Playwright, over the HTTP fast path, or both (default)")
+    parser.add_argument("--keep-politeness", action="store_true", help="Keep each config's politeness_delay")
+    parser.add_argument("--metrics-dir", help="Write each scenario's per-phase crawl_metrics report here")
+    parser.add_argument("--child", choices=list(FIXTURES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if not 1 <= args.pages <= MAX_PAGES:
+        parser.error(f"--pages must be between 1 and {MAX_PAGES} (the crawler's MAX_PAGES)")
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args.mode, args)))
+        return 0
+
+    print(f"{args.pages} pages x {args.links} links, {args.latency:.0f}±{args.jitter:.0f}ms latency")
+    failed = False
+    for mode in MODES if args.mode == "both" else (args.mode,):
+        print(f"\n{'Playwright' if mode == 'browser' else 'HTTP fast path'}\n")
+        print(f"{'scenario':<14}{'pages':>6}{'urls':>7}{'sec':>8}{'pages/s':>9}{'urls/s':>9}"
+              f"{'p50 ms':>8}{'p95 ms':>8}{'rss MB':>8}   result")
+        for kind in args.only or list(FIXTURES):
+            if mode == "http" and not FIXTURES[kind]["http"]:
+                print(f"{kind:<14}   skipped: browser only, not exercised over HTTP")
+                continue
+            child = subprocess.run(_child_command(kind, mode, args), capture_output=True, text=True)
+            if child.returncode != 0:
+                failed = True
+                error = _child_error(child.stderr)
+                print(f"{kind:<14}   failed: {error}")
+                continue
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            ok = result["urls"] == result["expected_urls"]
+            failed = failed or not ok
+            print(
+                f"{kind:<14}{result['pages']:>6}{result['urls']:>7}{result['seconds']:>8.2f}"
+                f"{result['pages_per_sec']:>9.1f}{result['urls_per_sec']:>9,.0f}"
+                f"{_format(result['p50_ms'], '.0f'):>8}{_format(result['p95_ms'], '.0f'):>8}"
+                f"{_format(result['peak_rss_mb'], '.0f'):>8}   "
+                + ("ok" if ok else f"expected {result['expected_urls']} URLs")
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Throughput benchmark for course_extractor.extract_course_details against a local Firecrawl stub.
+
+Starts benchmarks/firecrawl_stub.py in a separate process, so its threads
+and memory are not counted, and runs the extraction pipeline over fake
+course URLs. It reports:
+
+- courses/minute over the whole run
+- extract call latency p50/p95/p99/max, timed around each client call
+  (calls the pipeline gave up on are counted when they eventually return)
+- outcomes: courses, errors, timeouts
+- threads: peak while running and still alive afterwards (pool threads,
+  some of them still busy with abandoned calls)
+- pool: course_extractor.ExtractPool totals (completed, failed, timed out)
+  and the calls it had abandoned but were still running at the end
+- memory: peak RSS and RSS growth over the run
+
+--max-in-flight, --rate, --domain-rate, --unordered, --batch-size,
+--fixed-batch and --group-by-domain are passed on to the pipeline; --domains
+spreads the URLs over several course domains. --in-process swaps the server for InProcessFirecrawl (no HTTP).
+--cache FILE reads and fills an extraction cache, so a second run with the
+same file measures a warm cache. --pool-size runs on a private ExtractPool of that size, and
+--no-request-timeout keeps the timeout from the client (like SDKs without
+one), so timed-out calls run on until the stub answers.
+--request-delay and --extraction-timeout override course_extractor's
+REQUEST_DELAY and EXTRACTION_TIMEOUT, so pacing and timeout handling can
+be tuned without waiting on the production values.
+
+Usage:
+    python benchmarks/bench_extraction.py [--urls 20] [--latency 1.0] [--error-rate 0.05]
+                                          [--hang-rate 0.1 --hang-seconds 30 --extraction-timeout 5]
+                                          [--max-in-flight 8 --rate 4 --domain-rate 2] [--in-process]
+                                          [--batch-size 10 --per-url-latency 0.2 --domains 3 --group-by-domain]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import course_extractor  # noqa: E402
+from extraction_cache import ExtractionCache  # noqa: E402
+from firecrawl_stub import (  # noqa: E402
+    InProcessFirecrawl, StubFirecrawlClient, add_behaviour_arguments, behaviour_from_args
+)
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+
+class TimedClient:
+    """
+    Wraps a Firecrawl client and records how long every extract call takes.
+
+    Args:
+        client: Client to wrap
+        request_timeouts: Pass the pipeline's timeout on to the client
+    """
+
+    def __init__(self, client: Any, request_timeouts: bool = True):
+        self.client = client
+        self.request_timeouts = request_timeouts
+        self.durations: List[float] = []
+        self.started = 0
+        self.urls = 0
+        self._lock = threading.Lock()
+
+    def extract(self, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        with self._lock:
+            self.started += 1
+            self.urls += len(kwargs.get("urls") or [])
+        if self.request_timeouts and timeout is not None:
+            kwargs["timeout"] = timeout
+        started = time.perf_counter()
+        try:
+            return self.client.extract(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.durations.append(time.perf_counter() - started)
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size now (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ResourceSampler:
+    """Samples the thread count and RSS from a background thread (not counted itself)."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss_mb = _current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_threads = max(self.peak_threads, threading.active_count() - 1)
+            rss = _current_rss_mb()
+            if rss is not None:
+                self.peak_rss_mb = max(self.peak_rss_mb or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "ResourceSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[round(fraction * 100) - 1]
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+
+def run_pipeline(
+    client: Any,
+    urls: List[str],
+    request_timeouts: bool = True,
+    **pipeline_options: Any
+) -> Dict[str, Any]:
+    """Consume extract_course_details and measure it."""
+    timed = TimedClient(client, request_timeouts)
+    pool = pipeline_options.get("pool") or course_extractor.extract_pool
+    counts = {"courses": 0, "errors": 0, "timeouts": 0, "no_result": 0}
+    threads_before = threading.active_count()
+    rss_before = _current_rss_mb()
+
+    started = time.perf_counter()
+    with ResourceSampler() as sampler, contextlib.redirect_stdout(io.StringIO()):
+        for log, course in course_extractor.extract_course_details(timed, urls, **pipeline_options):
+            if course is not None:
+                counts["courses"] += 1
+            elif log.startswith("❌"):
+                counts["errors"] += 1
+            elif log.startswith("⏰"):
+                counts["timeouts"] += 1
+            elif log.startswith("⚠️"):
+                counts["no_result"] += 1
+    elapsed = time.perf_counter() - started
+    rss_after = _current_rss_mb()
+    pool_stats = pool.stats()
+
+    return {
+        **counts,
+        "seconds": elapsed,
+        "courses_per_min": counts["courses"] / elapsed * 60,
+        "calls": timed.started,
+        "urls_per_call": timed.urls / timed.started if timed.started else None,
+        "calls_unfinished": timed.started - len(timed.durations),
+        "p50": _percentile(timed.durations, 0.50),
+        "p95": _percentile(timed.durations, 0.95),
+        "p99": _percentile(timed.durations, 0.99),
+        "max": max(timed.durations, default=None),
+        "threads_before": threads_before,
+        "threads_peak": sampler.peak_threads,
+        "threads_after": threading.active_count(),
+        "pool": pool_stats,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": None if rss_before is None or rss_after is None else rss_after - rss_before,
+    }
+
+
+@contextlib.contextmanager
+def stub_client(args: argparse.Namespace):
+    """Yield a client for the stub (in-process, or a server in a child process)."""
+    behaviour = behaviour_from_args(args)
+    if args.in_process:
+        yield InProcessFirecrawl(**behaviour)
+        return
+
+    command = [sys.executable, os.path.join(BENCH_DIR, "firecrawl_stub.py"), "--port", "0"]
+    for name, value in behaviour.items():
+        if value is not None:
+            command += [f"--{name.replace('_', '-')}", str(value)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        api_url = server.stdout.readline().strip().rsplit(" ", 1)[-1]
+        if not api_url.startswith("http"):
+            raise RuntimeError("Firecrawl stub server did not start")
+        yield StubFirecrawlClient(api_url)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _format(value: Optional[float], spec: str, scale: float = 1) -> str:
+    return "-" if value is None else format(value * scale, spec)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--urls", type=int, default=20, help="Course URLs to extract")
+    parser.add_argument("--request-delay", type=float, help="Override course_extractor.REQUEST_DELAY (seconds)")
+    parser.add_argument("--extraction-timeout", type=float, help="Override course_extractor.EXTRACTION_TIMEOUT (seconds)")
+    parser.add_argument("--max-in-flight", type=int, default=course_extractor.DEFAULT_MAX_IN_FLIGHT,
+                        help="Extract calls running at the same time")
+    parser.add_argument("--rate", type=float, default=course_extractor.DEFAULT_RATE_LIMIT,
+                        help="Extract calls started per second (0 for no limit)")
+    parser.add_argument("--domain-rate", type=float,
+                        help="Extract calls started per second per domain (default: one per REQUEST_DELAY)")
+    parser.add_argument("--unordered", action="store_true", help="Yield results as they finish")
+    parser.add_argument("--batch-size", type=int, help="Maximum URLs per extract call (default: one per call)")
+    parser.add_argument("--fixed-batch", action="store_true", help="Always send --batch-size URLs (no adaptive sizing)")
+    parser.add_argument("--group-by-domain", action="store_true", help="Only batch URLs on the same domain together")
+    parser.add_argument("--domains", type=int, default=1, help="Course domains the URLs are spread over")
+    parser.add_argument("--cache", metavar="FILE", help="Read and fill an extraction cache at FILE")
+    parser.add_argument("--pool-size", type=int,
+                        help=f"Use a private ExtractPool of this size (default: the shared pool, "
+                             f"{course_extractor.EXTRACT_POOL_SIZE} threads)")
+    parser.add_argument("--no-request-timeout", action="store_true",
+                        help="Do not pass the timeout to the client; timed-out calls keep their thread")
+    parser.add_argument("--in-process", action="store_true", help="Use InProcessFirecrawl instead of the stub server")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.request_delay is not None:
+        course_extractor.REQUEST_DELAY = args.request_delay
+    if args.extraction_timeout is not None:
+        course_extractor.EXTRACTION_TIMEOUT = args.extraction_timeout
+
+    urls = [f"https://bench{i % max(1, args.domains)}.example.ac.uk/courses/course-{i}/" for i in range(args.urls)]
+    print(f"{len(urls)} URLs, stub latency {args.latency}±{args.jitter}s, error rate {args.error_rate:.0%}, "
+          f"hang rate {args.hang_rate:.0%}, REQUEST_DELAY {course_extractor.REQUEST_DELAY}s, "
+          f"EXTRACTION_TIMEOUT {course_extractor.EXTRACTION_TIMEOUT}s, max in flight {args.max_in_flight}, "
+          f"rate {args.rate or 'unlimited'}/s, {'unordered' if args.unordered else 'ordered'}, "
+          f"batch size {args.batch_size or 1}{' (fixed)' if args.fixed_batch else ''}, "
+          f"{'in-process' if args.in_process else 'stub server'}\n")
+
+    cache = ExtractionCache(args.cache) if args.cache else None
+    with stub_client(args) as client:
+        result = run_pipeline(
+            client, urls,
+            cache=cache,
+            request_timeouts=not args.no_request_timeout,
+            pool=course_extractor.ExtractPool(args.pool_size) if args.pool_size else None,
+            max_in_flight=args.max_in_flight,
+            rate=args.rate or None,
+            domain_rate=args.domain_rate,
+            ordered=not args.unordered,
+            batch_size=args.batch_size,
+            adaptive_batching=not args.fixed_batch,
+            group_by_domain=args.group_by_domain
+        )
+
+    print(f"courses/min      {result['courses_per_min']:.1f}  ({result['courses']} courses in {result['seconds']:.1f}s)")
+    print(f"outcomes         {result['courses']} courses, {result['errors']} errors, "
+          f"{result['timeouts']} timeouts, {result['no_result']} without data")
+    print(f"call latency     p50 {_format(result['p50'], '.0f', 1000)}ms  p95 {_format(result['p95'], '.0f', 1000)}ms  "
+          f"p99 {_format(result['p99'], '.0f', 1000)}ms  max {_format(result['max'], '.0f', 1000)}ms  "
+          f"({result['calls']} calls, {_format(result['urls_per_call'], '.1f')} URLs/call, "
+          f"{result['calls_unfinished']} still running)")
+    print(f"threads          {result['threads_before']} before, {result['threads_peak']} peak, "
+          f"{result['threads_after']} after")
+    pool = result["pool"]
+    print(f"pool             {pool['completed']} completed, {pool['failed']} failed, {pool['timed_out']} timed out, "
+          f"{pool['abandoned']} abandoned still running, {pool['threads']} threads")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"cache            {stats['hits']} hits, {stats['misses']} misses, {stats['stores']} stored, "
+              f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f}KB)")
+        cache.close()
+    print(f"memory           peak RSS {_format(result['peak_rss_mb'], '.0f')}MB, "
+          f"growth {_format(result['rss_growth_mb'], '+.1f')}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Benchmark the url_resolution resolvers against their original implementations.
+
+Checks that every resolver returns byte-for-byte the same result as the
+original urlparse + parse_qs + unquote version on a corpus of realistic and
+edge-case hrefs, then times:
+
+- original: the original resolver, one href at a time
+- resolver: the current resolver, one href at a time (no memo)
+- batch cold / batch warm: resolve_hrefs with an empty / primed memo cache
+
+Usage:
+    python benchmarks/bench_resolvers.py [--hrefs 2000] [--pages 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List, Optional
+from urllib.parse import parse_qs, quote, unquote, urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import university_config as uc  # noqa: E402
+
+
+# -----------------------------
+# Original Resolvers (reference)
+# -----------------------------
+
+def original_funnelback(href: str, base_url: str) -> Optional[str]:
+    if not href:
+        return None
+    parsed = urlparse(href)
+    if "redirect" in parsed.path or "funnelback" in parsed.netloc:
+        qs = parse_qs(parsed.query)
+        if "url" in qs and qs["url"]:
+            real_url = unquote(qs["url"][0])
+            if real_url.startswith("//"):
+                real_url = "https:" + real_url
+            elif real_url.startswith("/"):
+                real_url = urljoin(base_url, real_url)
+            return real_url
+    return urljoin(base_url, href) if href else None
+
+
+def original_derby(href: str, base_url: str) -> Optional[str]:
+    if not href:
+        return None
+    parsed = urlparse(href)
+    if "funnelback" in parsed.netloc and parsed.path.endswith("/redirect"):
+        qs = parse_qs(parsed.query)
+        if "url" in qs and qs["url"]:
+            return unquote(qs["url"][0])
+    return urljoin(base_url, href)
+
+
+def original_hw(href: str, base_url: str) -> Optional[str]:
+    if not href:
+        return None
+    if "url=" in href:
+        parsed = urlparse(href)
+        query = parse_qs(parsed.query)
+        encoded = query.get("url", [None])[0]
+        if encoded:
+            return unquote(encoded)
+    return urljoin(base_url, href) if href else None
+
+
+def original_canterbury(href: str, base_url: str) -> Optional[str]:
+    if not href:
+        return None
+    parsed = urlparse(href)
+    query = parse_qs(parsed.query)
+    raw_url = query.get("url", [None])[0]
+    if raw_url:
+        try:
+            return unquote(raw_url)
+        except Exception:
+            return None
+    return urljoin(base_url, href) if href else None
+
+
+PAIRS = [
+    ("funnelback", original_funnelback, uc.resolve_funnelback_redirect),
+    ("derby", original_derby, uc.resolve_derby_redirect),
+    ("hw", original_hw, uc.resolve_hw_redirect),
+    ("canterbury", original_canterbury, uc.resolve_canterbury_redirect),
+]
+
+BASE_URL = "https://www.example.ac.uk/course-search/"
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+
+EDGE_CASES = [
+    "", "/courses/a", "course/b?x=1", "https://other.ac.uk/c#frag",
+    "/s/redirect?url=", "/s/redirect?url", "/s/redirect?url=&url=%2Fsecond",
+    "/s/redirect?%75rl=%2Fencoded-key", "/s/redirect?u+rl=x&url=%2Fy",
+    "/s/redirect?url=a+b%2Bc", "/s/redirect?url=%252Fdouble", "/s/redirect?url=%2F%2Fcdn.example.com%2Fx",
+    "/s/redirect;params?url=%2Fp", "/s/redirect?a=1;url=%2Fsemicolon", "/s/redirect?&&url=%2Fempty-fields",
+    "/s/redirect?url=%E2%9C%93", "/s/redirect?url=%ZZ", "https://x.funnelback.com/s/redirect?url=https%3A%2F%2Fa",
+    "https://x.funnelback.com/s/redirect;x?url=%2Fa", "https://x.funnelback.com/other?url=%2Fa",
+    "/s/redirect?collection=c&url=https%3A%2F%2Fwww.example.ac.uk%2Fcourse%2F1&auth=abc&profile=_default",
+    "?url=%2Fquery-only", "/x?URL=%2Fupper", "/x?url=%2Fa#url=%2Ffrag",
+]
+
+
+def build_corpus(count: int, seed: int = 7) -> List[str]:
+    """Realistic Funnelback-style redirect hrefs plus edge cases."""
+    rng = random.Random(seed)
+    hrefs = list(EDGE_CASES)
+    for i in range(count):
+        target = f"https://www.example.ac.uk/courses/{rng.choice(['ug', 'pg'])}/course-{i}/"
+        host = rng.choice(["", "https://search.funnelback.com"])
+        hrefs.append(
+            f"{host}/s/redirect?collection=uni-courses&url={quote(target, safe='')}"
+            f"&auth={rng.getrandbits(64):x}&profile=_default&type=FP&index_url={quote(target, safe='')}"
+        )
+    return hrefs
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+
+def check_compatible(hrefs: List[str]) -> None:
+    for name, original, current in PAIRS:
+        for href in hrefs:
+            expected, actual = original(href, BASE_URL), current(href, BASE_URL)
+            if expected != actual:
+                raise AssertionError(f"{name} differs for {href!r}: {expected!r} != {actual!r}")
+        batch = uc.resolve_hrefs(hrefs, BASE_URL, current)
+        if batch != [original(href, BASE_URL) for href in hrefs]:
+            raise AssertionError(f"{name}: resolve_hrefs differs from the original resolver")
+    print(f"Compatible: {len(PAIRS)} resolvers x {len(hrefs)} hrefs give identical results")
+
+
+def _time(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(href_count: int, pages: int) -> None:
+    corpus = build_corpus(href_count)
+    check_compatible(corpus)
+
+    # A crawl sees the same hrefs again on later runs and repeated listing pages
+    workload = corpus * pages
+    print(f"\nWorkload: {len(workload)} hrefs ({len(corpus)} distinct)\n")
+    print(f"{'resolver':<12}{'original':>12}{'resolver':>12}{'batch cold':>12}{'batch warm':>12}   (hrefs/sec)")
+    for name, original, current in PAIRS:
+        uc._resolve_cached.cache_clear()
+        timings = [
+            _time(lambda: [original(href, BASE_URL) for href in workload]),
+            _time(lambda: [current(href, BASE_URL) for href in workload]),
+            _time(lambda: uc.resolve_hrefs(workload, BASE_URL, current)),
+            _time(lambda: uc.resolve_hrefs(workload, BASE_URL, current)),
+        ]
+        print(f"{name:<12}" + "".join(f"{len(workload) / t:>12,.0f}" for t in timings))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hrefs", type=int, default=2000, help="Distinct redirect hrefs")
+    parser.add_argument("--pages", type=int, default=20, help="Times the hrefs recur")
+    args = parser.parse_args(argv)
+    run(args.hrefs, args.pages)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Local stand-in for the part of the Firecrawl extract API that course_extractor uses.
+
+The server speaks the v1 job protocol:
+
+- POST /v1/extract with {"urls", "prompt", "schema", "enableWebSearch"}
+  returns {"success": true, "id": ...}
+- GET /v1/extract/<id> returns {"status": "processing"} until the job is
+  due, then {"status": "completed", "data": ...} or {"status": "failed", "error": ...}
+
+StubFirecrawlClient implements extract(urls, prompt, schema,
+enable_web_search, timeout) on top of it and returns an object with ``.data``,
+like the SDK. As in newer SDKs, a timeout stops the client waiting on the
+job and raises TimeoutError. Pass it to extract_course_details() in place of a Firecrawl client.
+InProcessFirecrawl returns the same responses with no server or sockets.
+
+Behaviour is configurable: latency with jitter, per-URL error rate, hangs
+(jobs that take hang_seconds, to trigger client timeouts) and payload size.
+For a schema with an array property of objects, a job returns one item per
+successful URL, each with its source_url. Any other schema gets a single
+object for the first URL, which is what the real API returns when it merges
+pages.
+
+Usage (standalone server):
+    python benchmarks/firecrawl_stub.py --port 3002 --latency 1.5 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# -----------------------------
+# Behaviour
+# -----------------------------
+DEFAULT_BEHAVIOUR = {
+    "latency": 1.0,  # seconds per extract job
+    "jitter": 0.2,  # +/- seconds
+    "per_url_latency": 0.0,  # extra seconds per URL in a multi-URL job
+    "error_rate": 0.0,  # fraction of URLs that fail
+    "hang_rate": 0.0,  # fraction of jobs that take hang_seconds
+    "hang_seconds": 120.0,
+    "payload_bytes": 2000,  # approximate size of each course's description
+    "seed": None,
+}
+LEVELS = ["Undergraduate", "Postgraduate", "Foundation", "Diploma"]
+
+
+class StubExtractError(Exception):
+    """Raised by the stub clients when an extract job fails (like the SDK's HTTP errors)."""
+
+
+class ExtractResponse:
+    """Result of an extract call: ``.data`` holds the extracted object or None."""
+
+    def __init__(self, success: bool, data: Any = None, status: str = "completed", error: Optional[str] = None):
+        self.success = success
+        self.data = data
+        self.status = status
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"ExtractResponse(success={self.success}, status={self.status!r})"
+
+
+def _array_property(schema: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Name of the schema's top-level array-of-objects property, if any."""
+    for name, prop in ((schema or {}).get("properties") or {}).items():
+        if prop.get("type") == "array" and (prop.get("items") or {}).get("type") == "object":
+            return name
+    return None
+
+
+def make_course(url: str, payload_bytes: int) -> Dict[str, Any]:
+    """Deterministic fake course for a URL."""
+    slug = re.sub(r"[^a-z0-9]+", " ", url.rstrip("/").rsplit("/", 1)[-1].lower()).strip() or "course"
+    seed = sum(url.encode("utf-8"))
+    sentence = f"This {slug} programme covers theory, practice and an independent project. "
+    return {
+        "course_name": slug.title(),
+        "level": LEVELS[seed % len(LEVELS)],
+        "fees": f"UK £{9000 + seed % 500 * 10}; International £{15000 + seed % 900 * 10}",
+        "intake_date": "September 2026",
+        "requirements": "112 UCAS points or equivalent",
+        "description": (sentence * (payload_bytes // len(sentence) + 1))[:payload_bytes],
+        "duration": f"{3 + seed % 2} years",
+    }
+
+
+class StubExtractService:
+    """
+    Decides what each extract job returns and how long it takes.
+
+    Thread-safe; shared by the HTTP server and InProcessFirecrawl.
+    """
+
+    def __init__(self, **behaviour: Any):
+        unknown = set(behaviour) - set(DEFAULT_BEHAVIOUR)
+        if unknown:
+            raise ValueError(f"Unknown stub behaviour: {', '.join(sorted(unknown))}")
+        self.behaviour = {**DEFAULT_BEHAVIOUR, **behaviour}
+        self._random = random.Random(self.behaviour["seed"])
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.urls = 0
+
+    def plan(self, urls: List[str], schema: Optional[Dict[str, Any]]) -> Tuple[float, Dict[str, Any]]:
+        """
+        Outcome of a job.
+
+        Returns:
+            Tuple of (seconds until the job completes, final job status payload)
+        """
+        if not urls:
+            raise ValueError("urls must be a non-empty list")
+        b = self.behaviour
+        with self._lock:
+            self.jobs += 1
+            self.urls += len(urls)
+            hang = self._random.random() < b["hang_rate"]
+            jitter = self._random.uniform(-b["jitter"], b["jitter"])
+            failed = {url for url in urls if self._random.random() < b["error_rate"]}
+
+        duration = b["hang_seconds"] if hang else max(0.0, b["latency"] + jitter + b["per_url_latency"] * (len(urls) - 1))
+        succeeded = [url for url in urls if url not in failed]
+        if not succeeded:
+            return duration, {"success": False, "status": "failed", "error": f"Failed to extract {', '.join(urls)}"}
+
+        array_property = _array_property(schema)
+        if array_property:
+            items = [{**make_course(url, b["payload_bytes"]), "source_url": url} for url in succeeded]
+            data = {array_property: items}
+        else:
+            data = make_course(succeeded[0], b["payload_bytes"])
+        return duration, {"success": True, "status": "completed", "data": data}
+
+
+# -----------------------------
+# HTTP Server
+# -----------------------------
+
+class FirecrawlStubServer:
+    """
+    Firecrawl extract API stand-in on 127.0.0.1, served from a background thread.
+
+    Jobs are due latency seconds after they are submitted; polls before then
+    report "processing", so no server thread sleeps.
+    """
+
+    def __init__(self, service: StubExtractService, port: int = 0):
+        self.service = service
+        self._jobs: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self.api_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FirecrawlStubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/extract":
+                    self._send(404, {"success": False, "error": "Not found"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    duration, outcome = server.service.plan(body.get("urls") or [], body.get("schema"))
+                except ValueError as e:
+                    self._send(400, {"success": False, "error": str(e)})
+                    return
+                job_id = uuid.uuid4().hex
+                with server._lock:
+                    server._jobs[job_id] = (time.monotonic() + duration, outcome)
+                self._send(200, {"success": True, "id": job_id})
+
+            def do_GET(self):
+                match = re.fullmatch(r"/v1/extract/([0-9a-f]+)", self.path)
+                with server._lock:
+                    job = server._jobs.get(match.group(1)) if match else None
+                if job is None:
+                    self._send(404, {"success": False, "error": "Job not found"})
+                    return
+                due, outcome = job
+                if time.monotonic() < due:
+                    self._send(200, {"success": True, "status": "processing"})
+                    return
+                with server._lock:
+                    server._jobs.pop(match.group(1), None)
+                self._send(200, outcome)
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+# -----------------------------
+# Clients
+# -----------------------------
+
+class StubFirecrawlClient:
+    """
+    Minimal Firecrawl client for the stub server (extract only).
+
+    Args:
+        api_url: Stub server URL
+        api_key: Sent as a bearer token, like the SDK (ignored by the stub)
+        poll_interval: Seconds between job status polls
+        request_timeout: Socket timeout per HTTP request
+    """
+
+    def __init__(self, api_url: str, api_key: str = "stub", poll_interval: float = 0.05, request_timeout: float = 30):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.poll_interval = poll_interval
+        self.request_timeout = request_timeout
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        request = urllib.request.Request(
+            self.api_url + path,
+            data=json.dumps(payload).encode("utf-8") if payload is not None else None,
+            method=method,
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.request_timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise StubExtractError(f"HTTP {e.code}: {e.read().decode('utf-8', 'replace')}") from None
+
+    def extract(
+        self,
+        urls: List[str],
+        prompt: Optional[str] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        enable_web_search: bool = False,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> ExtractResponse:
+        """Submit an extract job and wait for it to finish (at most timeout seconds)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = self._request("POST", "/v1/extract", {
+            "urls": urls, "prompt": prompt, "schema": schema, "enableWebSearch": enable_web_search,
+        })
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Extract job {job['id']} did not finish within {timeout}s")
+            status = self._request("GET", f"/v1/extract/{job['id']}")
+            if status.get("status") == "completed":
+                return ExtractResponse(True, status.get("data"))
+            if status.get("status") == "failed":
+                raise StubExtractError(status.get("error") or "Extract job failed")
+            time.sleep(self.poll_interval)
+
+
+class InProcessFirecrawl:
+    """Same responses as the stub server, without HTTP (sleeps for the job's duration)."""
+
+    def __init__(self, service: Optional[StubExtractService] = None, **behaviour: Any):
+        self.service = service or StubExtractService(**behaviour)
+
+    def extract(
+        self,
+        urls: List[str],
+        prompt: Optional[str] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        enable_web_search: bool = False,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> ExtractResponse:
+        duration, outcome = self.service.plan(urls, schema)
+        if timeout is not None and duration > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Extract job did not finish within {timeout}s")
+        time.sleep(duration)
+        if not outcome["success"]:
+            raise StubExtractError(outcome["error"])
+        return ExtractResponse(True, outcome["data"])
+
+
+# -----------------------------
+# Command Line
+# -----------------------------
+
+def add_behaviour_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the stub behaviour options to a parser."""
+    parser.add_argument("--latency", type=float, default=DEFAULT_BEHAVIOUR["latency"], help="Seconds per extract job")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_BEHAVIOUR["jitter"], help="Random +/- latency (seconds)")
+    parser.add_argument("--per-url-latency", type=float, default=DEFAULT_BEHAVIOUR["per_url_latency"],
+                        help="Extra seconds per additional URL in a job")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_BEHAVIOUR["error_rate"],
+                        help="Fraction of URLs that fail")
+    parser.add_argument("--hang-rate", type=float, default=DEFAULT_BEHAVIOUR["hang_rate"],
+                        help="Fraction of jobs that hang")
+    parser.add_argument("--hang-seconds", type=float, default=DEFAULT_BEHAVIOUR["hang_seconds"],
+                        help="How long a hanging job takes")
+    parser.add_argument("--payload-bytes", type=int, default=DEFAULT_BEHAVIOUR["payload_bytes"],
+                        help="Approximate description size per course")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible errors and hangs")
+
+
+def behaviour_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    return {name: getattr(args, name) for name in DEFAULT_BEHAVIOUR}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=3002, help="Port to listen on (0 picks a free port)")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FirecrawlStubServer(StubExtractService(**behaviour_from_args(args)), port=args.port)
+    print(f"Firecrawl stub listening on {server.api_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
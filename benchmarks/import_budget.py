@@ -0,0 +1,153 @@
+"""
+Import-time budget for the app's modules and the Streamlit entry points.
+
+Streamlit reruns the whole script on every widget interaction, so the
+entry points must not import Playwright, Firecrawl or pyarrow at module
+level. This script:
+
+- checks that st.py / streamlit_app.py only import the heavy modules lazily
+  (no module-level import of them)
+- checks that light modules do not pull heavy dependencies in on import
+- measures each module's cold import time in a fresh interpreter (median of
+  several runs) and compares it with its budget
+
+Exits with status 1 if any check fails, so it can run in CI.
+
+Usage:
+    python benchmarks/import_budget.py [--runs 5]
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -----------------------------
+# Budgets
+# -----------------------------
+ENTRY_POINTS = ["st.py", "streamlit_app.py"]
+HEAVY_MODULES = ("extractor", "course_extractor", "playwright", "firecrawl", "pyarrow", "pydantic")
+
+# Cold import budget per module (ms); generous enough for a Streamlit Cloud container
+IMPORT_BUDGET_MS: Dict[str, int] = {
+    "university_config": 50,
+    "url_canonical": 50,
+    "url_history": 50,
+    "columnar_output": 50,
+    "extraction_cache": 50,
+    "course_extractor": 600,
+    "extractor": 1500,
+}
+
+# Modules that must stay unloaded after importing a module
+MUST_NOT_LOAD: Dict[str, List[str]] = {
+    "university_config": ["playwright", "firecrawl", "pyarrow"],
+    "columnar_output": ["pyarrow"],
+    "extraction_cache": ["pydantic", "firecrawl", "pyarrow"],
+    "course_extractor": ["firecrawl", "playwright", "pyarrow"],
+    "extractor": ["firecrawl", "pyarrow"],
+}
+
+
+# -----------------------------
+# Checks
+# -----------------------------
+
+def module_level_imports(path: str) -> List[str]:
+    """
+    Top-level module names imported unconditionally at module level.
+
+    Imports inside top-level try blocks count; imports under an ``if`` (for
+    example a button handler) or inside functions are lazy and do not.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    names = []
+
+    def visit(statements) -> None:
+        for node in statements:
+            if isinstance(node, ast.Import):
+                names.extend(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                names.append(node.module.split(".")[0])
+            elif isinstance(node, (ast.Try, ast.With)):
+                for block in ("body", "orelse", "finalbody"):
+                    visit(getattr(node, block, []))
+                for handler in getattr(node, "handlers", []):
+                    visit(handler.body)
+
+    visit(tree.body)
+    return names
+
+
+def check_entry_points() -> List[str]:
+    failures = []
+    for entry_point in ENTRY_POINTS:
+        path = os.path.join(ROOT, entry_point)
+        if not os.path.exists(path):
+            continue
+        eager = sorted(set(module_level_imports(path)) & set(HEAVY_MODULES))
+        status = "ok" if not eager else "FAIL"
+        print(f"{entry_point:<24} module-level heavy imports: {', '.join(eager) or 'none':<30} {status}")
+        if eager:
+            failures.append(f"{entry_point} imports {', '.join(eager)} at module level")
+    return failures
+
+
+def measure_import(module: str) -> Optional[Dict[str, object]]:
+    """Import a module in a fresh interpreter; None if a dependency is missing."""
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - started) * 1000\n"
+        "print(elapsed)\n"
+        "print(','.join(sorted({name.split('.')[0] for name in sys.modules})))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    elapsed, loaded = result.stdout.strip().splitlines()[-2:]
+    return {"ms": float(elapsed), "loaded": set(loaded.split(","))}
+
+
+def check_modules(runs: int) -> List[str]:
+    failures = []
+    print(f"\n{'module':<20}{'median ms':>10}{'budget':>8}   result")
+    for module, budget in IMPORT_BUDGET_MS.items():
+        samples = [measure_import(module) for _ in range(runs)]
+        if any(sample is None for sample in samples):
+            print(f"{module:<20}{'-':>10}{budget:>8}   skipped (dependency not installed)")
+            continue
+        median = statistics.median(sample["ms"] for sample in samples)
+        leaked = sorted(set(MUST_NOT_LOAD.get(module, [])) & samples[0]["loaded"])
+        problems = []
+        if median > budget:
+            problems.append(f"over budget by {median - budget:.0f}ms")
+        if leaked:
+            problems.append(f"loads {', '.join(leaked)}")
+        print(f"{module:<20}{median:>10.0f}{budget:>8}   {'; '.join(problems) or 'ok'}")
+        failures.extend(f"{module}: {problem}" for problem in problems)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check import-time budgets.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter imports per module")
+    args = parser.parse_args(argv)
+
+    failures = check_entry_points() + check_modules(max(1, args.runs))
+    if failures:
+        print("\nImport budget exceeded:\n  " + "\n  ".join(failures))
+        return 1
+    print("\nAll import budgets met")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Columnar (Parquet / Arrow IPC) output for discovered links and extracted courses.
+
+Datasets are written under output_links_files/dataset/<links|courses>/ and
+partitioned by university, Hive style (university=<folder_name>/). Every
+write adds a new part file, so runs append instead of rewriting earlier
+output, and the whole history can be scanned with read_columnar().
+
+Requires pyarrow (optional dependency: pip install pyarrow).
+"""
+import importlib.util
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from university_config import get_config_for_url
+
+# pyarrow is imported on first use (see _require_pyarrow), keeping this module cheap to import
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+pa = pa_dataset = pq = None
+
+
+# -----------------------------
+# Constants
+# -----------------------------
+DATASET_ROOT = os.path.join("output_links_files", "dataset")
+COLUMNAR_FORMATS = ("parquet", "arrow")
+PARTITION_KEY = "university"
+COURSE_FIELDS = ["course_name", "level", "fees", "intake_date", "requirements", "description", "duration", "source_url"]
+
+
+# -----------------------------
+# Schemas
+# -----------------------------
+
+def _require_pyarrow(fmt: str) -> None:
+    """Check the format, then import pyarrow (once)."""
+    global pa, pa_dataset, pq
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format '{fmt}'. Expected one of: {', '.join(COLUMNAR_FORMATS)}")
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for Parquet/Arrow output (pip install pyarrow)")
+    if pa is None:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+        pa, pa_dataset, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+
+
+def links_schema() -> "pa.Schema":
+    """Columns of the links export CSV (without its index column)."""
+    return pa.schema([
+        ("url", pa.string()),
+        ("university_id", pa.int32()),
+        ("university_name", pa.string()),
+        ("discovered_via", pa.string()),
+        ("link_group_type", pa.string()),
+        ("confidence_score", pa.float64()),
+        ("status", pa.string()),
+        ("extracted_at", pa.timestamp("us")),
+        ("error_message", pa.string()),
+    ])
+
+
+def courses_schema() -> "pa.Schema":
+    """Columns of CourseSchema plus the extraction time."""
+    return pa.schema([(name, pa.string()) for name in COURSE_FIELDS] + [("extracted_at", pa.timestamp("us"))])
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+
+def _part_path(root: str, dataset: str, partition: str, fmt: str) -> str:
+    """New part file path inside a university partition."""
+    folder = os.path.join(root, dataset, f"{PARTITION_KEY}={partition}")
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    extension = "parquet" if fmt == "parquet" else "arrow"
+    return os.path.join(folder, f"part-{stamp}-{uuid.uuid4().hex[:8]}.{extension}")
+
+
+def _write_table(table: "pa.Table", path: str, fmt: str) -> None:
+    if fmt == "parquet":
+        pq.write_table(table, path, compression="zstd")
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def write_links_columnar(
+    urls: List[str],
+    university_name: str,
+    folder_name: str,
+    university_id: int = 1,
+    discovered_via: str = "unified-extractor",
+    fmt: str = "parquet",
+    root: str = DATASET_ROOT
+) -> Optional[str]:
+    """
+    Append discovered course URLs to the links dataset.
+
+    Args:
+        urls: Course URLs to write
+        university_name: Name of the university
+        folder_name: University folder name (the partition value)
+        university_id: University ID
+        discovered_via: How the URLs were discovered
+        fmt: "parquet" or "arrow"
+        root: Dataset root folder
+
+    Returns:
+        Path of the written part file, or None if there were no URLs
+
+    Raises:
+        ValueError: If fmt is unknown
+        ImportError: If pyarrow is not installed
+    """
+    _require_pyarrow(fmt)
+    if not urls:
+        return None
+
+    n = len(urls)
+    schema = links_schema()
+    table = pa.table({
+        "url": pa.array(urls, pa.string()),
+        "university_id": pa.repeat(pa.scalar(university_id, pa.int32()), n),
+        "university_name": pa.repeat(pa.scalar(university_name, pa.string()), n),
+        "discovered_via": pa.repeat(pa.scalar(discovered_via, pa.string()), n),
+        "link_group_type": pa.nulls(n, pa.string()),
+        "confidence_score": pa.nulls(n, pa.float64()),
+        "status": pa.repeat(pa.scalar("pending", pa.string()), n),
+        "extracted_at": pa.repeat(pa.scalar(datetime.now(), pa.timestamp("us")), n),
+        "error_message": pa.nulls(n, pa.string()),
+    }, schema=schema)
+
+    path = _part_path(root, "links", folder_name, fmt)
+    _write_table(table, path, fmt)
+    print(f"[✔] Appended {n} URLs to {fmt} dataset: {path}")
+    return path
+
+
+def _course_partition(course: Dict[str, Any]) -> str:
+    """University folder name for a course, from its source URL."""
+    source_url = course.get("source_url") or ""
+    config = get_config_for_url(source_url) if source_url else None
+    if config and config.get("folder_name"):
+        return config["folder_name"]
+    return urlparse(source_url).netloc or "unknown"
+
+
+def write_courses_columnar(
+    courses: Iterable[Dict[str, Any]],
+    fmt: str = "parquet",
+    root: str = DATASET_ROOT
+) -> List[str]:
+    """
+    Append extracted courses to the courses dataset, one part file per university.
+
+    Args:
+        courses: Course dictionaries (CourseSchema fields)
+        fmt: "parquet" or "arrow"
+        root: Dataset root folder
+
+    Returns:
+        Paths of the written part files
+
+    Raises:
+        ValueError: If fmt is unknown
+        ImportError: If pyarrow is not installed
+    """
+    _require_pyarrow(fmt)
+    partitions: Dict[str, Dict[str, List[Any]]] = {}
+    for course in courses:
+        columns = partitions.setdefault(_course_partition(course), {name: [] for name in COURSE_FIELDS})
+        for name in COURSE_FIELDS:
+            value = course.get(name)
+            columns[name].append(None if value is None else str(value))
+
+    extracted_at = pa.scalar(datetime.now(), pa.timestamp("us"))
+    paths = []
+    for partition, columns in partitions.items():
+        n = len(columns["source_url"])
+        table = pa.table({**columns, "extracted_at": pa.repeat(extracted_at, n)}, schema=courses_schema())
+        path = _part_path(root, "courses", partition, fmt)
+        _write_table(table, path, fmt)
+        paths.append(path)
+    if paths:
+        print(f"[✔] Appended courses to {len(paths)} {fmt} partition(s) under {os.path.join(root, 'courses')}")
+    return paths
+
+
+# -----------------------------
+# Readers
+# -----------------------------
+
+def read_columnar(dataset: str = "links", fmt: str = "parquet", root: str = DATASET_ROOT) -> "pa.Table":
+    """
+    Read every run of a dataset as one table (with a "university" partition column).
+
+    Args:
+        dataset: "links" or "courses"
+        fmt: "parquet" or "arrow"
+        root: Dataset root folder
+
+    Returns:
+        pyarrow Table
+    """
+    _require_pyarrow(fmt)
+    return pa_dataset.dataset(
+        os.path.join(root, dataset),
+        format="parquet" if fmt == "parquet" else "ipc",
+        partitioning="hive",
+        exclude_invalid_files=True,
+    ).to_table()
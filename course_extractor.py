@@ -2,22 +2,31 @@
 import os
 import time
 import json
+import asyncio
+import functools
+import inspect
+import itertools
+import queue
 import threading
-from typing import List, Optional, Generator, Tuple, Dict, Any
+from typing import List, Optional, Generator, Tuple, Dict, Any, AsyncIterator, Callable
+from urllib.parse import urlparse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
-try:
-    from firecrawl.firecrawl import FirecrawlApp as FirecrawlClient
-except ImportError:
-    from firecrawl import Firecrawl as FirecrawlClient
+from columnar_output import write_courses_columnar
+from extraction_cache import CACHE_FILE, ExtractionCache, extraction_fingerprint
+from url_canonical import dedup_key
 
 
 # -----------------------------
 # Constants
 # -----------------------------
 EXTRACTION_TIMEOUT = 60  # seconds
-REQUEST_DELAY = 3  # seconds between requests
+REQUEST_DELAY = 3  # seconds between extract calls for the same course domain
+DEFAULT_MAX_IN_FLIGHT = 4  # extract calls running at the same time
+DEFAULT_RATE_LIMIT = 2.0  # extract calls started per second, across all domains
+EXTRACT_POOL_SIZE = 8  # Firecrawl calls outstanding at once, across the whole process
+MIN_BATCH_SIZE = 2  # smallest multi-URL extract job the adaptive batch size shrinks to
 OUTPUT_FILE = "courses_full.json"
 
 
@@ -37,10 +46,337 @@ class CourseSchema(BaseModel):
     source_url: Optional[str] = Field(None, description="URL of the course page")
 
 
+# -----------------------------
+# Rate Limiting
+# -----------------------------
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` tokens per second, holding at most ``burst``.
+    
+    A rate of None or 0 never waits.
+    """
+    
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+    
+    async def acquire(self) -> None:
+        """Wait for a token and take it."""
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Global plus per-domain token buckets for extract calls.
+    
+    Args:
+        rate: Calls per second across all domains (None for no limit)
+        domain_rate: Calls per second per URL domain (None for no limit)
+        burst: Calls the global bucket lets through at once; domain buckets allow one
+    """
+    
+    def __init__(self, rate: Optional[float], domain_rate: Optional[float] = None, burst: int = 1):
+        self.domain_rate = domain_rate
+        self._global = TokenBucket(rate, burst)
+        self._domains: Dict[str, TokenBucket] = {}
+    
+    async def acquire(self, *urls: str) -> None:
+        """
+        Wait until a call for urls is allowed.
+        
+        A multi-URL call takes one token from the bucket of each distinct
+        domain among urls and one from the global bucket.
+        """
+        if self.domain_rate:
+            for domain in dict.fromkeys(_url_domain(url) for url in urls):
+                bucket = self._domains.get(domain)
+                if bucket is None:
+                    bucket = self._domains[domain] = TokenBucket(self.domain_rate)
+                await bucket.acquire()
+        await self._global.acquire()
+
+
+def _url_domain(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+# -----------------------------
+# Worker Pool
+# -----------------------------
+
+class _PoolJob:
+    __slots__ = ("fn", "started", "result", "state", "abandoned")
+    
+    def __init__(self, fn: Callable[[], Any], loop: asyncio.AbstractEventLoop):
+        self.fn = fn
+        self.started = loop.create_future()
+        self.result = loop.create_future()
+        self.state = "queued"  # -> "running" -> "done", or "cancelled" before it runs
+        self.abandoned = False
+
+
+def _resolve(future: asyncio.Future, value: Any = None, error: Optional[BaseException] = None) -> None:
+    """Complete an asyncio future from a pool thread, unless it was cancelled or its loop closed."""
+    def apply() -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+    try:
+        future.get_loop().call_soon_threadsafe(apply)
+    except RuntimeError:  # the run's event loop has already closed
+        pass
+
+
+async def _within(future: asyncio.Future, timeout: float) -> None:
+    """
+    Wait for future, raising asyncio.TimeoutError after timeout seconds.
+    
+    Unlike asyncio.wait_for, this never swallows a cancellation that arrives
+    just as the future completes, and leaves the future alone on timeout.
+    """
+    done, _ = await asyncio.wait((future,), timeout=timeout)
+    if not done:
+        raise asyncio.TimeoutError
+
+
+class ExtractPool:
+    """
+    Bounded pool of daemon threads for blocking Firecrawl extract calls.
+    
+    At most ``max_workers`` calls are outstanding at once, across every
+    extraction run in the process. A thread can't be killed, so a call that
+    times out keeps its thread until the client returns. It still counts
+    against the cap, and later calls wait for a free thread instead of
+    starting new ones. Slow or hung calls therefore never grow the process
+    past max_workers threads. The threads are daemons, so they never hold the
+    interpreter open at exit, and a thread idle for ``idle_timeout`` seconds exits.
+    
+    Usage:
+        result = await extract_pool.run(call, timeout=60)
+        extract_pool.stats()
+    
+    Args:
+        max_workers: Hard cap on outstanding calls (running or abandoned)
+        idle_timeout: Seconds an idle thread waits for work before exiting
+    """
+    
+    def __init__(self, max_workers: int = EXTRACT_POOL_SIZE, idle_timeout: float = 30):
+        self.max_workers = max(1, max_workers)
+        self.idle_timeout = idle_timeout
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._names = itertools.count(1)
+        self._threads = 0
+        self._idle = 0
+        self._counts = {
+            "queued": 0, "active": 0, "abandoned": 0,
+            "completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0,
+        }
+    
+    async def run(self, fn: Callable[[], Any], timeout: float) -> Any:
+        """
+        Run fn on a pool thread and wait at most ``timeout`` seconds for it.
+        
+        The timeout starts when a thread picks the call up. Waiting for a free
+        thread is limited to timeout as well, and a call still queued when
+        that runs out, or whose caller is cancelled, never starts.
+        
+        Returns:
+            What fn returned (its exception is raised instead)
+            
+        Raises:
+            asyncio.TimeoutError: If no thread became free in time or the call overran
+        """
+        job = _PoolJob(fn, asyncio.get_running_loop())
+        with self._lock:
+            self._counts["queued"] += 1
+            self._jobs.put(job)
+            if self._counts["queued"] > self._idle and self._threads < self.max_workers:
+                self._threads += 1
+                threading.Thread(
+                    target=self._work, name=f"course-extract-{next(self._names)}", daemon=True
+                ).start()
+        try:
+            await _within(job.started, timeout)
+            await _within(job.result, timeout)
+        except asyncio.TimeoutError:
+            self._give_up(job, timed_out=True)
+            raise
+        except asyncio.CancelledError:
+            self._give_up(job, timed_out=False)
+            raise
+        return job.result.result()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Pool load and totals since start.
+        
+        Returns:
+            Dictionary with queued, active (running, abandoned included),
+            abandoned (timed out or cancelled but still running), completed,
+            failed, timed_out (by the pool or the client's own timeout),
+            cancelled and threads
+        """
+        with self._lock:
+            return {**self._counts, "threads": self._threads}
+    
+    def _give_up(self, job: _PoolJob, timed_out: bool) -> None:
+        # Nobody will read these now; the pool thread skips settling cancelled futures
+        job.started.cancel()
+        job.result.cancel()
+        with self._lock:
+            if job.state == "queued":
+                job.state = "cancelled"
+                self._counts["queued"] -= 1
+            elif job.state == "running" and not job.abandoned:
+                job.abandoned = True
+                self._counts["abandoned"] += 1
+            else:
+                return
+            self._counts["timed_out" if timed_out else "cancelled"] += 1
+    
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                self._idle += 1
+            try:
+                job = self._jobs.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._idle -= 1
+                    if not self._counts["queued"]:
+                        self._threads -= 1
+                        return
+                continue
+            with self._lock:
+                self._idle -= 1
+                if job.state != "queued":
+                    continue
+                job.state = "running"
+                self._counts["queued"] -= 1
+                self._counts["active"] += 1
+            _resolve(job.started)
+            value, error = None, None
+            try:
+                value = job.fn()
+            except Exception as e:
+                error = e
+            with self._lock:
+                job.state = "done"
+                self._counts["active"] -= 1
+                if job.abandoned:
+                    self._counts["abandoned"] -= 1
+                else:
+                    outcome = "completed" if error is None else "timed_out" if isinstance(error, TimeoutError) else "failed"
+                    self._counts[outcome] += 1
+            _resolve(job.result, value, error)
+
+
+# Shared by every extraction run in the process (and so every Streamlit session)
+extract_pool = ExtractPool()
+
+
+# -----------------------------
+# Batching
+# -----------------------------
+
+class AdaptiveBatchSize:
+    """
+    Size of multi-URL extract jobs, steered by observed latency.
+    
+    Keeps a moving average of seconds per URL over completed jobs and sizes
+    the next job to finish within ``target_latency``, at most doubling at a
+    time. A failed or timed-out job halves the size (down to MIN_BATCH_SIZE).
+    
+    Args:
+        maximum: Largest batch size
+        target_latency: Seconds a batch should take
+        adaptive: Adjust the size from observed latency; otherwise always use maximum
+    """
+    
+    def __init__(self, maximum: int, target_latency: float, adaptive: bool = True):
+        self.maximum = max(1, maximum)
+        self.minimum = min(MIN_BATCH_SIZE, self.maximum)
+        self.target_latency = target_latency
+        self.adaptive = adaptive
+        self.size = self.minimum if adaptive else self.maximum
+        self.seconds_per_url: Optional[float] = None
+    
+    def record(self, urls: int, latency: float, ok: bool) -> None:
+        """Adjust the size after a job of ``urls`` URLs took ``latency`` seconds."""
+        if not self.adaptive:
+            return
+        if not ok:
+            self.size = max(self.minimum, self.size // 2)
+            return
+        sample = latency / max(1, urls)
+        if self.seconds_per_url is None:
+            self.seconds_per_url = sample
+        else:
+            self.seconds_per_url = 0.7 * self.seconds_per_url + 0.3 * sample
+        fits = int(self.target_latency / self.seconds_per_url) if self.seconds_per_url > 0 else self.maximum
+        self.size = max(self.minimum, min(self.maximum, self.size * 2, fits))
+
+
+def _take_batch(
+    remaining: List[Tuple[int, str]],
+    size: int,
+    group_by_domain: bool
+) -> List[Tuple[int, str]]:
+    """
+    Remove the next batch of (index, url) pairs from remaining.
+    
+    With group_by_domain, the batch only holds URLs on the domain of the
+    first remaining URL, in input order.
+    """
+    if not group_by_domain or size <= 1:
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+    domain = _url_domain(remaining[0][1])
+    batch, rest = [], []
+    for pair in remaining:
+        if len(batch) < size and _url_domain(pair[1]) == domain:
+            batch.append(pair)
+        else:
+            rest.append(pair)
+    remaining[:] = rest
+    return batch
+
+
 # -----------------------------
 # Extraction Functions
 # -----------------------------
 
+def get_firecrawl_client_class() -> type:
+    """
+    Import the Firecrawl client class on first use.
+    
+    The SDK is slow to import, so it is only loaded when an extraction
+    actually needs a client.
+    """
+    try:
+        from firecrawl.firecrawl import FirecrawlApp as FirecrawlClient
+    except ImportError:
+        from firecrawl import Firecrawl as FirecrawlClient
+    return FirecrawlClient
+
+
 def _get_extraction_schema() -> Dict[str, Any]:
     """Get the schema for course extraction."""
     return {
@@ -67,93 +403,367 @@ def _get_extraction_prompt() -> str:
     )
 
 
-def extract_course_details(
-    fc: FirecrawlClient,
-    course_urls: List[str]
-) -> Generator[Tuple[Optional[str], Optional[Dict[str, Any]]], None, None]:
+def _get_batch_extraction_schema() -> Dict[str, Any]:
+    """Get the schema for multi-URL extraction: a courses array tagged with source_url."""
+    course = _get_extraction_schema()
+    item = {
+        **course,
+        "properties": {**course["properties"], "source_url": {"type": "string"}},
+        "required": course["required"] + ["source_url"]
+    }
+    return {
+        "type": "object",
+        "properties": {"courses": {"type": "array", "items": item}},
+        "required": ["courses"]
+    }
+
+
+def _get_batch_extraction_prompt() -> str:
+    """Get the prompt for multi-URL extraction."""
+    return (
+        "Extract full details of the course on each of these pages: course name, level, fees (UK and International"
+        " if available), intake / year of entry, entry requirements, full description, duration."
+        " Return one object per course in courses, with source_url set to the URL of the page it was found on."
+    )
+
+
+def _get_extraction_fingerprint() -> str:
+    """Fingerprint of every prompt and schema, so cached results go stale when any of them changes."""
+    return extraction_fingerprint(
+        _get_extraction_prompt(),
+        _get_extraction_schema(),
+        _get_batch_extraction_prompt(),
+        _get_batch_extraction_schema()
+    )
+
+
+def _batch_items(data: Any) -> List[Dict[str, Any]]:
+    """Course dicts in a multi-URL result: the courses array, a bare list or a single course."""
+    if isinstance(data, dict):
+        data = data.get("courses", [data])
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, dict)]
+
+
+def _accepts_timeout(method: Callable[..., Any]) -> bool:
+    """Whether a client's extract() takes a named timeout (newer SDKs stop polling once it runs out)."""
+    try:
+        parameter = inspect.signature(method).parameters.get("timeout")
+    except (TypeError, ValueError):
+        return False
+    return parameter is not None and parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+
+
+def _extract_call(fc: Any, urls: List[str], prompt: str, schema: Dict[str, Any], timeout: float) -> Callable[[], Any]:
     """
-    Generator that yields progress logs and course data one at a time.
+    Bind one fc.extract call for the pool.
+    
+    The timeout is passed to the client as well when it accepts one, so a
+    call the pool gives up on also stops in the client and frees its thread.
+    """
+    kwargs = {"urls": urls, "prompt": prompt, "schema": schema, "enable_web_search": False}
+    if _accepts_timeout(fc.extract):
+        kwargs["timeout"] = timeout
+    return functools.partial(fc.extract, **kwargs)
+
+
+async def _extract_url_events(
+    fc: Any,
+    url: str,
+    pool: ExtractPool,
+    timeout: float
+) -> List[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+    """
+    Run one Firecrawl extract call on the pool and turn its outcome into events.
+    
+    Returns:
+        The (log_message, course_dict) events for this URL, after its start log
+    """
+    print(f"\n\nStarting extraction for: {url}", end="\n\n")
+    call = _extract_call(fc, [url], _get_extraction_prompt(), _get_extraction_schema(), timeout)
+    try:
+        result = await pool.run(call, timeout)
+    except asyncio.TimeoutError:
+        print(f"Extraction timed out for: {url}")
+        return [(f"⏰ Timeout extracting {url} ({timeout}s limit)", None)]
+    except Exception as e:
+        print(f"Error extracting {url}: \nraised error--> {e}")
+        return [(f"❌ Error extracting {url}: {e}", None)]
+    
+    if not result:
+        print(f"No result for: {url}")
+        return [(f"⚠️ No result for {url}", None)]
+    print(f"Extraction completed for: {url}")
+    
+    if result.data is None:
+        return [(f"⚠️ No data for {url}", None)]
+    
+    raw = result.data
+    items = raw if isinstance(raw, list) else [raw]
+    events = []
+    for d in items:
+        if isinstance(d, dict):
+            d["source_url"] = url
+            events.append((None, d))
+    return events
+
+
+async def _extract_batch_events(
+    fc: Any,
+    batch: List[Tuple[int, str]],
+    pool: ExtractPool,
+    timeout: float
+) -> Tuple[Dict[int, List[Tuple[Optional[str], Optional[Dict[str, Any]]]]], List[Tuple[int, str]], bool]:
+    """
+    Run one multi-URL Firecrawl extract call and map the courses back to their URLs.
+    
+    Courses are matched to the batch by the dedup_key of their source_url,
+    which is then set to the URL as requested. Courses for other URLs are dropped.
+    
+    Returns:
+        Tuple of (events per URL index, (index, url) pairs without a course to
+        retry one at a time, whether the call itself succeeded)
+    """
+    urls = [url for _, url in batch]
+    print(f"\n\nStarting batch extraction for {len(urls)} URLs: {', '.join(urls)}", end="\n\n")
+    call = _extract_call(fc, urls, _get_batch_extraction_prompt(), _get_batch_extraction_schema(), timeout)
+    try:
+        result = await pool.run(call, timeout)
+    except asyncio.TimeoutError:
+        print(f"Batch extraction timed out for {len(urls)} URLs")
+        return {}, list(batch), False
+    except Exception as e:
+        print(f"Error in batch extraction for {len(urls)} URLs: \nraised error--> {e}")
+        return {}, list(batch), False
+    
+    if not result or result.data is None:
+        print(f"No data from batch extraction for {len(urls)} URLs")
+        return {}, list(batch), False
+    
+    by_key = {dedup_key(url): (i, url) for i, url in batch}
+    events: Dict[int, List[Tuple[Optional[str], Optional[Dict[str, Any]]]]] = {}
+    for item in _batch_items(result.data):
+        match = by_key.get(dedup_key(str(item.get("source_url") or "")))
+        if match is None:
+            print(f"Dropping course with unknown source_url: {item.get('source_url')}")
+            continue
+        i, url = match
+        item["source_url"] = url
+        events.setdefault(i, []).append((None, item))
+    missing = [(i, url) for i, url in batch if i not in events]
+    print(f"Batch extraction completed for {len(batch) - len(missing)}/{len(batch)} URLs")
+    return events, missing, True
+
+
+async def extract_course_details_async(
+    fc: Any,
+    course_urls: List[str],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    rate: Optional[float] = DEFAULT_RATE_LIMIT,
+    domain_rate: Optional[float] = None,
+    ordered: bool = True,
+    timeout: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    adaptive_batching: bool = True,
+    group_by_domain: bool = False,
+    pool: Optional[ExtractPool] = None,
+    cache: Optional[ExtractionCache] = None
+) -> AsyncIterator[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+    """
+    Extract courses concurrently, yielding progress logs and course data as they are ready.
+    
+    Up to ``max_in_flight`` extract calls run at once. Call starts are
+    spaced by token buckets, one shared by all URLs and one per course
+    domain. The synchronous Firecrawl client runs on a bounded ExtractPool
+    shared by all runs, so calls that time out and keep running still count
+    against its cap.
+    
+    With ``batch_size`` above 1, URLs are sent in multi-URL extract calls
+    with a courses array schema, and each course is matched back to its URL
+    by source_url. URLs a batch returned nothing for, or whose batch failed
+    or timed out, are retried with single-URL calls. Each call, single or
+    batch, takes one global token and one token per domain it covers.
+    
+    With a ``cache``, URLs already extracted with the current prompt and
+    schema are answered from it without a Firecrawl call, and new results
+    are stored as they arrive. Only URLs that yielded courses are cached.
     
     Args:
         fc: Firecrawl client instance
         course_urls: List of course URLs to extract
+        max_in_flight: Maximum extract calls running at the same time
+        rate: Extract calls started per second across all domains (None for no limit)
+        domain_rate: Extract calls started per second per course domain
+            (defaults to one every REQUEST_DELAY seconds; None or 0 for no limit)
+        ordered: Yield each URL's courses and result logs in input order, as a
+            serial run would; otherwise they are yielded as calls finish. Start
+            and retry logs are yielded as they happen either way.
+        timeout: Seconds an extract call may run, and may wait for a pool
+            thread, before it is given up (defaults to EXTRACTION_TIMEOUT)
+        batch_size: Maximum URLs per extract call (None or 1 for one URL per call)
+        adaptive_batching: Start batches small and size them from observed
+            latency, aiming for half the timeout (see AdaptiveBatchSize);
+            otherwise every batch has batch_size URLs
+        group_by_domain: Only batch URLs on the same domain together
+        pool: Worker pool for the blocking client calls (defaults to the
+            process-wide extract_pool)
+        cache: Extraction cache to read and fill (None to always call Firecrawl)
         
     Yields:
         Tuple of (log_message, course_dict):
         - (log_message, None) -> for status updates
         - (None, course_dict) -> for extracted courses
     """
+    total = len(course_urls)
+    if not total:
+        return
+    if domain_rate is None and REQUEST_DELAY:
+        domain_rate = 1 / REQUEST_DELAY
+    timeout = timeout or EXTRACTION_TIMEOUT
+    limiter = RateLimiter(rate, domain_rate, burst=max_in_flight)
+    pool = pool or extract_pool
+    queue: asyncio.Queue = asyncio.Queue()
+    fingerprint = None
+    if cache is not None:
+        fingerprint = _get_extraction_fingerprint()
+        cache.prune()
+    
+    # Cached URLs are answered up front; only the rest go to the workers
+    remaining = []
     for i, url in enumerate(course_urls, 1):
-        yield f"[{i}/{len(course_urls)}] Extracting from {url}", None
+        cached = cache.get(url, fingerprint) if cache is not None else None
+        if cached is None:
+            remaining.append((i, url))
+            continue
+        events = [(f"[{i}/{total}] Using cached details for {url}", None)]
+        events += [(None, dict(course, source_url=url)) for course in cached]
+        queue.put_nowait((i, events))
+    worker_count = max(1, min(max_in_flight, len(remaining)))
+    sizer = None
+    if batch_size and batch_size > 1:
+        sizer = AdaptiveBatchSize(batch_size, target_latency=timeout / 2, adaptive=adaptive_batching)
+    
+    async def extract_one(url: str) -> List[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
         try:
-            print(f"\n\nStarting extraction for: {url}", end="\n\n")
-            
-            # Add timeout to prevent hanging
-            result = None
-            error_occurred = None
-            
-            def extract_worker():
-                nonlocal result, error_occurred
-                try:
-                    result = fc.extract(
-                        urls=[url],
-                        prompt=_get_extraction_prompt(),
-                        schema=_get_extraction_schema(),
-                        enable_web_search=False
-                    )
-                except Exception as e:
-                    error_occurred = e
-            
-            # Start extraction in a thread
-            thread = threading.Thread(target=extract_worker)
-            thread.daemon = True
-            thread.start()
-            
-            # Wait for timeout
-            thread.join(timeout=EXTRACTION_TIMEOUT)
-            
-            if thread.is_alive():
-                print(f"Extraction timed out for: {url}")
-                yield f"⏰ Timeout extracting {url} ({EXTRACTION_TIMEOUT}s limit)", None
-                continue
-            
-            if error_occurred:
-                print(f"Error extracting {url}: \nraised error--> {error_occurred}")
-                yield f"❌ Error extracting {url}: {error_occurred}", None
-                continue
-                
-            if not result:
-                print(f"No result for: {url}")
-                yield f"⚠️ No result for {url}", None
-                continue
-                
-            print(f"Extraction completed for: {url}")
-                
+            return await _extract_url_events(fc, url, pool, timeout)
         except Exception as e:
-            print(f"Error extracting {url}: {e}")
-            yield f"❌ Error extracting {url}: {e}", None
-            continue
+            return [(f"❌ Error extracting {url}: {e}", None)]
+    
+    async def worker() -> None:
+        while remaining:
+            batch = _take_batch(remaining, sizer.size if sizer else 1, group_by_domain)
+            start_logs = {i: (f"[{i}/{total}] Extracting from {url}", None) for i, url in batch}
+            await limiter.acquire(*(url for _, url in batch))
+            # Progress logs go out as soon as they happen (index None); only results wait their turn
+            for i, _ in batch:
+                queue.put_nowait((None, [start_logs[i]]))
+            if len(batch) == 1:
+                i, url = batch[0]
+                results = {i: await extract_one(url)}
+            else:
+                started = time.monotonic()
+                results, missing, ok = await _extract_batch_events(fc, batch, pool, timeout)
+                sizer.record(len(batch), time.monotonic() - started, ok)
+                for i, url in missing:
+                    queue.put_nowait((None, [(f"Retrying {url} on its own", None)]))
+                    await limiter.acquire(url)
+                    results[i] = await extract_one(url)
+            for i, url in batch:
+                if cache is not None:
+                    courses = [course for _, course in results[i] if course is not None]
+                    if courses:
+                        cache.put(url, fingerprint, courses)
+                queue.put_nowait((i, results[i]))
+    
+    workers = [asyncio.ensure_future(worker()) for _ in range(worker_count)]
+    task = asyncio.gather(*workers, return_exceptions=True)
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    pending: Dict[int, List[Tuple[Optional[str], Optional[Dict[str, Any]]]]] = {}
+    next_index = 1
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            i, events = item
+            if i is None or not ordered:
+                for event in events:
+                    yield event
+                continue
+            # Hold finished URLs back until every earlier URL has been yielded
+            pending[i] = events
+            while next_index in pending:
+                for event in pending.pop(next_index):
+                    yield event
+                next_index += 1
+        for outcome in await task:
+            if isinstance(outcome, BaseException):
+                raise outcome
+    finally:
+        # Stop the workers and let them see the cancellation, so queued pool calls never start
+        remaining.clear()
+        for running in workers:
+            running.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
-        if not result or result.data is None:
-            yield f"⚠️ No data for {url}", None
-            continue
 
-        raw = result.data
-        items = raw if isinstance(raw, list) else [raw]
-        for d in items:
-            if isinstance(d, dict):
-                d["source_url"] = url
-                yield None, d
-        time.sleep(REQUEST_DELAY)  # Delay between requests
+def extract_course_details(
+    fc: Any,
+    course_urls: List[str],
+    **kwargs: Any
+) -> Generator[Tuple[Optional[str], Optional[Dict[str, Any]]], None, None]:
+    """
+    Generator that yields progress logs and course data one at a time.
+    
+    Synchronous wrapper around extract_course_details_async, driven by a
+    private event loop, so it can be consumed from a plain thread such as
+    a Streamlit script run.
+    
+    Args:
+        fc: Firecrawl client instance
+        course_urls: List of course URLs to extract
+        **kwargs: Passed on to extract_course_details_async (max_in_flight,
+            rate, domain_rate, ordered, timeout, batch_size, adaptive_batching,
+            group_by_domain, pool, cache)
+        
+    Yields:
+        Tuple of (log_message, course_dict):
+        - (log_message, None) -> for status updates
+        - (None, course_dict) -> for extracted courses
+    """
+    loop = asyncio.new_event_loop()
+    stream = extract_course_details_async(fc, course_urls, **kwargs)
+    try:
+        while True:
+            try:
+                event = loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+            yield event
+    finally:
+        loop.run_until_complete(stream.aclose())
+        loop.close()
 
 
-def extract_all_courses(course_urls: List[str], output_file: str = OUTPUT_FILE) -> List[Dict[str, Any]]:
+def extract_all_courses(
+    course_urls: List[str],
+    output_file: str = OUTPUT_FILE,
+    columnar: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    cache_file: Optional[str] = CACHE_FILE
+) -> List[Dict[str, Any]]:
     """
     Extract all courses and return a list of unique courses.
     
     Args:
         course_urls: List of course URLs to extract
         output_file: Output JSON file path
+        columnar: Also append the courses to the partitioned "parquet" or "arrow"
+            courses dataset (see columnar_output, requires pyarrow)
+        batch_size: Maximum URLs per Firecrawl extract call (None for one URL per call)
+        cache_file: SQLite extraction cache to reuse earlier results from
+            (None to call Firecrawl for every URL)
         
     Returns:
         List of extracted course dictionaries
@@ -166,20 +776,30 @@ def extract_all_courses(course_urls: List[str], output_file: str = OUTPUT_FILE)
     if not API_KEY:
         raise EnvironmentError("FIRECRAWL_API_KEY not set in .env file")
 
-    fc = FirecrawlClient(api_key=API_KEY)
+    fc = get_firecrawl_client_class()(api_key=API_KEY)
 
     results = []
     seen = set()
-    for log, course in extract_course_details(fc, course_urls):
-        if course:
-            key = course.get("course_name", "").lower().strip()
-            if key and key not in seen:
-                seen.add(key)
-                results.append(course)
+    cache = ExtractionCache(cache_file) if cache_file else None
+    try:
+        for log, course in extract_course_details(fc, course_urls, batch_size=batch_size, cache=cache):
+            if course:
+                key = course.get("course_name", "").lower().strip()
+                if key and key not in seen:
+                    seen.add(key)
+                    results.append(course)
+    finally:
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Extraction cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+            cache.close()
 
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
 
+    if columnar:
+        write_courses_columnar(results, fmt=columnar)
+
     return results
 
 
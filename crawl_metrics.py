@@ -0,0 +1,298 @@
+"""
+Per-phase timing spans and counters for listing crawls.
+
+The crawler wraps each phase of a listing page in crawl_metrics.span(phase):
+politeness waits, navigation (goto / fetch), wait_selector, parse, link
+extraction, the pagination handlers and the checkpoint write. Spans and counters are labelled with
+the university and listing page currently being crawled. Labels are carried
+in context variables, so concurrent crawls and pages on one event loop stay
+apart.
+
+Recording is off by default, and span() and count() then return immediately.
+Turn it on with crawl_metrics.enable() or CRAWL_METRICS=1, then export a run
+with write_json() (a JSON run report) or write_prometheus() (a Prometheus
+text-file collector file).
+"""
+import contextvars
+import json
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# -----------------------------
+# Constants
+# -----------------------------
+PHASES = ("crawl", "politeness", "goto", "fetch", "wait_selector", "parse", "extract", "pagination", "checkpoint", "save")
+COUNTERS = ("pages", "links", "requests", "bytes", "errors")
+PROMETHEUS_PREFIX = "crawl"
+
+_university: contextvars.ContextVar = contextvars.ContextVar("crawl_university", default="unknown")
+_page: contextvars.ContextVar = contextvars.ContextVar("crawl_page", default=None)
+
+
+# -----------------------------
+# Spans
+# -----------------------------
+
+class _NullSpan:
+    """Span returned while recording is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "phase", "started")
+
+    def __init__(self, metrics: "CrawlMetrics", phase: str):
+        self.metrics = metrics
+        self.phase = phase
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        self.metrics._record_span(self.phase, self.started, time.perf_counter() - self.started, exc_type is not None)
+
+
+# -----------------------------
+# Recorder
+# -----------------------------
+
+class CrawlMetrics:
+    """
+    Collects timing spans and counters per university, page and phase.
+
+    Usage:
+        crawl_metrics.enable()
+        asyncio.run(scrape_university_courses(url))
+        crawl_metrics.write_json("crawl_report.json")
+        crawl_metrics.write_prometheus("/var/lib/node_exporter/crawl.prom")
+
+    Args:
+        enabled: Record from the start
+        keep_spans: Also keep every individual span for the JSON report
+            (aggregates are always kept)
+    """
+
+    def __init__(self, enabled: bool = False, keep_spans: bool = True):
+        self.enabled = enabled
+        self.keep_spans = keep_spans
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, keep_spans: Optional[bool] = None) -> None:
+        if keep_spans is not None:
+            self.keep_spans = keep_spans
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.started_at = datetime.now()
+            self._origin = time.perf_counter()
+            self._durations: Dict[Tuple[str, str], List[float]] = {}
+            self._counters: Dict[Tuple[str, str], float] = {}
+            self._pages: Dict[Tuple[str, int], Dict[str, Any]] = {}
+            self._spans: List[Dict[str, Any]] = []
+
+    # Labels
+
+    @contextmanager
+    def university(self, name: str) -> Iterator[None]:
+        """Label everything recorded inside the block with a university."""
+        token = _university.set(name)
+        try:
+            yield
+        finally:
+            _university.reset(token)
+
+    @contextmanager
+    def page(self, index: int, url: str) -> Iterator[None]:
+        """Label everything recorded inside the block with a listing page."""
+        token = _page.set((index, url))
+        try:
+            yield
+        finally:
+            _page.reset(token)
+
+    # Recording
+
+    def span(self, phase: str):
+        """Context manager timing one phase (a no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, phase)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a counter of the current university (and page)."""
+        if not self.enabled:
+            return
+        university, page = _university.get(), _page.get()
+        with self._lock:
+            key = (university, name)
+            self._counters[key] = self._counters.get(key, 0) + value
+            if page is not None:
+                record = self._page_record(university, page)
+                record[name] = record.get(name, 0) + value
+
+    def page_done(self, index: int, url: str, links: int) -> None:
+        """Record a completed listing page and its link count."""
+        if not self.enabled:
+            return
+        with self.page(index, url):
+            self.count("pages")
+            self.count("links", links)
+
+    def _page_record(self, university: str, page: Tuple[int, str]) -> Dict[str, Any]:
+        index, url = page
+        record = self._pages.get((university, index))
+        if record is None:
+            record = self._pages[(university, index)] = {"index": index, "url": url, "phases": {}}
+        return record
+
+    def _record_span(self, phase: str, started: float, duration: float, failed: bool) -> None:
+        university, page = _university.get(), _page.get()
+        with self._lock:
+            self._durations.setdefault((university, phase), []).append(duration)
+            if failed:
+                key = (university, "errors")
+                self._counters[key] = self._counters.get(key, 0) + 1
+            if page is not None:
+                phases = self._page_record(university, page)["phases"]
+                phases[phase] = phases.get(phase, 0) + duration
+            if self.keep_spans:
+                self._spans.append({
+                    "university": university,
+                    "page": page[0] if page else None,
+                    "phase": phase,
+                    "start_s": round(started - self._origin, 6),
+                    "duration_s": round(duration, 6),
+                    "error": failed,
+                })
+
+    # Export
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Run report: per-university phase statistics, counters and pages.
+
+        Returns:
+            JSON-serialisable dictionary
+        """
+        with self._lock:
+            durations = {key: list(values) for key, values in self._durations.items()}
+            counters = dict(self._counters)
+            pages = [dict(record, university=university) for (university, _), record in self._pages.items()]
+            spans = list(self._spans)
+
+        universities: Dict[str, Dict[str, Any]] = {}
+        for (university, phase), values in sorted(durations.items()):
+            phases = universities.setdefault(university, {"phases": {}, "counters": {}, "pages": []})["phases"]
+            phases[phase] = _summarise(values)
+        for (university, name), value in sorted(counters.items()):
+            universities.setdefault(university, {"phases": {}, "counters": {}, "pages": []})["counters"][name] = value
+        for record in sorted(pages, key=lambda r: (r["university"], r["index"])):
+            university = record.pop("university")
+            record["phases"] = {phase: round(seconds, 6) for phase, seconds in record["phases"].items()}
+            universities.setdefault(university, {"phases": {}, "counters": {}, "pages": []})["pages"].append(record)
+
+        report = {
+            "started_at": self.started_at.isoformat(),
+            "generated_at": datetime.now().isoformat(),
+            "universities": universities,
+        }
+        if self.keep_spans:
+            report["spans"] = spans
+        return report
+
+    def write_json(self, path: str) -> str:
+        """Write the run report as JSON and return its path."""
+        _atomic_write(path, json.dumps(self.report(), indent=2, ensure_ascii=False))
+        return path
+
+    def prometheus_text(self) -> str:
+        """Aggregates in the Prometheus text exposition format."""
+        report = self.report()["universities"]
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_phase_seconds Time spent per crawl phase.",
+            f"# TYPE {PROMETHEUS_PREFIX}_phase_seconds summary",
+        ]
+        for university, data in report.items():
+            for phase, stats in data["phases"].items():
+                labels = f'university="{_escape(university)}",phase="{phase}"'
+                for quantile, key in (("0.5", "p50_s"), ("0.95", "p95_s")):
+                    lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds{{{labels},quantile="{quantile}"}} {stats[key]}')
+                lines.append(f"{PROMETHEUS_PREFIX}_phase_seconds_sum{{{labels}}} {stats['total_s']}")
+                lines.append(f"{PROMETHEUS_PREFIX}_phase_seconds_count{{{labels}}} {stats['count']}")
+        for name in COUNTERS:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name}_total Crawl {name} per university.")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name}_total counter")
+            for university, data in report.items():
+                if name in data["counters"]:
+                    value = data["counters"][name]
+                    lines.append(f'{PROMETHEUS_PREFIX}_{name}_total{{university="{_escape(university)}"}} {value:g}')
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_report_timestamp_seconds When this report was written.")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_report_timestamp_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_report_timestamp_seconds {time.time():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> str:
+        """
+        Write aggregates for the node_exporter text-file collector.
+
+        The file is replaced atomically, so the collector never reads a partial file.
+        """
+        _atomic_write(path, self.prometheus_text())
+        return path
+
+
+def _summarise(values: List[float]) -> Dict[str, Any]:
+    ordered = sorted(values)
+    if len(ordered) > 1:
+        quantiles = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95 = quantiles[49], quantiles[94]
+    else:
+        p50 = p95 = ordered[0]
+    return {
+        "count": len(ordered),
+        "total_s": round(sum(ordered), 6),
+        "p50_s": round(p50, 6),
+        "p95_s": round(p95, 6),
+        "max_s": round(ordered[-1], 6),
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: str, text: str) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# Shared recorder used by extractor.py
+crawl_metrics = CrawlMetrics(enabled=os.getenv("CRAWL_METRICS", "").lower() in ("1", "true", "yes"))
@@ -0,0 +1,235 @@
+"""
+Persistent cache of Firecrawl extraction results, so a course URL is only paid for once.
+
+Entries live in a SQLite database keyed by the URL's dedup_key (see
+url_canonical) and a fingerprint of the extraction prompt and schema. A
+prompt or schema change produces a new fingerprint, so older entries are
+never returned again; they age out through the TTL and LRU eviction, or
+prune(fingerprint) purges them at once. Entries expire after a TTL, and
+once the cached JSON outgrows ``max_bytes`` the least recently used entries
+are evicted.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from url_canonical import dedup_key
+
+
+# -----------------------------
+# Constants
+# -----------------------------
+CACHE_FILE = "extraction_cache.sqlite"
+CACHE_TTL = 7 * 24 * 3600  # seconds a cached extraction stays valid
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # cached JSON kept before LRU eviction
+EVICT_TO = 0.9  # fraction of max_bytes left after an eviction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    url_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    url TEXT NOT NULL,
+    courses TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (url_key, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used);
+"""
+
+
+def extraction_fingerprint(*parts: Any) -> str:
+    """
+    Short stable hash of the prompts and schemas an extraction was made with.
+
+    Args:
+        *parts: Prompt strings and JSON-serialisable schemas
+
+    Returns:
+        16 hex characters
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+# -----------------------------
+# Extraction Cache
+# -----------------------------
+
+class ExtractionCache:
+    """
+    SQLite store of extracted courses per URL and extraction fingerprint.
+
+    Usage:
+        with ExtractionCache(CACHE_FILE) as cache:
+            courses = cache.get(url, fingerprint)
+            if courses is None:
+                courses = extract(url)
+                cache.put(url, fingerprint, courses)
+            cache.stats()
+
+    Args:
+        path: SQLite database file
+        ttl: Seconds before an entry expires (None to keep entries until evicted)
+        max_bytes: Cached JSON size that triggers LRU eviction (None for no limit)
+    """
+
+    def __init__(self, path: str = CACHE_FILE, ttl: Optional[float] = CACHE_TTL,
+                 max_bytes: Optional[int] = CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # Several Streamlit sessions may share the file; WAL lets readers run during a write
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        self._counts = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def __enter__(self) -> "ExtractionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get(self, url: str, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached courses for a URL, or None on a miss (expired entries are dropped).
+
+        Args:
+            url: Course URL (any form with the same dedup_key matches)
+            fingerprint: Fingerprint of the current prompt and schema
+
+        Returns:
+            A fresh copy of the cached course dicts, or None
+        """
+        key = dedup_key(url)
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT courses, size, created_at FROM extractions WHERE url_key = ? AND fingerprint = ?",
+                (key, fingerprint)
+            ).fetchone()
+            if row is None:
+                self._counts["misses"] += 1
+                return None
+            courses, size, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self.conn.execute("DELETE FROM extractions WHERE url_key = ? AND fingerprint = ?", (key, fingerprint))
+                self._bytes -= size
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return None
+            self.conn.execute(
+                "UPDATE extractions SET last_used = ? WHERE url_key = ? AND fingerprint = ?",
+                (now, key, fingerprint)
+            )
+            self._counts["hits"] += 1
+        return json.loads(courses)
+
+    def put(self, url: str, fingerprint: str, courses: List[Dict[str, Any]]) -> None:
+        """
+        Cache the courses extracted from a URL, evicting least recently used entries if needed.
+
+        Args:
+            url: Course URL
+            fingerprint: Fingerprint of the prompt and schema used
+            courses: Course dicts extracted from the page
+        """
+        key = dedup_key(url)
+        payload = json.dumps(courses, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock, self.conn:
+            previous = self.conn.execute(
+                "SELECT size FROM extractions WHERE url_key = ? AND fingerprint = ?", (key, fingerprint)
+            ).fetchone()
+            self.conn.execute("""
+                INSERT INTO extractions (url_key, fingerprint, url, courses, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url_key, fingerprint) DO UPDATE SET
+                    url = excluded.url, courses = excluded.courses, size = excluded.size,
+                    created_at = excluded.created_at, last_used = excluded.last_used
+            """, (key, fingerprint, url, payload, size, now, now))
+            self._bytes += size - (previous[0] if previous else 0)
+            self._counts["stores"] += 1
+            if self.max_bytes is not None and self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICT_TO))
+
+    def prune(self, fingerprint: Optional[str] = None) -> int:
+        """
+        Delete expired entries, and optionally entries made with any other fingerprint.
+
+        The fingerprint purge is a maintenance call: the same file may be shared
+        by runs with different prompts, whose entries it would delete.
+
+        Args:
+            fingerprint: Fingerprint to keep (None keeps entries of every fingerprint)
+
+        Returns:
+            Number of entries deleted
+        """
+        conditions, params = [], []
+        if self.ttl is not None:
+            conditions.append("created_at < ?")
+            params.append(time.time() - self.ttl)
+        if fingerprint is not None:
+            conditions.append("fingerprint != ?")
+            params.append(fingerprint)
+        if not conditions:
+            return 0
+        with self._lock, self.conn:
+            deleted = self.conn.execute(f"DELETE FROM extractions WHERE {' OR '.join(conditions)}", params).rowcount
+            self._bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        return deleted
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM extractions")
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counts of this instance plus the size of the whole cache.
+
+        Returns:
+            Dictionary with hits, misses, expired, stores, evictions, hit_rate,
+            entries and bytes
+        """
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            **counts,
+            "hit_rate": counts["hits"] / lookups if lookups else None,
+            "entries": entries,
+            "bytes": self._bytes,
+        }
+
+    def _evict(self, target_bytes: int) -> None:
+        # Keep the most recently used entries whose running total fits in target_bytes
+        evicted = self.conn.execute("""
+            DELETE FROM extractions WHERE (url_key, fingerprint) IN (
+                SELECT url_key, fingerprint FROM (
+                    SELECT url_key, fingerprint,
+                           SUM(size) OVER (ORDER BY last_used DESC, url_key, fingerprint) AS running
+                    FROM extractions
+                ) WHERE running > ?
+            )
+        """, (target_bytes,)).rowcount
+        self._counts["evictions"] += evicted
+        self._bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
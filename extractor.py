@@ -2,10 +2,17 @@
 import os
 import sys
 import asyncio
+import atexit
 import re
 import csv
+import hashlib
+import itertools
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator
 from urllib.parse import urlparse, parse_qs, unquote, urljoin, urlencode, urlsplit, urlunsplit
 
 # Fix for Windows Python 3.13+ asyncio subprocess issues with Playwright
@@ -18,8 +25,28 @@ if sys.platform.startswith('win'):
         # Fallback if Proactor is not available (older Python versions)
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-from playwright.async_api import async_playwright, Page, TimeoutError as PWTimeoutError
-from university_config import get_config_for_url, get_university_display_name, UNIVERSITY_CONFIGS
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, TimeoutError as PWTimeoutError
+
+# Optional: browserless fast path for server-rendered listings ("render": False)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from university_config import get_config_for_url, get_university_display_name, resolve_hrefs, UNIVERSITY_CONFIGS
+from url_history import save_url_diff
+from columnar_output import write_links_columnar
+from url_canonical import dedup_key, dedupe_urls, output_url
+from crawl_metrics import crawl_metrics
 
 
 # -----------------------------
@@ -28,13 +55,72 @@ from university_config import get_config_for_url, get_university_display_name, U
 OUTPUT_MAIN_FOLDER = "output_links_files"
 MAX_PAGES = 100  # Maximum pages to prevent infinite loops
 PAGE_LOAD_TIMEOUT = 60000
-PAGINATION_DELAY = 1000
+PAGINATION_TIMEOUT = 10000  # ms to wait for a clicked next button's navigation to commit
+PAGINATION_CLICK_TIMEOUT = 1500  # ms for a clicked next button to change the URL or start navigating
+ACCORDION_TIMEOUT = 3000  # ms to wait for an accordion section to expand
+COOKIE_BANNER_TIMEOUT = 3000  # ms to wait for a dismissed cookie banner to disappear
+DEFAULT_PAGE_CONCURRENCY = 1  # Listing pages fetched in parallel (1 = serial)
+DEFAULT_POLITENESS_DELAY = 0  # Seconds between requests to the same domain
 
 
 # -----------------------------
 # Utility Functions
 # -----------------------------
 
+class PolitenessThrottle:
+    """
+    Spaces out requests to the same domain.
+    
+    Each request reserves the next free slot for its domain, so concurrent
+    workers crawling one site share the configured delay instead of each
+    sleeping on its own.
+    """
+    
+    def __init__(self):
+        self._next_slot: Dict[str, float] = {}
+    
+    async def wait(self, url: str, delay: float) -> None:
+        """Wait until a request to url's domain is allowed."""
+        if delay <= 0:
+            return
+        domain = urlparse(url).netloc.lower()
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(domain, 0))
+        self._next_slot[domain] = slot + delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+_politeness = PolitenessThrottle()
+
+
+async def _polite(config: Dict[str, Any], url: str) -> None:
+    """Apply the university's politeness_delay before requesting url."""
+    with crawl_metrics.span("politeness"):
+        await _politeness.wait(url, config.get("politeness_delay", DEFAULT_POLITENESS_DELAY))
+
+
+async def _goto(page: Page, config: Dict[str, Any], url: str) -> None:
+    """Navigate to a listing page after the politeness delay, recording its timing and size."""
+    await _polite(config, url)
+    with crawl_metrics.span("goto"):
+        response = await page.goto(url, wait_until="domcontentloaded")
+    if crawl_metrics.enabled and response is not None:
+        crawl_metrics.count("requests")
+        crawl_metrics.count("bytes", await _response_size(response))
+
+
+async def _response_size(response) -> int:
+    """Body size of a navigation response (Content-Length when sent, else the body length)."""
+    length = response.headers.get("content-length")
+    if length and length.isdigit():
+        return int(length)
+    try:
+        return len(await response.body())
+    except Exception:
+        return 0
+
+
 def _ensure_output_dirs(folder_name: str) -> str:
     """
     Ensure output directories exist.
@@ -72,6 +158,71 @@ def save_list_to_file(filename: str, items: List[str], folder_name: str) -> str:
     return full_path
 
 
+CSV_FIELDNAMES = ["", "url", "university_id", "university_name", "discovered_via",
+                  "link_group_type", "confidence_score", "status", "extracted_at", "error_message"]
+
+
+class StreamingCsvWriter:
+    """
+    Write course URL rows in the export structure as they arrive.
+    
+    The header is written on open and each row is written straight to the
+    file, so no list of rows is built in memory. Rows are flushed after each
+    write_many() call so the file can be read while a crawl is running.
+    
+    Usage:
+        with StreamingCsvWriter(path, "Abertay University") as writer:
+            writer.write_many(page_urls)
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        university_name: str,
+        university_id: Optional[int] = None,
+        discovered_via: str = "unified-extractor",
+        extracted_at: Optional[str] = None
+    ):
+        self.path = path
+        self.count = 0
+        self._row = {
+            "university_id": university_id if university_id is not None else 1,
+            "university_name": university_name,
+            "discovered_via": discovered_via,
+            "link_group_type": "",  # Empty as per CSV structure
+            "confidence_score": "",  # Empty as per CSV structure
+            "status": "pending",
+            "extracted_at": extracted_at or datetime.now().isoformat(),
+            "error_message": ""
+        }
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDNAMES)
+        self._writer.writeheader()
+    
+    def __enter__(self) -> "StreamingCsvWriter":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def write(self, url: str) -> None:
+        """Append one URL row."""
+        self._row[""] = self.count  # Index column
+        self._row["url"] = url
+        self._writer.writerow(self._row)
+        self.count += 1
+    
+    def write_many(self, urls) -> None:
+        """Append a batch of URL rows (e.g. one listing page) and flush."""
+        for url in urls:
+            self.write(url)
+        self._file.flush()
+    
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
 def save_urls_to_csv(
     urls: List[str],
     university_name: str,
@@ -106,46 +257,129 @@ def save_urls_to_csv(
     subfolder = _ensure_output_dirs(folder_name)
     full_path = os.path.join(subfolder, filename)
     
-    # Get current timestamp
-    extracted_at = datetime.now().isoformat()
+    with StreamingCsvWriter(full_path, university_name, university_id, discovered_via) as writer:
+        writer.write_many(urls)
     
-    # Prepare CSV data
-    csv_data = []
-    for idx, url in enumerate(urls):
-        csv_data.append({
-            "": idx,  # Index column
-            "url": url,
-            "university_id": university_id,
-            "university_name": university_name,
-            "discovered_via": discovered_via,
-            "link_group_type": "",  # Empty as per CSV structure
-            "confidence_score": "",  # Empty as per CSV structure
-            "status": "pending",
-            "extracted_at": extracted_at,
-            "error_message": ""
-        })
-    
-    # Write CSV file
-    if csv_data:
-        fieldnames = ["", "url", "university_id", "university_name", "discovered_via", 
-                     "link_group_type", "confidence_score", "status", "extracted_at", "error_message"]
-        with open(full_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(csv_data)
-        print(f"[✔] Saved {len(urls)} URLs to CSV: {full_path}")
+    if writer.count:
+        print(f"[✔] Saved {writer.count} URLs to CSV: {full_path}")
     else:
-        # Create empty CSV with headers
-        fieldnames = ["", "url", "university_id", "university_name", "discovered_via", 
-                     "link_group_type", "confidence_score", "status", "extracted_at", "error_message"]
-        with open(full_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
         print(f"[✔] Created empty CSV: {full_path}")
     
     return full_path
 
 
+class KeywordMatcher:
+    """
+    Match URL paths against many keywords in one pass per URL.
+    
+    Keywords are lower-cased and stripped once. In "contains" mode they are
+    compiled into a single alternation regex searched over the lower-cased
+    URL path; in "segment" mode they become a set checked against the path
+    segments. Results are identical to checking each keyword in turn.
+    
+    Args:
+        keywords: Keywords to match (empty ones are ignored)
+        match_mode: "contains" or "segment" (anything else behaves like "contains")
+    """
+    
+    def __init__(self, keywords: List[str], match_mode: str = "contains"):
+        self.match_mode = match_mode
+        keyword_list = [kw.lower().strip() for kw in keywords if kw]
+        keyword_list = [kw for kw in keyword_list if kw]
+        if match_mode == "segment":
+            # A keyword with an inner "/" can never equal a single segment
+            self._segments = {kw.strip("/") for kw in keyword_list} - {""}
+            self._segments = {kw for kw in self._segments if "/" not in kw}
+            self._pattern = None
+        else:
+            alternatives = sorted(set(keyword_list))
+            self._pattern = re.compile("|".join(map(re.escape, alternatives))) if alternatives else None
+            self._segments = set()
+    
+    def matches(self, url: str) -> bool:
+        """Whether the URL's path matches any keyword."""
+        try:
+            path = urlparse(url).path.lower()
+        except Exception:
+            path = url.lower()
+        if self.match_mode == "segment":
+            return not self._segments.isdisjoint(path.strip("/").split("/"))
+        return self._pattern is not None and self._pattern.search(path) is not None
+    
+    def filter(self, links) -> List[str]:
+        """Matching links, in order (non-string entries are skipped)."""
+        return [url for url in links if isinstance(url, str) and self.matches(url)]
+    
+    def iter_filter(self, links) -> Iterator[str]:
+        """Lazily yield matching links (for streamed input)."""
+        for url in links:
+            if isinstance(url, str) and self.matches(url):
+                yield url
+
+
+def _iter_urls_from_file(path: str) -> Iterator[str]:
+    """Stream URLs from a CSV with a "url" column, or a text file with one URL per line."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                if row.get("url"):
+                    yield row["url"]
+        else:
+            for line in f:
+                url = line.strip()
+                if url:
+                    yield url
+
+
+def filter_links_file(
+    input_path: str,
+    keywords: List[str],
+    output_path: str,
+    match_mode: str = "contains",
+    university_name: str = "",
+    university_id: Optional[int] = None,
+    chunk_size: int = 10000
+) -> int:
+    """
+    Filter a large URL file by keywords without loading it into memory.
+    
+    The input is streamed line by line (CSV with a "url" column, or one URL
+    per line) and matches are written as they are found, in chunks.
+    
+    Args:
+        input_path: URL file to filter
+        keywords: Keywords to match against
+        output_path: Output file (.csv in the export structure, otherwise one URL per line)
+        match_mode: "contains" or "segment"
+        university_name: University name for CSV output
+        university_id: University ID for CSV output (defaults to 1)
+        chunk_size: Matches buffered before each write
+        
+    Returns:
+        Number of matching URLs written
+    """
+    matcher = KeywordMatcher(keywords, match_mode)
+    matches = matcher.iter_filter(_iter_urls_from_file(input_path))
+    count = 0
+    
+    if output_path.lower().endswith(".csv"):
+        with StreamingCsvWriter(output_path, university_name, university_id) as writer:
+            while True:
+                chunk = list(itertools.islice(matches, chunk_size))
+                if not chunk:
+                    break
+                writer.write_many(chunk)
+            count = writer.count
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for url in matches:
+                f.write(url + "\n")
+                count += 1
+    
+    print(f"[✔] Filtered {count} matching URLs into {output_path}")
+    return count
+
+
 def filter_links_by_keywords(
     links: List[str],
     keywords: List[str],
@@ -190,32 +424,7 @@ def filter_links_by_keywords(
             save_list_to_file(filename, [], folder_name)
         return []
 
-    filtered = []
-    keyword_list = [kw.lower().strip() for kw in keywords if kw]
-
-    for url in links:
-        if not isinstance(url, str):
-            continue
-        try:
-            path = urlparse(url).path.lower()
-        except Exception:
-            path = url.lower()
-
-        match = False
-        for kw in keyword_list:
-            if not kw:
-                continue
-            if match_mode == "segment":
-                segments = [s for s in path.strip("/").split("/") if s]
-                if kw.strip("/") in segments:
-                    match = True
-                    break
-            else:  # 'contains'
-                if kw in path:
-                    match = True
-                    break
-        if match:
-            filtered.append(url)
+    filtered = KeywordMatcher(keywords, match_mode).filter(links)
 
     if save_as_csv:
         # Save filtered results as CSV
@@ -236,10 +445,930 @@ def filter_links_by_keywords(
     return filtered
 
 
+# -----------------------------
+# Crawl Checkpoints
+# -----------------------------
+
+CHECKPOINT_SUFFIX = "_checkpoint.jsonl"
+
+
+class CrawlCheckpoint:
+    """
+    Append-only journal of completed listing pages, used to resume a crawl.
+    
+    The first line identifies the crawl (start URL and pagination type);
+    each further line records one completed page: its index, URL, the
+    course links found and, for next_button crawls, the next URL to visit.
+    Lines are flushed and fsynced as they are written, so a crash loses at
+    most the page in flight. Every recorded page is also passed to the
+    optional ``on_page(index, url, links)`` listener.
+    """
+    
+    def __init__(
+        self,
+        folder_name: str,
+        university_url: str,
+        pagination_type: str,
+        fingerprints: Optional["ListingFingerprints"] = None,
+        on_page: Optional[Callable[[int, str, List[str]], None]] = None
+    ):
+        self.path = os.path.join(_ensure_output_dirs(folder_name), f"{folder_name}{CHECKPOINT_SUFFIX}")
+        self.university_url = university_url
+        self.pagination_type = pagination_type
+        self.fingerprints = fingerprints
+        self.on_page = on_page
+        self.pages: Dict[int, Dict[str, Any]] = {}
+        self._file = None
+    
+    def load(self) -> int:
+        """
+        Restore pages from an existing journal for the same crawl.
+        
+        Returns:
+            Number of completed pages restored (0 if there is nothing to resume)
+        """
+        self.pages = {}
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return 0
+            if header.get("university_url") != self.university_url or header.get("pagination_type") != self.pagination_type:
+                return 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn final line from a crash
+                self.pages[record["index"]] = record
+        if self.pages:
+            print(f"Resuming crawl from checkpoint: {len(self.pages)} page(s) already done")
+            if self.fingerprints:
+                for record in self.pages.values():
+                    self.fingerprints.restore_page(record["index"], record["url"], record["links"])
+        return len(self.pages)
+    
+    def ordered_pages(self) -> List[Dict[str, Any]]:
+        """Completed pages in page order."""
+        return [self.pages[index] for index in sorted(self.pages)]
+    
+    def known_results(self, pagination_urls: List[str]) -> Dict[int, List[str]]:
+        """Links of completed pages whose index still maps to the same URL."""
+        return {
+            index: record["links"]
+            for index, record in self.pages.items()
+            if index < len(pagination_urls) and pagination_urls[index] == record["url"]
+        }
+    
+    def record_page(self, index: int, url: str, links: List[str], next_url: Optional[str] = None) -> None:
+        """Durably append a completed page to the journal."""
+        if self._file is None:
+            if self.pages:
+                self._file = open(self.path, "a", encoding="utf-8")
+            else:
+                self._file = open(self.path, "w", encoding="utf-8")
+                header = {
+                    "university_url": self.university_url,
+                    "pagination_type": self.pagination_type,
+                    "started_at": datetime.now().isoformat(),
+                }
+                self._file.write(json.dumps(header) + "\n")
+        record = {"index": index, "url": url, "links": links, "next_url": next_url}
+        self.pages[index] = record
+        with crawl_metrics.page(index, url), crawl_metrics.span("checkpoint"):
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        crawl_metrics.page_done(index, url, len(links))
+        if self.on_page:
+            self.on_page(index, url, links)
+        if self.fingerprints:
+            self.fingerprints.record_page(index, url, links)
+    
+    def close(self) -> None:
+        """Close the journal file (it stays on disk for a later resume)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def clear(self) -> None:
+        """Delete the journal once the crawl has completed."""
+        self.close()
+        self.pages = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+FINGERPRINTS_SUFFIX = "_fingerprints.json"
+RECRAWL_MATCH_PAGES = 0  # Leading listing pages that must match the last run to skip the rest (0 = off)
+
+
+class ListingUnchanged(Exception):
+    """Raised mid-crawl once the leading listing pages match the previous run."""
+
+
+class ListingFingerprints:
+    """
+    Per-page fingerprints of the last completed crawl of a university.
+    
+    A page's fingerprint is a hash of its extracted link set plus, on the
+    HTTP path, its ETag / Last-Modified validators. The bodies of the leading
+    pages are kept too, so the next run can fetch them with a conditional GET
+    and parse the stored copy on 304 Not Modified. Once the first
+    ``match_pages`` pages of a new crawl match, ListingUnchanged is raised and
+    the stored URL list from the last run is reused.
+    """
+    
+    def __init__(
+        self,
+        folder_name: str,
+        university_url: str,
+        pagination_type: str,
+        match_pages: int = RECRAWL_MATCH_PAGES
+    ):
+        self.path = os.path.join(_ensure_output_dirs(folder_name), f"{folder_name}{FINGERPRINTS_SUFFIX}")
+        self.university_url = university_url
+        self.pagination_type = pagination_type
+        self.match_pages = match_pages
+        self.pages: Dict[int, Dict[str, Any]] = {}
+        self.bodies: Dict[str, str] = {}
+        self.unchanged = False
+        self._responses: Dict[str, Dict[str, Optional[str]]] = {}
+        self.previous = self._load()
+    
+    def _load(self) -> Optional[Dict[str, Any]]:
+        """Load the last run's fingerprints if they belong to this crawl."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if previous.get("university_url") != self.university_url or previous.get("pagination_type") != self.pagination_type:
+            return None
+        previous["pages"] = {page["index"]: page for page in previous.get("pages", [])}
+        return previous
+    
+    @staticmethod
+    def links_hash(links: List[str]) -> str:
+        """Order-independent hash of a page's link set."""
+        return hashlib.sha256("\n".join(sorted(set(links))).encode("utf-8")).hexdigest()
+    
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validators to send for a page whose body was stored last run."""
+        if not self.previous or url not in self.previous.get("bodies", {}):
+            return {}
+        headers = {}
+        for page in self.previous["pages"].values():
+            if page["url"] == url:
+                if page.get("etag"):
+                    headers["If-None-Match"] = page["etag"]
+                if page.get("last_modified"):
+                    headers["If-Modified-Since"] = page["last_modified"]
+                break
+        return headers
+    
+    def cached_body(self, url: str) -> Optional[str]:
+        """Body stored last run for a page (used on 304 Not Modified)."""
+        return self.previous.get("bodies", {}).get(url) if self.previous else None
+    
+    def record_response(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str) -> None:
+        """Remember an HTTP response until its page is recorded."""
+        self._responses[url] = {"etag": etag, "last_modified": last_modified, "body": body}
+    
+    def restore_page(self, index: int, url: str, links: List[str]) -> None:
+        """Fingerprint a page restored from a checkpoint, so the saved fingerprints cover it."""
+        self.pages[index] = {
+            "index": index,
+            "url": url,
+            "links_hash": self.links_hash(links),
+            "etag": None,
+            "last_modified": None,
+        }
+    
+    def record_page(self, index: int, url: str, links: List[str]) -> None:
+        """
+        Fingerprint a completed page.
+        
+        Raises:
+            ListingUnchanged: If this completes the leading pages and all match the last run
+        """
+        response = self._responses.pop(url, {})
+        self.pages[index] = {
+            "index": index,
+            "url": url,
+            "links_hash": self.links_hash(links),
+            "etag": response.get("etag"),
+            "last_modified": response.get("last_modified"),
+        }
+        if index < self.match_pages and response.get("body") is not None:
+            self.bodies[url] = response["body"]
+        if self._leading_pages_match():
+            self.unchanged = True
+            raise ListingUnchanged(f"First {self._match_count()} listing page(s) unchanged since last run")
+    
+    def _match_count(self) -> int:
+        return min(self.match_pages, len(self.previous["pages"]))
+    
+    def _leading_pages_match(self) -> bool:
+        if self.unchanged or self.match_pages <= 0 or not self.previous or not self.previous["pages"]:
+            return False
+        for index in range(self._match_count()):
+            page, old = self.pages.get(index), self.previous["pages"].get(index)
+            if page is None or old is None or (page["url"], page["links_hash"]) != (old["url"], old["links_hash"]):
+                return False
+        return True
+    
+    def previous_urls(self) -> List[str]:
+        """Course URLs saved by the last run."""
+        return list(self.previous.get("urls", [])) if self.previous else []
+    
+    def save(self, urls: List[str]) -> None:
+        """
+        Store this run's fingerprints and URL list.
+        
+        After an early stop, pages beyond the matched ones keep their
+        fingerprints from the last run.
+        """
+        pages, bodies = dict(self.pages), dict(self.bodies)
+        if self.unchanged:
+            pages = {**self.previous["pages"], **pages}
+            bodies = {**self.previous.get("bodies", {}), **bodies}
+        data = {
+            "university_url": self.university_url,
+            "pagination_type": self.pagination_type,
+            "crawled_at": datetime.now().isoformat(),
+            "pages": [pages[index] for index in sorted(pages)],
+            "bodies": bodies,
+            "urls": urls,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+# -----------------------------
+# Browser Pool
+# -----------------------------
+
+BROWSER_LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions"
+]
+BROWSER_VIEWPORT = {"width": 1920, "height": 1080}
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+PAGE_MAX_NAVIGATIONS = 50  # Recycle a page after this many navigations
+PAGE_MAX_HEAP_MB = 512  # Recycle a page once its JS heap grows past this
+PAGE_HEAP_CHECK_INTERVAL = 10  # Navigations between JS heap checks
+
+# Listing crawls only read anchors, so heavy resources are blocked by default.
+# Configs can opt back in with "allow_resources" or disable this with "block_resources": False.
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+BLOCKED_THIRD_PARTY_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "licdn.com",
+    "tiktok.com",
+    "twitter.com",
+    "youtube.com",
+    "vimeo.com",
+)
+_BLOCKED_HOST_RE = re.compile(
+    r"(?:^|\.)(?:" + "|".join(re.escape(host) for host in BLOCKED_THIRD_PARTY_HOSTS) + r")$"
+)
+
+
+def _blocked_resource_types(config: Dict[str, Any]) -> frozenset:
+    """Resource types to abort for a university (empty if blocking is off)."""
+    if not config.get("block_resources", True):
+        return frozenset()
+    return DEFAULT_BLOCKED_RESOURCE_TYPES - set(config.get("allow_resources", []))
+
+
+async def _install_resource_blocking(context: BrowserContext, config: Dict[str, Any]) -> None:
+    """
+    Abort requests for heavy resources and third-party trackers in a context.
+    
+    Args:
+        context: Browser context to route
+        config: University configuration ("block_resources", "allow_resources")
+    """
+    if not config.get("block_resources", True):
+        return
+    blocked_types = _blocked_resource_types(config)
+    
+    async def handle(route):
+        request = route.request
+        if request.resource_type in blocked_types or _BLOCKED_HOST_RE.search(urlparse(request.url).hostname or ""):
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    await context.route("**/*", handle)
+
+
+class BrowserSession:
+    """
+    A browser context borrowed from a BrowserPool.
+    
+    Hands out pages with the pool's defaults and recycles them once they
+    have served too many navigations or their JS heap grows too large.
+    """
+    
+    def __init__(self, pool: "BrowserPool", context: BrowserContext):
+        self.pool = pool
+        self.context = context
+        self._navigations: Dict[Page, int] = {}
+    
+    async def new_page(self) -> Page:
+        """Open a new page in this session's context."""
+        page = await self.context.new_page()
+        page.set_default_timeout(PAGE_LOAD_TIMEOUT)
+        self._navigations[page] = 0
+        
+        def on_navigated(frame):
+            if frame == page.main_frame and page in self._navigations:
+                self._navigations[page] += 1
+        
+        page.on("framenavigated", on_navigated)
+        return page
+    
+    async def _heap_mb(self, page: Page) -> float:
+        """Used JS heap of a page in MB (0 if unavailable)."""
+        try:
+            used = await page.evaluate(
+                "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+            )
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0
+    
+    async def recycle(self, page: Page) -> Page:
+        """
+        Return page if it is still healthy, otherwise close it and return a fresh one.
+        
+        Args:
+            page: Page previously returned by new_page()
+            
+        Returns:
+            Page to use for the next navigation
+        """
+        navigations = self._navigations.get(page, 0)
+        worn_out = page.is_closed() or navigations >= self.pool.max_navigations
+        if not worn_out and navigations and navigations % PAGE_HEAP_CHECK_INTERVAL == 0:
+            worn_out = await self._heap_mb(page) >= self.pool.max_heap_mb
+        if not worn_out:
+            return page
+        await self.release(page)
+        return await self.new_page()
+    
+    async def release(self, page: Page) -> None:
+        """Close a page that is no longer needed."""
+        self._navigations.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    Long-lived pool of warm Chromium browsers.
+    
+    Launching Chromium is the expensive part of a scrape, so browsers are
+    started once (start() / prewarm) and kept running. Each scrape borrows a
+    fresh, isolated context from the least busy browser via session().
+    
+    Usage:
+        async with BrowserPool(size=2) as pool:
+            async with pool.session() as session:
+                page = await session.new_page()
+    """
+    
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_navigations: int = PAGE_MAX_NAVIGATIONS,
+        max_heap_mb: float = PAGE_MAX_HEAP_MB,
+        headless: bool = True
+    ):
+        self.size = max(1, size)
+        self.max_navigations = max_navigations
+        self.max_heap_mb = max_heap_mb
+        self.headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[Optional[Browser]] = [None] * self.size
+        self._active_sessions: List[int] = [0] * self.size
+        self._lock: Optional[asyncio.Lock] = None
+        self._http_client = None
+    
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def _launch(self) -> Browser:
+        return await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_LAUNCH_ARGS
+        )
+    
+    async def start(self) -> None:
+        """Launch (or relaunch disconnected) browsers so the pool is warm."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            for index, browser in enumerate(self._browsers):
+                if browser is None or not browser.is_connected():
+                    self._browsers[index] = await self._launch()
+    
+    def http_client(self):
+        """Keep-alive HTTP client shared by browserless crawls on this pool."""
+        if self._http_client is None:
+            self._http_client = _new_http_client()
+        return self._http_client
+    
+    async def close(self) -> None:
+        """Close all browsers, the HTTP client and stop Playwright."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        for index, browser in enumerate(self._browsers):
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            self._browsers[index] = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    @asynccontextmanager
+    async def session(self, config: Optional[Dict[str, Any]] = None) -> AsyncIterator[BrowserSession]:
+        """
+        Borrow an isolated browser context from the least busy browser.
+        
+        Args:
+            config: Optional university configuration; applies its resource
+                blocking ("block_resources", "allow_resources") and
+                "javascript_enabled" settings to the context
+        
+        Yields:
+            BrowserSession whose context is closed on exit
+        """
+        config = config or {"block_resources": False}
+        await self.start()
+        index = min(range(self.size), key=lambda i: self._active_sessions[i])
+        self._active_sessions[index] += 1
+        try:
+            context = await self._browsers[index].new_context(
+                viewport=BROWSER_VIEWPORT,
+                user_agent=BROWSER_USER_AGENT,
+                java_script_enabled=config.get("javascript_enabled", True)
+            )
+            try:
+                await _install_resource_blocking(context, config)
+                yield BrowserSession(self, context)
+            finally:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+        finally:
+            self._active_sessions[index] -= 1
+
+
+# A single pool shared by the sync entry points. Playwright objects are bound
+# to the event loop that created them, so the pool lives on its own loop thread.
+_shared_pool: Optional[BrowserPool] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_lock = threading.Lock()
+
+
+def _get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Start (once) the background event loop that owns the shared pool."""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True).start()
+            _shared_loop = loop
+        return _shared_loop
+
+
+def get_shared_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool (created lazily, not yet launched)."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+        return _shared_pool
+
+
+def run_with_shared_pool(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine on the shared pool's event loop and wait for the result.
+    
+    Args:
+        coro: Coroutine using get_shared_browser_pool()
+        
+    Returns:
+        Result of the coroutine
+    """
+    loop = _get_shared_loop()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def prewarm_browser_pool() -> BrowserPool:
+    """
+    Launch the shared pool's browsers ahead of the first scrape (e.g. at app start).
+    
+    Returns:
+        The warm shared BrowserPool
+    """
+    pool = get_shared_browser_pool()
+    run_with_shared_pool(pool.start())
+    return pool
+
+
+@atexit.register
+def shutdown_browser_pool() -> None:
+    """Close the shared pool's browsers, if any were launched."""
+    global _shared_pool
+    with _shared_lock:
+        pool, _shared_pool = _shared_pool, None
+        loop = _shared_loop
+    if pool is not None and loop is not None and loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(pool.close(), loop).result(timeout=30)
+        except Exception:
+            pass
+
+
+# -----------------------------
+# Browserless Fast Path
+# -----------------------------
+
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+
+
+def _new_http_client():
+    """Create a pooled keep-alive HTTP client (HTTP/2 when h2 is installed)."""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        follow_redirects=True,
+        timeout=PAGE_LOAD_TIMEOUT / 1000,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE
+        ),
+        headers={
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        }
+    )
+
+
+def http_fast_path_available() -> bool:
+    """Whether the optional httpx/selectolax dependencies are installed."""
+    return httpx is not None and LexborHTMLParser is not None
+
+
+async def _fetch_html(client, url: str, config: Dict[str, Any], fingerprints: Optional[ListingFingerprints] = None):
+    """
+    Fetch a listing page and parse it.
+    
+    With fingerprints, pages stored by the last run are requested
+    conditionally and the stored body is parsed on 304 Not Modified.
+    """
+    await _polite(config, url)
+    headers = fingerprints.conditional_headers(url) if fingerprints else {}
+    with crawl_metrics.span("fetch"):
+        response = await client.get(url, headers=headers)
+    crawl_metrics.count("requests")
+    crawl_metrics.count("bytes", len(response.content))
+    if response.status_code == 304 and fingerprints and fingerprints.cached_body(url) is not None:
+        body = fingerprints.cached_body(url)
+    else:
+        response.raise_for_status()
+        body = response.text
+    if fingerprints:
+        fingerprints.record_response(url, response.headers.get("etag"), response.headers.get("last-modified"), body)
+    with crawl_metrics.span("parse"):
+        return LexborHTMLParser(body)
+
+
+def _extract_course_links_from_html(tree, config: Dict[str, Any], base_url: str) -> List[str]:
+    """
+    Extract course links from parsed HTML using the config selector.
+    
+    Args:
+        tree: Parsed listing page
+        config: University configuration
+        base_url: Base URL for resolving relative links
+        
+    Returns:
+        List of course URLs
+    """
+    selector = config.get("course_selector")
+    if not selector:
+        return []
+    field = _extraction_field(config)
+    with crawl_metrics.span("extract"):
+        try:
+            nodes = tree.css(selector)
+        except Exception as e:
+            print(f"Error extracting course links: {e}")
+            return []
+        if field == "text":
+            values = [node.text(deep=True) for node in nodes]
+        else:
+            values = [node.attributes.get(field) for node in nodes]
+        return _resolve_extracted_values(values, config, base_url)
+
+
+def _next_url_from_html(tree, config: Dict[str, Any], current_url: str, visited_urls: List[str]) -> Optional[str]:
+    """
+    Find the next listing page from a next link in parsed HTML.
+    
+    Mirrors _handle_next_button_pagination for links with an href; buttons
+    that need a click cannot be followed without a browser.
+    
+    Returns:
+        Next URL if available, None otherwise
+    """
+    selector = config.get("pagination_selector")
+    if not selector:
+        return None
+    try:
+        next_button = tree.css_first(selector)
+    except Exception:
+        return None
+    if next_button is None:
+        return None
+    
+    attrs = next_button.attributes
+    if "disabled" in attrs or "disabled" in (attrs.get("class") or "").lower() or attrs.get("aria-disabled") == "true":
+        return None
+    
+    next_href = attrs.get("href")
+    if not next_href or next_href in ["", "#", "javascript:void(0)"]:
+        return None
+    
+    next_url = urljoin(current_url, next_href)
+    if next_url == current_url or next_url in visited_urls:
+        return None
+    return next_url
+
+
+async def _crawl_listing_pages_http(
+    client,
+    university_url: str,
+    config: Dict[str, Any],
+    checkpoint: CrawlCheckpoint
+) -> Optional[List[str]]:
+    """
+    Walk every listing page over plain HTTP, without a browser.
+    
+    Uses the same selectors, resolvers, pagination strategies and
+    checkpointing as the browser crawl.
+    
+    Args:
+        client: httpx.AsyncClient
+        university_url: URL of the university course page
+        config: University configuration
+        checkpoint: Checkpoint to resume from and record into
+        
+    Returns:
+        List of course URLs, or None if the first page yields no links
+        (the caller then falls back to Playwright)
+    """
+    pagination_type = config.get("pagination_type", "single_page")
+    parsed = urlparse(university_url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    
+    with crawl_metrics.page(0, university_url):
+        try:
+            first_tree = await _fetch_html(client, university_url, config, checkpoint.fingerprints)
+        except Exception as e:
+            print(f"HTTP fetch failed for {university_url}: {e}")
+            return None
+        first_links = _extract_course_links_from_html(first_tree, config, base_url)
+    if not first_links:
+        return None
+    
+    def fetchers(pagination_urls: List[str]) -> List[Callable[[int], Awaitable[List[str]]]]:
+        async def fetch(index: int) -> List[str]:
+            if pagination_urls[index] == university_url:
+                return first_links  # Already fetched
+            with crawl_metrics.page(index, pagination_urls[index]):
+                tree = await _fetch_html(client, pagination_urls[index], config, checkpoint.fingerprints)
+                return _extract_course_links_from_html(tree, config, base_url)
+        return [fetch] * _page_concurrency(config)
+    
+    if pagination_type == "page_numbers":
+        total_pages = 1
+        selector = config.get("pagination_selector")
+        if selector:
+            with crawl_metrics.span("pagination"):
+                node = first_tree.css_first(selector)
+                if node is not None:
+                    total_pages = _total_pages_from_text(node.text(deep=True), config)
+                    if total_pages is None:
+                        total_pages = len(first_tree.css("select[aria-label*='page'] option")) or 1
+        pagination_urls = _page_number_urls(university_url, total_pages, config.get("pagination_param", "page"))
+        return await _fetch_in_page_order(
+            pagination_urls, fetchers(pagination_urls),
+            known_results=checkpoint.known_results(pagination_urls),
+            on_page=lambda index, links: checkpoint.record_page(index, pagination_urls[index], links)
+        )
+    
+    if pagination_type == "url_params":
+        pagination_urls = await _handle_url_params_pagination(None, config, university_url)
+        probed = checkpoint.known_results(pagination_urls)
+        if 0 not in probed:
+            probed[0] = first_links
+            checkpoint.record_page(0, pagination_urls[0], first_links)
+        if config.get("pagination_probe"):
+            async def probe(index: int) -> List[str]:
+                if index not in probed:
+                    probed[index] = await fetchers(pagination_urls)[0](index)
+                    checkpoint.record_page(index, pagination_urls[index], probed[index])
+                return probed[index]
+            
+            last_index = await _probe_last_page(probe, len(pagination_urls))
+            pagination_urls = pagination_urls[:last_index + 1]
+        return await _fetch_in_page_order(
+            pagination_urls, fetchers(pagination_urls),
+            stop_when_exhausted=True,
+            known_results=probed,
+            on_page=lambda index, links: checkpoint.record_page(index, pagination_urls[index], links)
+        )
+    
+    if pagination_type == "next_button":
+        records = checkpoint.ordered_pages()
+        if records:
+            # Continue after the last checkpointed page
+            all_urls = [url for record in records for url in record["links"]]
+            visited_urls = [record["url"] for record in records]
+            current_url = records[-1]["next_url"]
+        else:
+            all_urls = list(first_links)
+            visited_urls = [university_url]
+            with crawl_metrics.page(0, university_url), crawl_metrics.span("pagination"):
+                current_url = _next_url_from_html(first_tree, config, university_url, visited_urls)
+            checkpoint.record_page(0, university_url, first_links, current_url)
+        while current_url and len(visited_urls) < MAX_PAGES:
+            with crawl_metrics.page(len(visited_urls), current_url):
+                try:
+                    tree = await _fetch_html(client, current_url, config, checkpoint.fingerprints)
+                except Exception as e:
+                    print(f"Error in pagination loop: {e}")
+                    break
+                visited_urls.append(current_url)
+                course_urls = _extract_course_links_from_html(tree, config, base_url)
+                all_urls.extend(course_urls)
+                with crawl_metrics.span("pagination"):
+                    next_url = _next_url_from_html(tree, config, current_url, visited_urls)
+            checkpoint.record_page(len(visited_urls) - 1, current_url, course_urls, next_url)
+            current_url = next_url
+        return all_urls
+    
+    # single_page, accordion (sections are already in the markup) or unknown
+    checkpoint.record_page(0, university_url, first_links)
+    return first_links
+
+
+async def _crawl_without_browser(
+    pool: Optional["BrowserPool"],
+    university_url: str,
+    config: Dict[str, Any],
+    checkpoint: CrawlCheckpoint
+) -> Optional[List[str]]:
+    """
+    Try the browserless fast path for a university.
+    
+    Returns:
+        List of course URLs, or None if Playwright is needed instead
+    """
+    if not http_fast_path_available():
+        print("HTTP fast path unavailable (install httpx and selectolax); using Playwright")
+        return None
+    
+    if pool is not None:
+        all_urls = await _crawl_listing_pages_http(pool.http_client(), university_url, config, checkpoint)
+    else:
+        async with _new_http_client() as client:
+            all_urls = await _crawl_listing_pages_http(client, university_url, config, checkpoint)
+    
+    if all_urls is None:
+        print(f"No course links in server-rendered HTML for {university_url}; falling back to Playwright")
+    return all_urls
+
+
 # -----------------------------
 # Unified Scraper Functions
 # -----------------------------
 
+# Reads one field from every matched element in a single in-page evaluation.
+# "text" mirrors Playwright's inner_text(); anything else is an attribute name.
+_EXTRACT_FIELD_SCRIPT = """(elements, field) => elements.map(el =>
+    field === "text" ? el.innerText : el.getAttribute(field)
+)"""
+
+
+def _extraction_field(config: Dict[str, Any]) -> str:
+    """
+    Element field holding the course link for a university.
+    
+    Returns:
+        "text" for slug-from-title sites, otherwise the attribute name
+    """
+    if config.get("special_logic") == "generate_slug_from_title":
+        return "text"
+    if config.get("course_selector") == "div.listing-item__header.test a[data-live-url]":
+        return "data-live-url"
+    return "href"
+
+
+def _slug_course_url(title: str, base_url: str) -> Optional[str]:
+    """York College: build a programme URL from a course title."""
+    slug = re.sub(r'[^a-z0-9\s]', '', title.lower())
+    slug = re.sub(r'\s+', '-', slug)
+    slug = re.sub(r'-+', '-', slug).strip('-')
+    if slug and len(slug) >= 3:
+        parsed = urlparse(base_url)
+        return f"{parsed.scheme}://{parsed.netloc}/academics/programs/{slug}"
+    return None
+
+
+def _resolve_extracted_values(
+    values: List[Optional[str]],
+    config: Dict[str, Any],
+    base_url: str
+) -> List[str]:
+    """
+    Turn raw field values read from course elements into course URLs.
+    
+    Args:
+        values: One value per matched element (see _extraction_field)
+        config: University configuration
+        base_url: Base URL for resolving relative links
+        
+    Returns:
+        List of course URLs
+    """
+    course_urls = []
+    field = _extraction_field(config)
+    url_resolution = config.get("url_resolution")
+    
+    if field == "href" and url_resolution:
+        # Redirect hrefs: resolve the whole batch through the memoised resolvers
+        hrefs = [value for value in values if value]
+        return [url for url in resolve_hrefs(hrefs, base_url, url_resolution) if url]
+    
+    for value in values:
+        try:
+            if field == "text":
+                # York College: Generate URL from title
+                if value:
+                    course_url = _slug_course_url(value, base_url)
+                    if course_url:
+                        course_urls.append(course_url)
+            elif field == "data-live-url":
+                # Otago: Extract from data-live-url attribute
+                if value:
+                    course_urls.append(value.strip())
+            else:
+                # Standard: Extract href attribute
+                if not value:
+                    continue
+                
+                # Standard URL join
+                course_urls.append(urljoin(base_url, value))
+        except Exception:
+            continue  # Skip malformed URLs
+    
+    return course_urls
+
+
 async def _extract_course_links(
     page: Page,
     config: Dict[str, Any],
@@ -248,6 +1377,9 @@ async def _extract_course_links(
     """
     Extract course links from current page using config selector.
     
+    All matched elements are read in one in-page evaluation; resolution
+    then runs in Python on the returned batch.
+    
     Args:
         page: Playwright page object
         config: University configuration
@@ -256,66 +1388,79 @@ async def _extract_course_links(
     Returns:
         List of course URLs
     """
-    course_urls = []
     selector = config.get("course_selector")
     if not selector:
-        return course_urls
+        return []
     
     try:
         # Wait for selector if specified
         wait_selector = config.get("wait_selector", selector)
         if wait_selector:
             try:
-                await page.wait_for_selector(wait_selector, timeout=20000)
+                with crawl_metrics.span("wait_selector"):
+                    await page.wait_for_selector(wait_selector, timeout=20000)
             except PWTimeoutError:
                 pass  # Continue anyway
         
-        # Extract links based on selector
-        elements = await page.query_selector_all(selector)
-        
-        url_resolution = config.get("url_resolution")
-        special_logic = config.get("special_logic")
-        
-        for el in elements:
-            try:
-                if special_logic == "generate_slug_from_title":
-                    # York College: Generate URL from title
-                    title = await el.inner_text()
-                    if title:
-                        slug = re.sub(r'[^a-z0-9\s]', '', title.lower())
-                        slug = re.sub(r'\s+', '-', slug)
-                        slug = re.sub(r'-+', '-', slug).strip('-')
-                        if slug and len(slug) >= 3:
-                            parsed = urlparse(base_url)
-                            course_url = f"{parsed.scheme}://{parsed.netloc}/academics/programs/{slug}"
-                            course_urls.append(course_url)
-                elif selector == "div.listing-item__header.test a[data-live-url]":
-                    # Otago: Extract from data-live-url attribute
-                    href = await el.get_attribute("data-live-url")
-                    if href:
-                        course_urls.append(href.strip())
-                else:
-                    # Standard: Extract href attribute
-                    href = await el.get_attribute("href")
-                    if not href:
-                        continue
-                    
-                    # Resolve URL using resolution function if provided
-                    if url_resolution:
-                        resolved = url_resolution(href, base_url)
-                        if resolved:
-                            course_urls.append(resolved)
-                    else:
-                        # Standard URL join
-                        full_url = urljoin(base_url, href)
-                        course_urls.append(full_url)
-            except Exception:
-                continue  # Skip malformed URLs
-                
+        # Read every matched element in a single round trip
+        with crawl_metrics.span("extract"):
+            values = await page.eval_on_selector_all(selector, _EXTRACT_FIELD_SCRIPT, _extraction_field(config))
+            return _resolve_extracted_values(values, config, base_url)
+    
     except Exception as e:
         print(f"Error extracting course links: {e}")
     
-    return course_urls
+    return []
+
+
+async def _click_next_button(
+    page: Page,
+    config: Dict[str, Any],
+    next_button,
+    current_url: str,
+    visited_urls: List[str]
+) -> Optional[str]:
+    """
+    Click a next button without an href and return the URL it navigates to.
+    
+    Only waits the full pagination_timeout once the click has started a
+    navigation; a button that does nothing, or updates the listing in place
+    without changing the URL, gives up after PAGINATION_CLICK_TIMEOUT.
+    
+    Returns:
+        New unvisited URL, or None
+    """
+    navigating = asyncio.Event()
+    
+    def on_request(request) -> None:
+        if request.is_navigation_request() and request.frame == page.main_frame:
+            navigating.set()
+    
+    def url_changed(url: str) -> bool:
+        return url != current_url
+    
+    page.on("request", on_request)
+    try:
+        await next_button.click()
+        try:
+            await page.wait_for_url(url_changed, wait_until="commit", timeout=PAGINATION_CLICK_TIMEOUT)
+        except PWTimeoutError:
+            if not navigating.is_set():
+                return None
+            await page.wait_for_url(
+                url_changed,
+                wait_until="commit",
+                timeout=config.get("pagination_timeout", PAGINATION_TIMEOUT)
+            )
+    except Exception:
+        return None
+    finally:
+        page.remove_listener("request", on_request)
+    
+    new_url = page.url
+    if new_url != current_url and new_url not in visited_urls:
+        return new_url
+    return None
 
 
 async def _handle_next_button_pagination(
@@ -348,19 +1493,14 @@ async def _handle_next_button_pagination(
         if is_disabled or "disabled" in class_attr.lower() or aria_disabled == "true":
             return None
         
+        # Some sites hide the button on the last page instead of disabling it
+        if not await next_button.is_visible():
+            return None
+        
         # Get next URL
         next_href = await next_button.get_attribute("href")
         if not next_href or next_href in ["", "#", "javascript:void(0)"]:
-            # Try clicking and getting new URL
-            try:
-                await next_button.click()
-                await page.wait_for_timeout(config.get("pagination_delay", PAGINATION_DELAY))
-                new_url = page.url
-                if new_url != current_url and new_url not in visited_urls:
-                    return new_url
-            except Exception:
-                pass
-            return None
+            return await _click_next_button(page, config, next_button, current_url, visited_urls)
         
         # Resolve next URL
         next_url = urljoin(current_url, next_href)
@@ -373,6 +1513,32 @@ async def _handle_next_button_pagination(
         return None
 
 
+def _total_pages_from_text(text: str, config: Dict[str, Any]) -> Optional[int]:
+    """Parse the total page count from pagination text (e.g., "Page 1 of 22")."""
+    regex = getattr(config, "pagination_extract_regex", None) or re.compile(
+        config.get("pagination_extract_pattern", r"of\D*(\d+)")
+    )
+    match = regex.search(text.replace("\xa0", " ").replace("Page", ""))
+    return int(match.group(1)) if match else None
+
+
+def _page_number_urls(base_url: str, total_pages: int, param: str) -> List[str]:
+    """Generate one listing URL per page number (page 1 is base_url itself)."""
+    pagination_urls = []
+    parsed = urlparse(base_url)
+    base_path = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    query_params = parse_qs(parsed.query, keep_blank_values=True)
+    
+    for i in range(1, total_pages + 1):
+        if i == 1:
+            pagination_urls.append(base_url)
+        else:
+            query_params[param] = [str(i - 1)] if "shu.ac.uk" in base_url else [str(i)]
+            query_string = urlencode(query_params, doseq=True)
+            pagination_urls.append(f"{base_path}?{query_string}")
+    return pagination_urls
+
+
 async def _handle_page_numbers_pagination(
     page: Page,
     config: Dict[str, Any],
@@ -384,97 +1550,345 @@ async def _handle_page_numbers_pagination(
     Returns:
         List of pagination URLs
     """
-    pagination_urls = []
     selector = config.get("pagination_selector")
     param = config.get("pagination_param", "page")
     
     try:
-        if selector:
-            await page.wait_for_selector(selector, timeout=30000)
-            
-            # Extract total pages
+        if not selector:
+            return [base_url]
+        
+        await page.wait_for_selector(selector, timeout=30000)
+        
+        # Extract total pages
+        total_pages = 1
+        try:
+            # Try extracting from text (e.g., "Page 1 of 22")
+            text = await page.locator(selector).inner_text()
+            total_pages = _total_pages_from_text(text, config)
+            if total_pages is None:
+                # Fallback: count options in select
+                option_count = await page.locator(f"select[aria-label*='page'] option").count()
+                total_pages = option_count if option_count > 0 else 1
+        except Exception:
             total_pages = 1
-            try:
-                # Try extracting from text (e.g., "Page 1 of 22")
-                text = await page.locator(selector).inner_text()
-                pattern = config.get("pagination_extract_pattern", r"of\D*(\d+)")
-                match = re.search(pattern, text.replace("\xa0", " ").replace("Page", ""))
-                if match:
-                    total_pages = int(match.group(1))
-                else:
-                    # Fallback: count options in select
-                    option_count = await page.locator(f"select[aria-label*='page'] option").count()
-                    if option_count > 0:
-                        total_pages = option_count
-            except Exception:
-                total_pages = 1
-            
-            # Generate pagination URLs
-            parsed = urlparse(base_url)
-            base_path = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            query_params = parse_qs(parsed.query, keep_blank_values=True)
-            
-            for i in range(1, total_pages + 1):
-                if i == 1:
-                    pagination_urls.append(base_url)
-                else:
-                    query_params[param] = [str(i - 1)] if "shu.ac.uk" in base_url else [str(i)]
-                    query_string = urlencode(query_params, doseq=True)
-                    pagination_urls.append(f"{base_path}?{query_string}")
-        else:
-            pagination_urls.append(base_url)
+        
+        # Generate pagination URLs
+        return _page_number_urls(base_url, total_pages, param)
             
     except Exception as e:
         print(f"Error extracting page numbers: {e}")
-        pagination_urls.append(base_url)
+        return [base_url]
+
+
+def _url_params_page_url(config: Dict[str, Any], base_url: str, page_number: int) -> str:
+    """
+    Build the URL of a listing page for url_params pagination.
     
-    return pagination_urls
+    Page 1 is base_url itself; page n sets ``pagination_param`` to
+    ``pagination_start + (n - 1) * pagination_increment``.
+    """
+    if page_number == 1:
+        return base_url
+    param = config.get("pagination_param", "page")
+    increment = config.get("pagination_increment", 1)
+    start_value = config.get("pagination_start", 0)
+    
+    parsed = urlparse(base_url)
+    base_path = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    query_params = parse_qs(parsed.query, keep_blank_values=True)
+    query_params[param] = [str(start_value + (page_number - 1) * increment)]
+    return f"{base_path}?{urlencode(query_params, doseq=True)}"
 
 
 async def _handle_url_params_pagination(
-    page: Page,
+    page: Optional[Page],
     config: Dict[str, Any],
     base_url: str
 ) -> List[str]:
     """
     Handle pagination by modifying URL parameters.
     
+    Generates up to ``max_pages`` candidate URLs; the crawl stops early once
+    a page is empty or adds no new URLs (see _fetch_in_page_order).
+    
     Returns:
         List of pagination URLs
     """
-    pagination_urls = []
-    param = config.get("pagination_param", "page")
-    increment = config.get("pagination_increment", 1)
-    start_value = config.get("pagination_start", 1)
+    max_pages = config.get("max_pages", MAX_PAGES)
+    return [_url_params_page_url(config, base_url, n) for n in range(1, max_pages + 1)]
+
+
+async def _scrape_listing_page(
+    page: Page,
+    pag_url: str,
+    config: Dict[str, Any],
+    base_url: str,
+    navigate: bool = True
+) -> List[str]:
+    """
+    Load a single listing page (unless already loaded) and extract its course links.
     
-    # For Canterbury, we need to detect when to stop
-    if "canterbury.ac.nz" in base_url:
-        # Canterbury uses start_rank parameter
-        current_rank = start_value
-        max_pages = 50  # Safety limit
+    Args:
+        page: Playwright page object
+        pag_url: Listing page URL
+        config: University configuration
+        base_url: Base URL for resolving relative links
+        navigate: Whether to navigate to pag_url first
         
-        for page_num in range(1, max_pages + 1):
-            if page_num == 1:
-                pagination_urls.append(base_url)
-            else:
-                url = f"{base_url}&start_rank={current_rank}"
-                pagination_urls.append(url)
-                current_rank += increment
-    else:
-        # Standard URL param pagination
-        parsed = urlparse(base_url)
-        base_path = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-        query_params = parse_qs(parsed.query, keep_blank_values=True)
+    Returns:
+        List of course URLs found on the page
+    """
+    if navigate:
+        await _goto(page, config, pag_url)
+    
+    # Handle cookies/overlays if needed (only if the banner is already showing)
+    if "canterbury.ac.nz" in pag_url:
+        try:
+            accept_btn = page.get_by_role("button", name=re.compile(r"Accept|Agree", re.I)).first
+            if await accept_btn.count() and await accept_btn.is_visible():
+                await accept_btn.click()
+                await accept_btn.wait_for(state="hidden", timeout=COOKIE_BANNER_TIMEOUT)
+        except:
+            pass
+    
+    return await _extract_course_links(page, config, base_url)
+
+
+async def _fetch_in_page_order(
+    pagination_urls: List[str],
+    fetchers: List[Callable[[int], Awaitable[List[str]]]],
+    stop_when_exhausted: bool = False,
+    known_results: Optional[Dict[int, List[str]]] = None,
+    on_page: Optional[Callable[[int, List[str]], None]] = None
+) -> List[str]:
+    """
+    Run listing page fetchers with bounded concurrency and merge results in page order.
+    
+    ``fetchers[0]`` handles the first page on its own, then every fetcher
+    (one per concurrent worker) pulls the next page index until none are
+    left. A fetcher that raises is logged and its page skipped.
+    
+    With ``stop_when_exhausted``, pages are checked in page order as they
+    complete and the crawl stops at the first page that is empty or adds
+    no new URLs; pages fetched past that point are discarded.
+    
+    Args:
+        pagination_urls: Listing page URLs in page order
+        fetchers: Async callables mapping a page index to its course URLs
+        stop_when_exhausted: Stop at the first empty or all-duplicate page
+        known_results: Links already fetched for some page indices (e.g. while probing)
+        on_page: Called with (index, links) after each newly fetched page
         
-        for i in range(1, MAX_PAGES + 1):
-            if i == 1:
-                pagination_urls.append(base_url)
+    Returns:
+        List of course URLs in page order
+    """
+    if not pagination_urls:
+        return []
+    
+    known_results = known_results or {}
+    results: List[Optional[List[str]]] = [None] * len(pagination_urls)
+    done = [False] * len(pagination_urls)
+    stop_at = len(pagination_urls)
+    frontier = 0  # First page not yet checked for exhaustion
+    seen = set()
+    unchanged: Optional[ListingUnchanged] = None
+    
+    def check_exhausted() -> None:
+        nonlocal stop_at, frontier
+        while frontier < stop_at and done[frontier]:
+            course_urls = results[frontier]
+            if course_urls is not None:
+                new_urls = set(course_urls) - seen
+                if not new_urls:
+                    stop_at = frontier
+                    return
+                seen.update(new_urls)
+            frontier += 1
+    
+    async def scrape_index(fetch: Callable[[int], Awaitable[List[str]]], index: int) -> None:
+        nonlocal stop_at, unchanged
+        try:
+            if index in known_results:
+                results[index] = known_results[index]
             else:
-                query_params[param] = [str(i - 1)]
-                query_string = urlencode(query_params, doseq=True)
-                pagination_urls.append(f"{base_path}?{query_string}")
+                results[index] = await fetch(index)
+                if on_page:
+                    on_page(index, results[index])
+        except ListingUnchanged as e:
+            unchanged, stop_at = e, 0  # Let in-flight pages finish, start no more
+        except Exception as e:
+            print(f"Error scraping page {pagination_urls[index]}: {e}")
+        done[index] = True
+        if stop_when_exhausted:
+            check_exhausted()
     
-    return pagination_urls
+    await scrape_index(fetchers[0], 0)
+    
+    remaining = iter(range(1, len(pagination_urls)))
+    
+    async def worker(fetch: Callable[[int], Awaitable[List[str]]]) -> None:
+        for index in remaining:
+            if index >= stop_at:
+                break
+            await scrape_index(fetch, index)
+    
+    worker_count = min(len(fetchers), len(pagination_urls) - 1)
+    if worker_count > 0 and stop_at > 0:
+        await asyncio.gather(*(worker(fetch) for fetch in fetchers[:worker_count]))
+    if unchanged:
+        raise unchanged
+    
+    # Merge in page order, dropping the stop page and anything past it
+    all_urls = []
+    for index, course_urls in enumerate(results):
+        if index >= stop_at:
+            break
+        if course_urls:
+            all_urls.extend(course_urls)
+    return all_urls
+
+
+async def _probe_last_page(
+    fetch: Callable[[int], Awaitable[List[str]]],
+    page_count: int
+) -> int:
+    """
+    Find the last listing page with results in O(log n) requests.
+    
+    Probes page indices 1, 2, 4, 8, ... until a page has no results, then
+    binary searches between the last good and first bad index. A page
+    counts as having results if it is non-empty and differs from the first
+    page (some sites repeat a page once past the end).
+    
+    Args:
+        fetch: Async callable mapping a page index to its course URLs
+        page_count: Number of candidate pages
+        
+    Returns:
+        Index of the last page with results (0 if only the first page has any)
+    """
+    first_page = set(await fetch(0))
+    
+    async def has_results(index: int) -> bool:
+        try:
+            links = set(await fetch(index))
+        except ListingUnchanged:
+            raise
+        except Exception:
+            return False
+        return bool(links) and links != first_page
+    
+    good, bad = 0, 1
+    while bad < page_count and await has_results(bad):
+        good, bad = bad, bad * 2
+    bad = min(bad, page_count)
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if await has_results(mid):
+            good = mid
+        else:
+            bad = mid
+    print(f"Probed {page_count} candidate pages: last page with results is {good + 1}")
+    return good
+
+
+def _page_concurrency(config: Dict[str, Any]) -> int:
+    """Number of listing pages a university may fetch in parallel."""
+    return max(1, int(config.get("page_concurrency", DEFAULT_PAGE_CONCURRENCY)))
+
+
+async def _scrape_pagination_urls(
+    session: "BrowserSession",
+    page: Page,
+    pagination_urls: List[str],
+    config: Dict[str, Any],
+    base_url: str,
+    first_page_loaded: bool = False,
+    stop_when_exhausted: bool = False,
+    known_results: Optional[Dict[int, List[str]]] = None,
+    on_page: Optional[Callable[[int, List[str]], None]] = None
+) -> List[str]:
+    """
+    Scrape a known list of pagination URLs with bounded concurrency.
+    
+    The first URL is always scraped on ``page`` (reusing it as-is when
+    ``first_page_loaded`` is set); the remaining URLs are fanned out across
+    up to ``page_concurrency`` pages from the same browser session. Results
+    are merged in page order, so the output matches a serial crawl.
+    
+    Args:
+        session: Browser session used to open worker pages
+        page: Page already open in the session (used for the first URL)
+        pagination_urls: Listing page URLs in page order
+        config: University configuration
+        base_url: Base URL for resolving relative links
+        first_page_loaded: Whether ``page`` already shows pagination_urls[0]
+        stop_when_exhausted: Stop at the first empty or all-duplicate page
+        known_results: Links already fetched for some page indices
+        on_page: Called with (index, links) after each newly scraped page
+        
+    Returns:
+        List of course URLs in page order
+    """
+    # Worker pages are opened lazily, the first worker reuses ``page``
+    worker_pages: List[Optional[Page]] = [page] + [None] * (_page_concurrency(config) - 1)
+    
+    def make_fetcher(slot: int) -> Callable[[int], Awaitable[List[str]]]:
+        async def fetch(index: int) -> List[str]:
+            if worker_pages[slot] is None:
+                worker_pages[slot] = await session.new_page()
+            elif index:
+                worker_pages[slot] = await session.recycle(worker_pages[slot])
+            navigate = index != 0 or not first_page_loaded
+            with crawl_metrics.page(index, pagination_urls[index]):
+                return await _scrape_listing_page(worker_pages[slot], pagination_urls[index], config, base_url, navigate)
+        return fetch
+    
+    try:
+        return await _fetch_in_page_order(
+            pagination_urls,
+            [make_fetcher(slot) for slot in range(len(worker_pages))],
+            stop_when_exhausted=stop_when_exhausted,
+            known_results=known_results,
+            on_page=on_page
+        )
+    finally:
+        for extra_page in worker_pages[1:]:
+            if extra_page is not None:
+                await session.release(extra_page)
+
+
+# Expanded once the button reports aria-expanded="true" or more courses are in the DOM
+_ACCORDION_EXPANDED_SCRIPT = """([button, selector, count]) =>
+    button.getAttribute("aria-expanded") === "true" ||
+    document.querySelectorAll(selector).length > count"""
+
+
+async def _wait_for_accordion_expanded(
+    page: Page,
+    button,
+    course_selector: str,
+    course_count: int,
+    has_aria_expanded: bool
+) -> None:
+    """
+    Wait for a clicked accordion section to expand.
+    
+    Uses the button's aria-expanded state or a growing course count; for
+    buttons without aria-expanded, waits for the network to go idle instead.
+    Gives up silently after ACCORDION_TIMEOUT.
+    """
+    try:
+        if has_aria_expanded:
+            await page.wait_for_function(
+                _ACCORDION_EXPANDED_SCRIPT,
+                arg=[button, course_selector, course_count],
+                timeout=ACCORDION_TIMEOUT
+            )
+        else:
+            await page.wait_for_load_state("networkidle", timeout=ACCORDION_TIMEOUT)
+    except PWTimeoutError:
+        pass
 
 
 async def _handle_accordion_pagination(
@@ -491,14 +1905,17 @@ async def _handle_accordion_pagination(
     if not selector:
         return False
     
+    course_selector = config.get("course_selector") or selector
+    
     try:
         accordion_buttons = await page.query_selector_all(selector)
         for btn in accordion_buttons:
             try:
                 aria_expanded = await btn.get_attribute("aria-expanded")
                 if aria_expanded != "true":
+                    course_count = await page.locator(course_selector).count()
                     await btn.click()
-                    await page.wait_for_timeout(1000)  # Wait for accordion to expand
+                    await _wait_for_accordion_expanded(page, btn, course_selector, course_count, aria_expanded is not None)
             except Exception:
                 continue
         return True
@@ -506,15 +1923,179 @@ async def _handle_accordion_pagination(
         return False
 
 
-async def scrape_university_courses(university_url: str) -> Tuple[int, List[str]]:
+async def _crawl_listing_pages(
+    session: "BrowserSession",
+    university_url: str,
+    config: Dict[str, Any],
+    checkpoint: CrawlCheckpoint
+) -> List[str]:
+    """
+    Walk every listing page of a university and collect course URLs.
+    
+    Paginated crawls record each completed page in the checkpoint and skip
+    pages it already holds.
+    
+    Args:
+        session: Browser session to open pages in
+        university_url: URL of the university course page
+        config: University configuration
+        checkpoint: Checkpoint to resume from and record into
+        
+    Returns:
+        List of course URLs (may contain duplicates)
+    """
+    pagination_type = config.get("pagination_type", "single_page")
+    all_urls = []
+    pagination_urls = []
+    
+    page = await session.new_page()
+    
+    # Parse base URL
+    parsed = urlparse(university_url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    
+    # Handle different pagination types
+    if pagination_type == "single_page":
+        # Single page - no pagination
+        with crawl_metrics.page(0, university_url):
+            await _goto(page, config, university_url)
+            pagination_urls.append(university_url)
+            course_urls = await _extract_course_links(page, config, base_url)
+        all_urls.extend(course_urls)
+        checkpoint.record_page(0, university_url, course_urls)
+        
+    elif pagination_type == "accordion":
+        # Accordion - expand all sections
+        with crawl_metrics.page(0, university_url):
+            await _goto(page, config, university_url)
+            pagination_urls.append(university_url)
+            with crawl_metrics.span("pagination"):
+                await _handle_accordion_pagination(page, config)
+            course_urls = await _extract_course_links(page, config, base_url)
+        all_urls.extend(course_urls)
+        checkpoint.record_page(0, university_url, course_urls)
+        
+    elif pagination_type == "page_numbers":
+        # Extract total pages and generate URLs
+        with crawl_metrics.page(0, university_url):
+            await _goto(page, config, university_url)
+            with crawl_metrics.span("pagination"):
+                pagination_urls = await _handle_page_numbers_pagination(page, config, university_url)
+        
+        # Scrape each page (the first one is already loaded)
+        all_urls.extend(await _scrape_pagination_urls(
+            session, page, pagination_urls, config, base_url,
+            first_page_loaded=pagination_urls[0] == university_url,
+            known_results=checkpoint.known_results(pagination_urls),
+            on_page=lambda index, links: checkpoint.record_page(index, pagination_urls[index], links)
+        ))
+        
+    elif pagination_type == "url_params":
+        # Generate URLs with different parameters
+        pagination_urls = await _handle_url_params_pagination(page, config, university_url)
+        
+        probed = checkpoint.known_results(pagination_urls)
+        if config.get("pagination_probe"):
+            async def probe(index: int) -> List[str]:
+                if index not in probed:
+                    with crawl_metrics.page(index, pagination_urls[index]):
+                        probed[index] = await _scrape_listing_page(page, pagination_urls[index], config, base_url)
+                    checkpoint.record_page(index, pagination_urls[index], probed[index])
+                return probed[index]
+            
+            last_index = await _probe_last_page(probe, len(pagination_urls))
+            pagination_urls = pagination_urls[:last_index + 1]
+        
+        # Scrape each page, stopping once pages run out of new results
+        all_urls.extend(await _scrape_pagination_urls(
+            session, page, pagination_urls, config, base_url,
+            stop_when_exhausted=True,
+            known_results=probed,
+            on_page=lambda index, links: checkpoint.record_page(index, pagination_urls[index], links)
+        ))
+        
+    elif pagination_type == "next_button":
+        # Click next button repeatedly, continuing after any checkpointed pages
+        current_url = university_url
+        visited_urls = []
+        page_count = 0
+        for record in checkpoint.ordered_pages():
+            visited_urls.append(record["url"])
+            all_urls.extend(record["links"])
+            current_url = record["next_url"]
+            page_count += 1
+        
+        while current_url and page_count < MAX_PAGES:
+            try:
+                with crawl_metrics.page(page_count, current_url):
+                    page = await session.recycle(page)
+                    await _goto(page, config, current_url)
+                    pagination_urls.append(current_url)
+                    visited_urls.append(current_url)
+                    
+                    course_urls = await _extract_course_links(page, config, base_url)
+                    all_urls.extend(course_urls)
+                    
+                    # Try to get next URL
+                    with crawl_metrics.span("pagination"):
+                        next_url = await _handle_next_button_pagination(page, config, current_url, visited_urls)
+                checkpoint.record_page(page_count, current_url, course_urls, next_url)
+                if not next_url:
+                    break
+                
+                current_url = next_url
+                page_count += 1
+                
+            except ListingUnchanged:
+                raise
+            except Exception as e:
+                print(f"Error in pagination loop: {e}")
+                break
+    else:
+        # Unknown pagination type - treat as single page
+        with crawl_metrics.page(0, university_url):
+            await _goto(page, config, university_url)
+            pagination_urls.append(university_url)
+            course_urls = await _extract_course_links(page, config, base_url)
+        all_urls.extend(course_urls)
+        checkpoint.record_page(0, university_url, course_urls)
+    
+    return all_urls
+
+
+async def scrape_university_courses(
+    university_url: str,
+    pool: Optional[BrowserPool] = None,
+    resume: bool = True,
+    full_crawl: bool = False,
+    diff: bool = False,
+    on_page: Optional[Callable[[int, str, List[str]], None]] = None,
+    columnar: Optional[str] = None
+) -> Tuple[int, List[str], str]:
     """
     Unified function to scrape course URLs from any configured university.
     
+    Progress is checkpointed after every listing page; if a previous run for
+    the same URL died part-way, this run resumes after its last completed page.
+    With recrawl_match_pages set in the config, paginated crawls stop early
+    when the leading listing pages match the last run's fingerprints,
+    reusing its URL list.
+    
     Args:
         university_url: URL of the university course page
+        pool: Optional warm browser pool to borrow a session from. When omitted,
+            a single-browser pool is started for this call and closed afterwards.
+        resume: Resume from an existing checkpoint (False starts from page 1)
+        full_crawl: Walk every page even if the listing looks unchanged
+        diff: Also write added/removed/unchanged CSVs against the previous run
+            (see url_history.save_url_diff)
+        on_page: Called with (page_index, page_url, course_urls) as each listing
+            page completes (see stream_university_courses)
+        columnar: Also append the URLs to the partitioned "parquet" or "arrow"
+            links dataset (see columnar_output, requires pyarrow)
         
     Returns:
-        Tuple of (total_count, unique_urls)
+        Tuple of (total_count, unique_urls, csv_path)
         
     Raises:
         ValueError: If university is not configured
@@ -525,8 +2106,24 @@ async def scrape_university_courses(university_url: str) -> Tuple[int, List[str]
         raise ValueError(f"University URL '{university_url}' is not configured. "
                         f"Available universities: {', '.join(UNIVERSITY_CONFIGS.keys())}")
     
+    with crawl_metrics.university(config.get("folder_name", "unknown")), crawl_metrics.span("crawl"):
+        return await _scrape_configured_university(
+            university_url, config, pool, resume, full_crawl, diff, on_page, columnar
+        )
+
+
+async def _scrape_configured_university(
+    university_url: str,
+    config: Dict[str, Any],
+    pool: Optional[BrowserPool],
+    resume: bool,
+    full_crawl: bool,
+    diff: bool,
+    on_page: Optional[Callable[[int, str, List[str]], None]],
+    columnar: Optional[str]
+) -> Tuple[int, List[str], str]:
+    """Body of scrape_university_courses once the configuration is known."""
     folder_name = config.get("folder_name", "unknown")
-    pagination_type = config.get("pagination_type", "single_page")
     
     # Windows Python 3.13+ fix: Ensure ProactorEventLoopPolicy is set before Playwright creates subprocess
     if sys.platform.startswith('win'):
@@ -534,145 +2131,73 @@ async def scrape_university_courses(university_url: str) -> Tuple[int, List[str]
             policy = asyncio.WindowsProactorEventLoopPolicy()
             asyncio.set_event_loop_policy(policy)
     
-    all_urls = []
-    pagination_urls = []
+    pagination_type = config.get("pagination_type", "single_page")
+    fingerprints = ListingFingerprints(
+        folder_name, university_url, pagination_type,
+        match_pages=0 if full_crawl else config.get("recrawl_match_pages", RECRAWL_MATCH_PAGES)
+    )
+    checkpoint = CrawlCheckpoint(folder_name, university_url, pagination_type, fingerprints, on_page)
+    if resume:
+        checkpoint.load()
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--disable-extensions"
-            ]
-        )
-        try:
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            page.set_default_timeout(PAGE_LOAD_TIMEOUT)
-            
-            # Parse base URL
-            parsed = urlparse(university_url)
-            base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            
-            # Handle different pagination types
-            if pagination_type == "single_page":
-                # Single page - no pagination
-                await page.goto(university_url, wait_until="domcontentloaded")
-                pagination_urls.append(university_url)
-                course_urls = await _extract_course_links(page, config, base_url)
-                all_urls.extend(course_urls)
-                
-            elif pagination_type == "accordion":
-                # Accordion - expand all sections
-                await page.goto(university_url, wait_until="domcontentloaded")
-                pagination_urls.append(university_url)
-                await _handle_accordion_pagination(page, config)
-                course_urls = await _extract_course_links(page, config, base_url)
-                all_urls.extend(course_urls)
-                
-            elif pagination_type == "page_numbers":
-                # Extract total pages and generate URLs
-                await page.goto(university_url, wait_until="domcontentloaded")
-                pagination_urls = await _handle_page_numbers_pagination(page, config, university_url)
-                
-                # Scrape each page
-                for pag_url in pagination_urls:
-                    try:
-                        await page.goto(pag_url, wait_until="domcontentloaded")
-                        course_urls = await _extract_course_links(page, config, base_url)
-                        all_urls.extend(course_urls)
-                        await asyncio.sleep(0.5)  # Small delay between pages
-                    except Exception as e:
-                        print(f"Error scraping page {pag_url}: {e}")
-                        continue
-                        
-            elif pagination_type == "url_params":
-                # Generate URLs with different parameters
-                pagination_urls = await _handle_url_params_pagination(page, config, university_url)
-                
-                # Scrape each page
-                for pag_url in pagination_urls:
-                    try:
-                        await page.goto(pag_url, wait_until="domcontentloaded")
-                        
-                        # Handle cookies/overlays if needed
-                        if "canterbury.ac.nz" in pag_url:
-                            try:
-                                accept_btn = await page.get_by_role("button", name=re.compile(r"Accept|Agree", re.I)).first
-                                if await accept_btn.is_visible(timeout=5000):
-                                    await accept_btn.click()
-                                    await page.wait_for_timeout(1000)
-                            except:
-                                pass
-                        
-                        course_urls = await _extract_course_links(page, config, base_url)
-                        all_urls.extend(course_urls)
-                        # For Canterbury, stop if no results found
-                        if "canterbury.ac.nz" in pag_url and not course_urls:
-                            break
-                        await asyncio.sleep(1)  # Delay for Canterbury
-                    except Exception as e:
-                        print(f"Error scraping page {pag_url}: {e}")
-                        continue
-                        
-            elif pagination_type == "next_button":
-                # Click next button repeatedly
-                current_url = university_url
-                visited_urls = []
-                page_count = 0
-                
-                while page_count < MAX_PAGES:
-                    try:
-                        await page.goto(current_url, wait_until="domcontentloaded")
-                        pagination_urls.append(current_url)
-                        visited_urls.append(current_url)
-                        
-                        course_urls = await _extract_course_links(page, config, base_url)
-                        all_urls.extend(course_urls)
-                        
-                        # Try to get next URL
-                        next_url = await _handle_next_button_pagination(page, config, current_url, visited_urls)
-                        if not next_url:
-                            break
-                        
-                        current_url = next_url
-                        page_count += 1
-                        await asyncio.sleep(0.8)  # Delay between pages
-                        
-                    except Exception as e:
-                        print(f"Error in pagination loop: {e}")
-                        break
-            else:
-                # Unknown pagination type - treat as single page
-                await page.goto(university_url, wait_until="domcontentloaded")
-                pagination_urls.append(university_url)
-                course_urls = await _extract_course_links(page, config, base_url)
-                all_urls.extend(course_urls)
-                
-        finally:
-            await browser.close()
+    all_urls = None
+    try:
+        if not config.get("render", True):
+            all_urls = await _crawl_without_browser(pool, university_url, config, checkpoint)
+        
+        if all_urls is None and pool is None:
+            async with BrowserPool(size=1) as own_pool:
+                async with own_pool.session(config) as session:
+                    all_urls = await _crawl_listing_pages(session, university_url, config, checkpoint)
+        elif all_urls is None:
+            async with pool.session(config) as session:
+                all_urls = await _crawl_listing_pages(session, university_url, config, checkpoint)
+    except ListingUnchanged as e:
+        all_urls = fingerprints.previous_urls()
+        print(f"{e}: reusing {len(all_urls)} URLs from the last run")
+    finally:
+        checkpoint.close()
     
-    # Deduplicate (preserve order)
-    unique_urls = list(dict.fromkeys(all_urls))
+    # Deduplicate by canonical key (preserve order and the first-seen URL)
+    unique_urls = dedupe_urls(all_urls, config.get("canonical"))
     
     # Get university display name
     university_display_name = get_university_display_name(university_url)
     
-    # Save outputs as CSV
-    full_path = save_urls_to_csv(
-        urls=unique_urls,
-        university_name=university_display_name,
-        university_id=1,  # Default ID, can be customized per university
-        discovered_via="unified-extractor",
-        folder_name=folder_name,
-        filename=f"{folder_name}_courses.csv"
-    )
+    with crawl_metrics.span("save"):
+        # Save outputs as CSV
+        full_path = save_urls_to_csv(
+            urls=unique_urls,
+            university_name=university_display_name,
+            university_id=1,  # Default ID, can be customized per university
+            discovered_via="unified-extractor",
+            folder_name=folder_name,
+            filename=f"{folder_name}_courses.csv"
+        )
+        
+        if columnar:
+            write_links_columnar(
+                unique_urls,
+                university_name=university_display_name,
+                folder_name=folder_name,
+                university_id=1,
+                discovered_via="unified-extractor",
+                fmt=columnar
+            )
+        
+        if diff:
+            save_url_diff(
+                unique_urls,
+                university_name=university_display_name,
+                folder_path=_ensure_output_dirs(folder_name),
+                folder_name=folder_name,
+                university_id=1,
+                discovered_via="unified-extractor"
+            )
+        
+        # The crawl is complete and saved, so the next run starts fresh
+        checkpoint.clear()
+        fingerprints.save(unique_urls)
     
     # # Also save pagination URLs as CSV (for reference)
     # save_urls_to_csv(
@@ -712,32 +2237,152 @@ async def scrape_university_courses(university_url: str) -> Tuple[int, List[str]
     return len(unique_urls), unique_urls, full_path
 
 
+def get_courses_csv_path(university_url: str) -> str:
+    """
+    Path of the courses CSV that scrape_university_courses writes for a university.
+    
+    Raises:
+        ValueError: If university is not configured
+    """
+    config = get_config_for_url(university_url)
+    if not config:
+        raise ValueError(f"University URL '{university_url}' is not configured.")
+    folder_name = config.get("folder_name", "unknown")
+    return os.path.join(OUTPUT_MAIN_FOLDER, folder_name, f"{folder_name}_courses.csv")
+
+
+async def stream_university_courses(
+    university_url: str,
+    pool: Optional[BrowserPool] = None,
+    **kwargs
+) -> AsyncIterator[Tuple[str, Optional[int], Optional[str]]]:
+    """
+    Yield de-duplicated course URLs as each listing page is processed.
+    
+    Runs scrape_university_courses in the background (it still writes the
+    courses CSV at the end) and yields every new canonical URL as soon as its
+    listing page completes. With page_concurrency > 1, pages may finish out of order.
+    URLs that no page of this run produced (restored from a checkpoint, or
+    reused because the listing is unchanged) are yielded at the end with
+    page_index and source_page set to None.
+    
+    Args:
+        university_url: URL of the university course page
+        pool: Optional warm browser pool (see scrape_university_courses)
+        **kwargs: Passed on to scrape_university_courses (resume, full_crawl, diff)
+        
+    Yields:
+        Tuples of (course_url, page_index, source_page_url)
+        
+    Raises:
+        ValueError: If university is not configured (and any crawl error, after
+            the URLs found so far have been yielded)
+    """
+    config = get_config_for_url(university_url) or {}
+    rules = config.get("canonical")
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    def on_page(index: int, page_url: str, course_urls: List[str]) -> None:
+        queue.put_nowait((index, page_url, course_urls))
+    
+    task = asyncio.ensure_future(scrape_university_courses(university_url, pool, on_page=on_page, **kwargs))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    seen = set()
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            index, page_url, course_urls = item
+            for course_url in course_urls:
+                key = dedup_key(course_url, rules)
+                if key not in seen:
+                    seen.add(key)
+                    yield output_url(course_url, rules), index, page_url
+        
+        _, unique_urls, _ = await task
+        for course_url in unique_urls:
+            key = dedup_key(course_url, rules)
+            if key not in seen:
+                seen.add(key)
+                yield course_url, None, None
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def _next_or_none(iterator: AsyncIterator[Any]) -> Any:
+    """Next item of an async iterator, or None once it is exhausted."""
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _aclose(iterator) -> None:
+    await iterator.aclose()
+
+
+def stream_university_courses_sync(
+    university_url: str,
+    **kwargs
+) -> Iterator[Tuple[str, Optional[int], Optional[str]]]:
+    """
+    Synchronous wrapper for stream_university_courses (for live progress in Streamlit).
+    
+    Runs on the shared browser pool's event loop; each item is handed over
+    as soon as the crawl produces it.
+    
+    Args:
+        university_url: URL of the university course page
+        **kwargs: Passed on to scrape_university_courses
+        
+    Yields:
+        Tuples of (course_url, page_index, source_page_url)
+    """
+    loop = _get_shared_loop()
+    stream = stream_university_courses(university_url, get_shared_browser_pool(), **kwargs)
+    try:
+        while True:
+            item = asyncio.run_coroutine_threadsafe(_next_or_none(stream), loop).result()
+            if item is None:
+                return
+            yield item
+    finally:
+        asyncio.run_coroutine_threadsafe(_aclose(stream), loop).result()
+
+
 # Backward compatibility: Keep old function name for Abertay
-async def scrape_abertay_courses_async() -> Tuple[int, List[str]]:
+async def scrape_abertay_courses_async() -> Tuple[int, List[str], str]:
     """Scrape Abertay courses (async version for backward compatibility)."""
     url = "https://www.abertay.ac.uk/course-search/?keywords=course"
     return await scrape_university_courses(url)
 
 
-def scrape_university_courses_sync(university_url: str) -> Tuple[int, List[str]]:
+def scrape_university_courses_sync(university_url: str) -> Tuple[int, List[str], str]:
     """
     Synchronous wrapper for scrape_university_courses (for use in Streamlit).
     
+    Runs on the shared browser pool, so only the first call pays the
+    Chromium launch (or none, if prewarm_browser_pool() ran at startup).
+    
     Args:
         university_url: URL of the university course page
         
     Returns:
-        Tuple of (total_count, unique_urls)
+        Tuple of (total_count, unique_urls, csv_path)
     """
-    return asyncio.run(scrape_university_courses(university_url))
+    return run_with_shared_pool(
+        scrape_university_courses(university_url, get_shared_browser_pool())
+    )
 
 
-def scrape_abertay_courses() -> Tuple[int, List[str]]:
+def scrape_abertay_courses() -> Tuple[int, List[str], str]:
     """
     Scrape all course URLs from Abertay course search (sync wrapper for backward compatibility).
     
     Returns:
-        Tuple of (total_count, unique_urls)
+        Tuple of (total_count, unique_urls, csv_path)
     """
     url = "https://www.abertay.ac.uk/course-search/?keywords=course"
     return scrape_university_courses_sync(url)
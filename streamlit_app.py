@@ -24,13 +24,9 @@ import nest_asyncio
 nest_asyncio.apply()
 
 from dotenv import load_dotenv
-from course_extractor import extract_course_details
-from extractor import scrape_university_courses_sync
 
-try:
-    from firecrawl.firecrawl import FirecrawlApp as FirecrawlClient
-except ImportError:
-    from firecrawl import Firecrawl as FirecrawlClient
+# extractor (Playwright) and course_extractor (Firecrawl) are imported when a
+# scrape or extraction is requested, so page loads and reruns stay fast
 
 # -----------------------------
 # Streamlit Setup
@@ -215,6 +211,23 @@ def create_course_card(course: Dict[str, Any], index: int) -> None:
 if 'courses_data' not in st.session_state:
     st.session_state.courses_data = []
 
+@st.cache_resource(show_spinner=False)
+def get_browser_pool():
+    """
+    Shared browser pool, created on the first crawl and kept for the server process.
+    
+    Chromium is only launched once a crawl needs it, so sessions that only
+    extract course details never load Playwright or hold a browser.
+    """
+    from extractor import get_shared_browser_pool
+    return get_shared_browser_pool()
+
+@st.cache_resource(show_spinner=False)
+def get_firecrawl_client(api_key: str):
+    """Firecrawl client, created once per API key and reused across reruns."""
+    from course_extractor import get_firecrawl_client_class
+    return get_firecrawl_client_class()(api_key=api_key)
+
 create_logo()
 
 st.markdown("---")
@@ -248,8 +261,6 @@ if not API_KEY:
     """)
     st.stop()
 
-fc = FirecrawlClient(api_key=API_KEY)
-
 # 👇 NEW SECTION: University Website Input for Full Pipeline
 st.markdown("""
 <div class="uni-input-container">
@@ -275,8 +286,22 @@ with col2:
         else:
             with st.spinner("⏳ Running full pipeline extraction… This may take a few minutes."):
                 try:
-                    st.info("⏳ Running extraction. Please wait...")
-                    count, pipeline_results = scrape_university_courses_sync(university_url.strip())
+                    from extractor import stream_university_courses_sync
+                    progress_placeholder = st.empty()
+                    progress_placeholder.info("⏳ Running extraction. Please wait...")
+                    pipeline_results = []
+                    last_page = None
+                    get_browser_pool()
+                    for course_url, page_index, source_page in stream_university_courses_sync(university_url.strip()):
+                        pipeline_results.append(course_url)
+                        if source_page != last_page:
+                            last_page = source_page
+                            page_label = f"listing page {page_index + 1}" if page_index is not None else "previous run"
+                            progress_placeholder.info(
+                                f"⏳ {len(pipeline_results)} course URLs found so far (latest from {page_label})..."
+                            )
+                    progress_placeholder.empty()
+                    count = len(pipeline_results)
                     st.success(f"Extracted {count} courses 🎉")
                     if pipeline_results:
                         st.info(f"✅ Found {len(pipeline_results)} unique course URLs")
@@ -386,30 +411,35 @@ with col2:
             results_placeholder = st.empty()
         
         processed_count = 0
-        for log, course in extract_course_details(fc, valid_urls):
-            if course:
-                processed_count += 1
-                progress = processed_count / len(valid_urls)
-                progress_bar.progress(progress)
-                
-                key = course.get("course_name", "").lower().strip()
-                if key and key not in seen:
-                    seen.add(key)
-                    results.append(course)
+        from course_extractor import extract_course_details
+        from extraction_cache import ExtractionCache
+        with ExtractionCache() as cache:
+            for log, course in extract_course_details(get_firecrawl_client(API_KEY), valid_urls, cache=cache):
+                if course:
+                    processed_count += 1
+                    progress = processed_count / len(valid_urls)
+                    progress_bar.progress(progress)
                     
-                    with results_placeholder.container():
-                        st.write(f"**✅ {len(results)} course(s) extracted so far:**")
-                        for idx, result_course in enumerate(reversed(results)):
-                            create_course_card(result_course, len(results) - 1 - idx)
-            
-            if log:
-                status_text.markdown(f"""
-                <div class="extraction-status">
-                    <strong>Processing ({processed_count}/{len(valid_urls)}):</strong> {log}
-                </div>
-                """, unsafe_allow_html=True)
+                    key = course.get("course_name", "").lower().strip()
+                    if key and key not in seen:
+                        seen.add(key)
+                        results.append(course)
+                        
+                        with results_placeholder.container():
+                            st.write(f"**✅ {len(results)} course(s) extracted so far:**")
+                            for idx, result_course in enumerate(reversed(results)):
+                                create_course_card(result_course, len(results) - 1 - idx)
+                
+                if log:
+                    status_text.markdown(f"""
+                    <div class="extraction-status">
+                        <strong>Processing ({processed_count}/{len(valid_urls)}):</strong> {log}
+                    </div>
+                    """, unsafe_allow_html=True)
+            cache_hits = cache.stats()["hits"]
         
-        status_text.success(f"🎉 Extraction completed! Found {len(results)} unique courses.")
+        status_text.success(f"🎉 Extraction completed! Found {len(results)} unique courses "
+                            f"({cache_hits} of {len(valid_urls)} URLs from the extraction cache).")
         
         if results:
             st.session_state.courses_data.extend(results)
@@ -3,10 +3,75 @@ University scraping configurations.
 
 Each entry maps a university domain/identifier to its scraping configuration.
 The unified extractor uses these configurations to handle different university websites.
+Entries with a "start_url" are picked up by `python batch_crawler.py --all`.
+Entries are validated and compiled into UNIVERSITY_REGISTRY at import, so a typo in a
+key or value raises ValueError immediately; add entries at runtime with register_university().
+An optional "display_name" overrides the name derived from FOLDER_DISPLAY_NAMES.
+
+Optional browser settings:
+    render: Set False to crawl server-rendered listings over plain HTTP (falls back to
+        Playwright when the course selector matches nothing)
+    block_resources: Abort images, media, fonts, stylesheets and trackers (default True)
+    allow_resources: Resource types to load anyway, e.g. ["stylesheet"] for layout-dependent selectors
+    javascript_enabled: Set False for fully server-rendered listings (default True)
+
+Optional pacing settings:
+    page_concurrency: Listing pages fetched in parallel (default 1)
+    politeness_delay: Minimum seconds between requests to the site, shared by all workers (default 0)
+    pagination_timeout: ms to wait for a clicked next button's navigation to commit
+
+Optional url_params settings:
+    pagination_start / pagination_increment: Page n sets the param to start + (n - 1) * increment
+    max_pages: Candidate pages to generate (default MAX_PAGES); crawling stops at the
+        first page that is empty or adds no new URLs
+    pagination_probe: Find the last page by exponential + binary search before crawling
+
+Optional re-crawl settings:
+    recrawl_match_pages: Leading listing pages that must match the last run's fingerprints
+        to skip the rest and reuse its URL list (default 0: always walk every page).
+        Only enable it for listings whose order is fixed between runs, so any change shows
+        up on those leading pages; relevance-ranked search results can reorder and must not.
+
+Optional URL canonicalisation ("canonical" dict, see url_canonical.canonicalize_url):
+    strip_params / keep_params: Query parameters to drop, or the only ones to keep
+    force_https, trailing_slash ("strip" / "add"), lowercase_path, keep_fragment_routes
+    rewrite_urls: Write the canonical URL to the output instead of the first-seen original
 """
 
-from typing import Dict, List, Optional, Callable
-from urllib.parse import urlparse, parse_qs, unquote, urljoin
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Callable
+from urllib.parse import urlparse, unquote, urljoin
+
+
+# -----------------------------
+# URL Resolvers
+# -----------------------------
+
+RESOLVE_CACHE_SIZE = 65536  # Memoised (resolver, href, base_url) results
+
+
+def _query_param(query: str, name: str) -> Optional[str]:
+    """
+    First value of a query parameter in one pass over the query string.
+    
+    Same result as ``parse_qs(query).get(name, [None])[0]``: fields are split
+    on "&", fields without "=" or with an empty value are skipped, and
+    names/values are "+"- and percent-decoded. Only the matching value is
+    decoded, and parsing stops at the first match.
+    """
+    for field in query.split("&"):
+        key, sep, value = field.partition("=")
+        if not sep or not value:
+            continue
+        if key != name:
+            if "%" not in key and "+" not in key:
+                continue
+            if unquote(key.replace("+", " ")) != name:
+                continue
+        return unquote(value.replace("+", " "))
+    return None
 
 
 def resolve_funnelback_redirect(href: str, base_url: str) -> Optional[str]:
@@ -15,9 +80,9 @@ def resolve_funnelback_redirect(href: str, base_url: str) -> Optional[str]:
         return None
     parsed = urlparse(href)
     if "redirect" in parsed.path or "funnelback" in parsed.netloc:
-        qs = parse_qs(parsed.query)
-        if "url" in qs and qs["url"]:
-            real_url = unquote(qs["url"][0])
+        raw_url = _query_param(parsed.query, "url")
+        if raw_url:
+            real_url = unquote(raw_url)
             if real_url.startswith("//"):
                 real_url = "https:" + real_url
             elif real_url.startswith("/"):
@@ -32,9 +97,9 @@ def resolve_derby_redirect(href: str, base_url: str) -> Optional[str]:
         return None
     parsed = urlparse(href)
     if "funnelback" in parsed.netloc and parsed.path.endswith("/redirect"):
-        qs = parse_qs(parsed.query)
-        if "url" in qs and qs["url"]:
-            return unquote(qs["url"][0])
+        raw_url = _query_param(parsed.query, "url")
+        if raw_url:
+            return unquote(raw_url)
     return urljoin(base_url, href)
 
 
@@ -43,9 +108,7 @@ def resolve_hw_redirect(href: str, base_url: str) -> Optional[str]:
     if not href:
         return None
     if "url=" in href:
-        parsed = urlparse(href)
-        query = parse_qs(parsed.query)
-        encoded = query.get("url", [None])[0]
+        encoded = _query_param(urlparse(href).query, "url")
         if encoded:
             return unquote(encoded)
     return urljoin(base_url, href) if href else None
@@ -55,9 +118,7 @@ def resolve_canterbury_redirect(href: str, base_url: str) -> Optional[str]:
     """Resolve Canterbury redirect URLs."""
     if not href:
         return None
-    parsed = urlparse(href)
-    query = parse_qs(parsed.query)
-    raw_url = query.get("url", [None])[0]
+    raw_url = _query_param(urlparse(href).query, "url")
     if raw_url:
         try:
             return unquote(raw_url)
@@ -66,11 +127,45 @@ def resolve_canterbury_redirect(href: str, base_url: str) -> Optional[str]:
     return urljoin(base_url, href) if href else None
 
 
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def _resolve_cached(resolver: Callable[[str, str], Optional[str]], href: str, base_url: str) -> Optional[str]:
+    return resolver(href, base_url)
+
+
+def resolve_hrefs(
+    hrefs: List[str],
+    base_url: str,
+    resolver: Callable[[str, str], Optional[str]]
+) -> List[Optional[str]]:
+    """
+    Resolve a batch of hrefs with a url_resolution function.
+    
+    Results are memoised in a bounded LRU cache, so redirect hrefs that recur
+    across pages and crawls are only parsed once.
+    
+    Args:
+        hrefs: Raw href values
+        base_url: Base URL for resolving relative links
+        resolver: One of the resolve_* functions (or any url_resolution callable)
+        
+    Returns:
+        One resolved URL per href (None where the resolver returns nothing or raises)
+    """
+    resolved = []
+    for href in hrefs:
+        try:
+            resolved.append(_resolve_cached(resolver, href, base_url))
+        except Exception:
+            resolved.append(None)
+    return resolved
+
+
 # University configurations dictionary
 UNIVERSITY_CONFIGS: Dict[str, Dict] = {
     # Abertay University
     "abertay.ac.uk": {
         "folder_name": "abertay",
+        "start_url": "https://www.abertay.ac.uk/course-search/?keywords=course",
         "course_selector": "h3 > a[href*='redirect']",
         "pagination_type": "next_button",
         "pagination_selector": "a.next:not(.disabled)",
@@ -78,6 +173,7 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "match_mode": "segment",
         "url_resolution": resolve_funnelback_redirect,
         "wait_selector": "h3 > a[href*='redirect']",
+        "render": False,  # Results are in the initial HTML
     },
     
     # Derby University
@@ -86,9 +182,11 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "course_selector": "div.course-teaser-heading a",
         "pagination_type": "next_button",
         "pagination_selector": "div.pagination-controls a[title='Next']",
+        "recrawl_match_pages": 2,  # Listing order is fixed; reuse the last run if pages 1-2 match
         "filter_keywords": ["undergraduate", "postgraduate"],
         "match_mode": "contains",
         "url_resolution": resolve_derby_redirect,
+        "render": False,  # Results are in the initial HTML
     },
     
     # University College Birmingham (UCB)
@@ -111,6 +209,7 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "match_mode": "contains",
         "url_resolution": resolve_hw_redirect,
         "wait_selector": "td.hw_course-search__subject",
+        "render": False,  # Results are in the initial HTML
     },
     
     # Canterbury University (New Zealand)
@@ -121,10 +220,16 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "pagination_selector": None,
         "pagination_param": "start_rank",
         "pagination_increment": 20,
+        "pagination_start": 1,  # Funnelback ranks are 1-based
+        "max_pages": 50,
+        "pagination_probe": True,
+        "page_concurrency": 4,  # Listing pages fetched in parallel
+        "politeness_delay": 0.5,
         "filter_keywords": [],
         "match_mode": "contains",
         "url_resolution": resolve_canterbury_redirect,
         "wait_selector": ".cmp-funnelback-search__results-item-title",
+        "render": False,  # Results are in the initial HTML
     },
     
     # Otago University
@@ -160,6 +265,8 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "match_mode": "contains",
         "wait_selector": "div[x-data*='open'] h2",
         "special_logic": "generate_slug_from_title",  # Generates URLs from titles
+        "pagination_probe": True,
+        "page_concurrency": 4,  # Listing pages fetched in parallel
     },
     
     # University of Buckingham
@@ -171,6 +278,7 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "filter_keywords": ["undergraduate", "postgraduate", "foundation"],
         "match_mode": "contains",
         "wait_selector": "button.levelheader.accordion_title",
+        "allow_resources": ["stylesheet"],  # Accordion sections expand via CSS
     },
     
     # Staffordshire University
@@ -213,6 +321,7 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "pagination_selector": ".m-pagination",
         "pagination_extract_pattern": r"of\D*(\d+)",
         "pagination_param": "page",
+        "page_concurrency": 4,  # Listing pages fetched in parallel
         "filter_keywords": [],
         "match_mode": "contains",
         "wait_selector": "a.m-snippet__link",
@@ -224,9 +333,11 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "course_selector": "li.search-result-list__item h4.search-result-list__title a",
         "pagination_type": "next_button",
         "pagination_selector": "a.pagination__link--next",
+        "recrawl_match_pages": 2,  # Listing order is fixed; reuse the last run if pages 1-2 match
         "filter_keywords": [],
         "match_mode": "segment",
         "wait_selector": "ul.search-result-list",
+        "render": False,  # Results are in the initial HTML
     },
     
     # University of Salford
@@ -235,13 +346,16 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "course_selector": "a.uos-search-card__link",
         "pagination_type": "next_button",
         "pagination_selector": "li.uos-pager__item--next a.uos-pager__link[rel='next']",
+        "recrawl_match_pages": 2,  # Listing order is fixed; reuse the last run if pages 1-2 match
         "filter_keywords": ["undergraduate", "postgraduate"],
         "match_mode": "segment",
+        "render": False,  # Results are in the initial HTML
     },
     
     # Wrexham University
     "wrexham.ac.uk": {
         "folder_name": "wrexham",
+        "start_url": "https://wrexham.ac.uk/international-students/courses/",
         "course_selector": ".search-result-card h2 a[href]",
         "pagination_type": "single_page",
         "pagination_selector": None,
@@ -257,6 +371,7 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
         "pagination_type": "page_numbers",
         "pagination_selector": "div.col.pagination-control[data-t4-ajax-link='normal']",
         "pagination_param": "page",
+        "page_concurrency": 4,  # Listing pages fetched in parallel
         "filter_keywords": [],
         "match_mode": "contains",
         "wait_selector": "div.col-12 > a[href^='/study/courses/']",
@@ -264,7 +379,221 @@ UNIVERSITY_CONFIGS: Dict[str, Dict] = {
 }
 
 
-def get_config_for_url(url: str) -> Optional[Dict]:
+# -----------------------------
+# Compiled Registry
+# -----------------------------
+
+PAGINATION_TYPES = ("single_page", "next_button", "page_numbers", "url_params", "accordion")
+MATCH_MODES = ("contains", "segment")
+SPECIAL_LOGIC = ("generate_slug_from_title",)
+DEFAULT_PAGINATION_EXTRACT_PATTERN = r"of\D*(\d+)"
+
+# Map folder names to display names (a config's "display_name" takes precedence)
+FOLDER_DISPLAY_NAMES = {
+    "abertay": "Abertay University",
+    "derby": "University of Derby",
+    "ucb": "University College Birmingham",
+    "hw": "Heriot-Watt University",
+    "canterbury": "University of Canterbury",
+    "otago": "University of Otago",
+    "mcphs": "MCPHS University",
+    "york": "York College of Pennsylvania",
+    "buckingham": "University of Buckingham",
+    "staffs": "Staffordshire University",
+    "bedford": "University of Bedfordshire",
+    "coventry": "Coventry University",
+    "shu": "Sheffield Hallam University",
+    "leac": "University of Leicester",
+    "salford": "University of Salford",
+    "wrexham": "Wrexham University",
+    "uca": "University for the Creative Arts",
+}
+
+_STR = (str,)
+_NUMBER = (int, float)
+
+# Allowed keys and their types (None values are always allowed for optional keys)
+CONFIG_FIELDS: Dict[str, tuple] = {
+    "folder_name": _STR,
+    "display_name": _STR,
+    "start_url": _STR,
+    "course_selector": _STR,
+    "wait_selector": _STR,
+    "pagination_type": _STR,
+    "pagination_selector": _STR,
+    "pagination_param": _STR,
+    "pagination_extract_pattern": _STR,
+    "pagination_start": (int,),
+    "pagination_increment": (int,),
+    "max_pages": (int,),
+    "pagination_probe": (bool,),
+    "pagination_timeout": _NUMBER,
+    "page_concurrency": (int,),
+    "politeness_delay": _NUMBER,
+    "recrawl_match_pages": (int,),
+    "filter_keywords": (list, tuple),
+    "match_mode": _STR,
+    "url_resolution": (Callable,),
+    "special_logic": _STR,
+    "render": (bool,),
+    "block_resources": (bool,),
+    "allow_resources": (list, tuple),
+    "javascript_enabled": (bool,),
+    "canonical": (dict,),
+}
+REQUIRED_FIELDS = ("folder_name", "course_selector", "pagination_type")
+
+
+def _validate_config(domain: str, config: Dict[str, Any]) -> List[str]:
+    """List every problem with a raw configuration (empty if it is valid)."""
+    problems = []
+    for key in REQUIRED_FIELDS:
+        if not config.get(key):
+            problems.append(f"missing required key '{key}'")
+    for key, value in config.items():
+        if key not in CONFIG_FIELDS:
+            problems.append(f"unknown key '{key}'")
+        elif value is not None and not isinstance(value, CONFIG_FIELDS[key]):
+            problems.append(f"'{key}' has type {type(value).__name__}")
+    
+    pagination_type = config.get("pagination_type")
+    if pagination_type and pagination_type not in PAGINATION_TYPES:
+        problems.append(f"pagination_type '{pagination_type}' is not one of {', '.join(PAGINATION_TYPES)}")
+    if pagination_type == "next_button" and not config.get("pagination_selector"):
+        problems.append("next_button pagination needs a pagination_selector")
+    if pagination_type == "page_numbers" and not config.get("pagination_selector"):
+        problems.append("page_numbers pagination needs a pagination_selector")
+    if config.get("match_mode", "contains") not in MATCH_MODES:
+        problems.append(f"match_mode '{config.get('match_mode')}' is not one of {', '.join(MATCH_MODES)}")
+    if config.get("special_logic") is not None and config["special_logic"] not in SPECIAL_LOGIC:
+        problems.append(f"special_logic '{config['special_logic']}' is not one of {', '.join(SPECIAL_LOGIC)}")
+    for key in ("page_concurrency", "max_pages", "pagination_increment"):
+        if isinstance(config.get(key), int) and config[key] < 1:
+            problems.append(f"'{key}' must be at least 1")
+    for key in ("politeness_delay", "recrawl_match_pages", "pagination_start"):
+        if isinstance(config.get(key), _NUMBER) and config[key] < 0:
+            problems.append(f"'{key}' must not be negative")
+    
+    pattern = config.get("pagination_extract_pattern")
+    if isinstance(pattern, str):
+        try:
+            if re.compile(pattern).groups < 1:
+                problems.append("pagination_extract_pattern needs a capture group for the page count")
+        except re.error as e:
+            problems.append(f"pagination_extract_pattern does not compile: {e}")
+    return problems
+
+
+class UniversityConfig(Mapping):
+    """
+    Validated, read-only configuration of one university.
+    
+    Behaves like the raw config dict (``config.get("render", True)``,
+    ``config["folder_name"]``) and also exposes every key as an attribute,
+    plus the precompiled ``pagination_extract_regex``, ``domain`` and
+    ``display_name``.
+    
+    Raises:
+        ValueError: If the raw configuration is invalid
+    """
+    
+    __slots__ = tuple(CONFIG_FIELDS) + ("domain", "pagination_extract_regex", "_keys")
+    
+    def __init__(self, domain: str, config: Dict[str, Any]):
+        problems = _validate_config(domain, config)
+        if problems:
+            raise ValueError(f"Invalid university config '{domain}': " + "; ".join(problems))
+        
+        for key in CONFIG_FIELDS:
+            object.__setattr__(self, key, config.get(key))
+        object.__setattr__(self, "domain", domain)
+        object.__setattr__(self, "_keys", tuple(config))
+        object.__setattr__(self, "pagination_extract_regex", re.compile(
+            config.get("pagination_extract_pattern") or DEFAULT_PAGINATION_EXTRACT_PATTERN
+        ))
+        if not config.get("display_name"):
+            object.__setattr__(self, "display_name", FOLDER_DISPLAY_NAMES.get(
+                self.folder_name, self.folder_name.replace("_", " ").title()
+            ))
+    
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("UniversityConfig is read-only; use register_university() to change it")
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __repr__(self) -> str:
+        return f"UniversityConfig({self.domain!r}, folder_name={self.folder_name!r})"
+
+
+class UniversityRegistry:
+    """
+    Compiled configurations behind a domain-suffix index.
+    
+    A URL matches a configured domain if its host equals it or ends with
+    "." + domain (so "www.abertay.ac.uk" matches "abertay.ac.uk", but
+    "example.ac.uk" does not match "le.ac.uk"). Lookups are cached per host.
+    """
+    
+    def __init__(self, configs: Dict[str, Dict[str, Any]]):
+        self._by_domain: Dict[str, UniversityConfig] = {}
+        self._lookup_host = lru_cache(maxsize=4096)(self._lookup_host_uncached)
+        for domain, config in configs.items():
+            self.register(domain, config)
+    
+    def register(self, domain: str, config: Dict[str, Any]) -> UniversityConfig:
+        """Validate, compile and index one configuration."""
+        compiled = UniversityConfig(domain, config)
+        self._by_domain[domain.lower()] = compiled
+        self._lookup_host.cache_clear()
+        return compiled
+    
+    def _lookup_host_uncached(self, netloc: str) -> Optional[UniversityConfig]:
+        if netloc in self._by_domain:
+            return self._by_domain[netloc]
+        labels = netloc.split(":", 1)[0].split(".")
+        for i in range(len(labels)):
+            config = self._by_domain.get(".".join(labels[i:]))
+            if config is not None:
+                return config
+        return None
+    
+    def lookup(self, url: str) -> Optional[UniversityConfig]:
+        """Configuration for a URL, or None if its domain is not configured."""
+        return self._lookup_host(urlparse(url).netloc.lower())
+    
+    def __iter__(self) -> Iterator[UniversityConfig]:
+        return iter(self._by_domain.values())
+    
+    def __len__(self) -> int:
+        return len(self._by_domain)
+
+
+# Compiled once at import: an invalid entry fails here, not mid-crawl
+UNIVERSITY_REGISTRY = UniversityRegistry(UNIVERSITY_CONFIGS)
+
+
+def register_university(domain: str, config: Dict[str, Any]) -> UniversityConfig:
+    """
+    Add or replace a university configuration at runtime.
+    
+    Raises:
+        ValueError: If the configuration is invalid
+    """
+    compiled = UNIVERSITY_REGISTRY.register(domain, config)
+    UNIVERSITY_CONFIGS[domain] = config
+    return compiled
+
+
+def get_config_for_url(url: str) -> Optional[UniversityConfig]:
     """
     Get university configuration for a given URL.
     
@@ -272,22 +601,10 @@ def get_config_for_url(url: str) -> Optional[Dict]:
         url: University course page URL
         
     Returns:
-        Configuration dictionary or None if not found
+        Configuration or None if not found
     """
     try:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        
-        # Try exact domain match first
-        if domain in UNIVERSITY_CONFIGS:
-            return UNIVERSITY_CONFIGS[domain]
-        
-        # Try partial domain match (e.g., "www.abertay.ac.uk" -> "abertay.ac.uk")
-        for config_domain, config in UNIVERSITY_CONFIGS.items():
-            if config_domain in domain or domain.endswith(config_domain):
-                return config
-        
-        return None
+        return UNIVERSITY_REGISTRY.lookup(url)
     except Exception:
         return None
 
@@ -316,27 +633,4 @@ def get_university_display_name(url: str) -> str:
         name = domain.replace("www.", "").split(".")[0]
         return name.replace("-", " ").title()
     
-    # Map folder names to display names
-    folder_to_name = {
-        "abertay": "Abertay University",
-        "derby": "University of Derby",
-        "ucb": "University College Birmingham",
-        "hw": "Heriot-Watt University",
-        "canterbury": "University of Canterbury",
-        "otago": "University of Otago",
-        "mcphs": "MCPHS University",
-        "york": "York College of Pennsylvania",
-        "buckingham": "University of Buckingham",
-        "staffs": "Staffordshire University",
-        "bedford": "University of Bedfordshire",
-        "coventry": "Coventry University",
-        "shu": "Sheffield Hallam University",
-        "leac": "University of Leicester",
-        "salford": "University of Salford",
-        "wrexham": "Wrexham University",
-        "uca": "University for the Creative Arts",
-    }
-    
-    folder_name = config.get("folder_name", "")
-    return folder_to_name.get(folder_name, folder_name.replace("_", " ").title())
-
+    return config.display_name
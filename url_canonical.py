@@ -0,0 +1,302 @@
+"""
+URL canonicalisation and a compact cross-run dedup index.
+
+canonicalize_url() removes differences that do not change the page: scheme
+and host case, default ports, tracking parameters, parameter order and
+in-page fragments (SPA hash routes such as "#/search?..." are kept).
+Per-domain rules come from the "canonical" key of a university config.
+The canonical form is only used to key duplicates: crawl output keeps the
+first-seen original URL unless a university opts in with "rewrite_urls".
+
+DedupIndex remembers 64-bit fingerprints of dedup keys rather than the URL
+strings, in memory or in a SQLite file shared by every run and university,
+with an optional Bloom filter in front of the disk tier.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# -----------------------------
+# Constants
+# -----------------------------
+TRACKING_PARAMS = {
+    "gclid", "dclid", "gbraid", "wbraid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "_hsenc", "_hsmi", "hsctatracking", "mkt_tok", "igshid", "ref_src",
+}
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+DEDUP_INDEX_PATH = os.path.join("output_links_files", "dedup_index.sqlite")
+
+
+# -----------------------------
+# Canonicalisation
+# -----------------------------
+
+def _is_tracking_param(name: str, extra: Iterable[str]) -> bool:
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES) or lowered in extra
+
+
+def canonicalize_url(url: str, rules: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Canonical form of a URL.
+
+    Default rules: lower-case scheme and host, drop default ports, drop
+    tracking parameters, sort the remaining parameters and drop fragments
+    unless they are SPA routes ("#/..." or "#!..."). Paths keep their case.
+
+    Args:
+        url: Absolute URL
+        rules: Optional per-domain rules (a university config's "canonical" dict):
+            strip_params: Extra query parameters to drop
+            keep_params: Only keep these query parameters (drops all others)
+            sort_params: Sort query parameters (default True)
+            force_https: Rewrite http:// to https://
+            trailing_slash: "strip" or "add" a trailing slash to the path ("keep" by default)
+            lowercase_path: Lower-case the path
+            keep_fragment_routes: Keep "#/" and "#!" fragments (default True)
+            rewrite_urls: Emit the canonical URL in crawl output instead of the
+                original (see output_url; not used here)
+
+    Returns:
+        Canonical URL (unparseable input is returned unchanged)
+    """
+    rules = rules or {}
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if rules.get("force_https") and scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{credentials}@{host}"
+
+    path = parts.path or "/"
+    if rules.get("lowercase_path"):
+        path = path.lower()
+    trailing_slash = rules.get("trailing_slash", "keep")
+    if trailing_slash == "strip" and path != "/":
+        path = path.rstrip("/") or "/"
+    elif trailing_slash == "add" and not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+        path += "/"
+
+    strip_params = {name.lower() for name in rules.get("strip_params", [])}
+    keep_params = rules.get("keep_params")
+    params = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name, strip_params) and (keep_params is None or name in keep_params)
+    ]
+    if rules.get("sort_params", True):
+        params.sort()
+    query = urlencode(params)
+
+    fragment = parts.fragment
+    if not (rules.get("keep_fragment_routes", True) and fragment.startswith(("/", "!"))):
+        fragment = ""
+
+    return urlunsplit((scheme, host, path, query, fragment))
+
+
+def dedup_key(url: str, rules: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Key under which two URLs count as the same page.
+
+    The canonical URL without its scheme and trailing slash, so http/https
+    and "/course" vs "/course/" collapse to one key.
+    """
+    return _key_from_canonical(canonicalize_url(url, rules))
+
+
+def _key_from_canonical(canonical_url: str) -> str:
+    parts = urlsplit(canonical_url)
+    path = parts.path.rstrip("/")
+    key = parts.netloc + path
+    if parts.query:
+        key += "?" + parts.query
+    if parts.fragment:
+        key += "#" + parts.fragment
+    return key
+
+
+def output_url(url: str, rules: Optional[Dict[str, Any]] = None) -> str:
+    """
+    URL to write to crawl output: the original, or its canonical form if the rules set rewrite_urls.
+
+    Rewriting re-encodes and sorts query parameters and drops plain fragments,
+    which can break sites that read a bare flag or a fragment, so it is opt-in.
+    """
+    if rules and rules.get("rewrite_urls"):
+        return canonicalize_url(url, rules)
+    return url
+
+
+def url_fingerprint(key: str) -> int:
+    """Signed 64-bit fingerprint of a dedup key (fits a SQLite INTEGER)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def dedupe_urls(urls: Iterable[str], rules: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Drop duplicate URLs by dedup key, keeping first-seen order.
+
+    Args:
+        urls: URLs to deduplicate
+        rules: Optional per-domain canonicalisation rules
+
+    Returns:
+        The first-seen URL of each dedup key, as given (canonical if the
+        rules set rewrite_urls)
+    """
+    seen = set()
+    unique = []
+    for url in urls:
+        fingerprint = url_fingerprint(dedup_key(url, rules))
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            unique.append(output_url(url, rules))
+    return unique
+
+
+# -----------------------------
+# Dedup Index
+# -----------------------------
+
+class BloomFilter:
+    """
+    Bloom filter over 64-bit fingerprints (no false negatives).
+
+    Args:
+        capacity: Expected number of items
+        error_rate: Target false positive rate at capacity
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: int) -> Iterator[int]:
+        # Double hashing from the two 32-bit halves of the fingerprint
+        value = fingerprint & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = value >> 32, (value & 0xFFFFFFFF) | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, fingerprint: int) -> None:
+        for position in self._positions(fingerprint):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(fingerprint))
+
+
+class DedupIndex:
+    """
+    Set of URLs seen so far, across runs and universities, stored as 64-bit fingerprints.
+
+    With a path, fingerprints live in SQLite (on disk, not in memory) and a
+    Bloom filter answers most "never seen" checks without touching the
+    database. Without a path, fingerprints are kept in an in-memory set.
+
+    Usage:
+        with DedupIndex(DEDUP_INDEX_PATH) as index:
+            new_urls = [url for url in urls if index.add(url)]
+
+    Args:
+        path: SQLite file (None for an in-memory index)
+        bloom_capacity: Expected number of URLs for the Bloom filter (0 disables it)
+        rules: Optional canonicalisation rules applied before fingerprinting
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        bloom_capacity: int = 1_000_000,
+        rules: Optional[Dict[str, Any]] = None
+    ):
+        self.path = path
+        self.rules = rules
+        self._memory = set() if path is None else None
+        self._conn = None
+        self._bloom = BloomFilter(bloom_capacity) if path is not None and bloom_capacity else None
+        if path is not None:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._conn = sqlite3.connect(path)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS fingerprints (fp INTEGER PRIMARY KEY) WITHOUT ROWID")
+            if self._bloom is not None:
+                for (fingerprint,) in self._conn.execute("SELECT fp FROM fingerprints"):
+                    self._bloom.add(fingerprint)
+
+    def __enter__(self) -> "DedupIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def _fingerprint(self, url: str) -> int:
+        return url_fingerprint(dedup_key(url, self.rules))
+
+    def _contains_fingerprint(self, fingerprint: int) -> bool:
+        if self._memory is not None:
+            return fingerprint in self._memory
+        if self._bloom is not None and fingerprint not in self._bloom:
+            return False
+        return self._conn.execute("SELECT 1 FROM fingerprints WHERE fp = ?", (fingerprint,)).fetchone() is not None
+
+    def __contains__(self, url: str) -> bool:
+        return self._contains_fingerprint(self._fingerprint(url))
+
+    def add(self, url: str) -> bool:
+        """
+        Record a URL.
+
+        Returns:
+            True if the URL had not been seen before
+        """
+        fingerprint = self._fingerprint(url)
+        if self._contains_fingerprint(fingerprint):
+            return False
+        if self._memory is not None:
+            self._memory.add(fingerprint)
+        else:
+            self._conn.execute("INSERT OR IGNORE INTO fingerprints (fp) VALUES (?)", (fingerprint,))
+            if self._bloom is not None:
+                self._bloom.add(fingerprint)
+        return True
+
+    def filter_new(self, urls: Iterable[str]) -> Iterator[str]:
+        """Yield only URLs not seen before, recording them as seen."""
+        for url in urls:
+            if self.add(url):
+                yield url
+
+    def commit(self) -> None:
+        """Flush recorded fingerprints to disk."""
+        if self._conn is not None:
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        if self._memory is not None:
+            return len(self._memory)
+        return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
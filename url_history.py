@@ -0,0 +1,203 @@
+"""
+Per-university history of discovered course URLs, used to diff discovery runs.
+
+Each university gets a small SQLite database next to its CSVs recording when
+every URL was first and last seen. A new run's URLs are staged into a
+temporary table and compared with the previous run using set operations in
+SQL, so added / removed / unchanged sets are computed and written out without
+holding whole URL sets in Python.
+"""
+import csv
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+
+# -----------------------------
+# Constants
+# -----------------------------
+HISTORY_SUFFIX = "_history.sqlite"
+DIFF_CHANGES = ("added", "removed", "unchanged")
+DIFF_FIELDNAMES = ["", "url", "university_id", "university_name", "discovered_via",
+                   "link_group_type", "confidence_score", "status", "extracted_at", "error_message",
+                   "change", "first_seen", "last_seen"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    last_run_id INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS urls_last_run ON urls (last_run_id);
+"""
+
+
+# -----------------------------
+# URL History
+# -----------------------------
+
+class UrlHistory:
+    """
+    SQLite store of every course URL seen for one university.
+
+    Usage:
+        with UrlHistory(path) as history:
+            counts = history.record_run(urls)
+            history.export_diff("added", "added.csv", row_defaults)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "UrlHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record_run(self, urls: Iterable[str], run_at: Optional[str] = None) -> Dict[str, int]:
+        """
+        Record a discovery run and diff it against the previous one.
+
+        URLs are streamed into SQLite, so ``urls`` may be any iterable. The
+        diff stays available to export_diff() until the next run is recorded.
+
+        Args:
+            urls: Course URLs found by this run (duplicates are ignored)
+            run_at: Timestamp of the run (defaults to now)
+
+        Returns:
+            Counts of added, removed and unchanged URLs
+        """
+        run_at = run_at or datetime.now().isoformat()
+        conn = self.conn
+        with conn:
+            previous_run_id = conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+            run_id = conn.execute("INSERT INTO runs (run_at) VALUES (?)", (run_at,)).lastrowid
+
+            conn.execute("DROP TABLE IF EXISTS temp.current_run")
+            conn.execute("DROP TABLE IF EXISTS temp.run_diff")
+            conn.execute("CREATE TEMP TABLE current_run (url TEXT PRIMARY KEY) WITHOUT ROWID")
+            conn.execute("CREATE TEMP TABLE run_diff (url TEXT PRIMARY KEY, change TEXT NOT NULL) WITHOUT ROWID")
+            conn.executemany("INSERT OR IGNORE INTO current_run (url) VALUES (?)", ((url,) for url in urls))
+
+            # A URL is unchanged if the previous run saw it, added otherwise
+            # (including URLs that come back after disappearing for a while)
+            conn.execute("""
+                INSERT INTO run_diff (url, change)
+                SELECT c.url, CASE WHEN u.last_run_id = ? THEN 'unchanged' ELSE 'added' END
+                FROM current_run c LEFT JOIN urls u ON u.url = c.url
+            """, (previous_run_id,))
+            conn.execute("""
+                INSERT INTO run_diff (url, change)
+                SELECT u.url, 'removed' FROM urls u
+                WHERE u.last_run_id = ? AND NOT EXISTS (SELECT 1 FROM current_run c WHERE c.url = u.url)
+            """, (previous_run_id,))
+
+            conn.execute("""
+                INSERT INTO urls (url, first_seen, last_seen, last_run_id)
+                SELECT url, ?, ?, ? FROM current_run WHERE true
+                ON CONFLICT (url) DO UPDATE SET last_seen = excluded.last_seen, last_run_id = excluded.last_run_id
+            """, (run_at, run_at, run_id))
+            conn.execute("DROP TABLE temp.current_run")
+
+        counts = dict.fromkeys(DIFF_CHANGES, 0)
+        counts.update(conn.execute("SELECT change, COUNT(*) FROM run_diff GROUP BY change").fetchall())
+        return counts
+
+    def export_diff(self, change: str, path: str, row_defaults: Dict[str, Any]) -> int:
+        """
+        Stream one diff set of the last recorded run to a CSV file.
+
+        Args:
+            change: "added", "removed" or "unchanged"
+            path: CSV file to write
+            row_defaults: Values for the export columns other than url/change/first_seen/last_seen
+
+        Returns:
+            Number of rows written
+        """
+        if change not in DIFF_CHANGES:
+            raise ValueError(f"Unknown diff set '{change}'. Expected one of: {', '.join(DIFF_CHANGES)}")
+        rows = self.conn.execute("""
+            SELECT d.url, u.first_seen, u.last_seen
+            FROM run_diff d JOIN urls u ON u.url = d.url
+            WHERE d.change = ?
+            ORDER BY u.first_seen, d.url
+        """, (change,))
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=DIFF_FIELDNAMES, extrasaction="ignore")
+            writer.writeheader()
+            for count, (url, first_seen, last_seen) in enumerate(rows, start=1):
+                writer.writerow({
+                    **row_defaults,
+                    "": count - 1,
+                    "url": url,
+                    "change": change,
+                    "first_seen": first_seen,
+                    "last_seen": last_seen,
+                })
+        return count
+
+
+def save_url_diff(
+    urls: Iterable[str],
+    university_name: str,
+    folder_path: str,
+    folder_name: str,
+    university_id: int = 1,
+    discovered_via: str = "unified-extractor"
+) -> Dict[str, Any]:
+    """
+    Diff a run's URLs against the previous run and write added/removed/unchanged CSVs.
+
+    Writes ``{folder_name}_added.csv``, ``{folder_name}_removed.csv`` and
+    ``{folder_name}_unchanged.csv`` to ``folder_path``, using the export
+    columns of the courses CSV plus change, first_seen and last_seen.
+
+    Args:
+        urls: Course URLs found by this run
+        university_name: Name of the university
+        folder_path: Output folder of the university
+        folder_name: Output folder name (used as the file prefix)
+        university_id: University ID for the export columns
+        discovered_via: How the URLs were discovered
+
+    Returns:
+        Dictionary with the counts per diff set and their CSV paths under "paths"
+    """
+    extracted_at = datetime.now().isoformat()
+    row_defaults = {
+        "university_id": university_id,
+        "university_name": university_name,
+        "discovered_via": discovered_via,
+        "link_group_type": "",
+        "confidence_score": "",
+        "status": "pending",
+        "extracted_at": extracted_at,
+        "error_message": "",
+    }
+
+    with UrlHistory(os.path.join(folder_path, f"{folder_name}{HISTORY_SUFFIX}")) as history:
+        summary: Dict[str, Any] = history.record_run(urls, run_at=extracted_at)
+        summary["paths"] = {}
+        for change in DIFF_CHANGES:
+            path = os.path.join(folder_path, f"{folder_name}_{change}.csv")
+            history.export_diff(change, path, row_defaults)
+            summary["paths"][change] = path
+
+    print(f"[✔] Diff vs previous run: {summary['added']} added, {summary['removed']} removed, "
+          f"{summary['unchanged']} unchanged")
+    return summary